@@ -59,8 +59,8 @@ if "users_db" in st.session_state:
         # Testar se métodos de avisos existem
         if not hasattr(st.session_state.users_db, 'remover_aviso_usuario'):
             raise AttributeError("Método remover_aviso_usuario não encontrado")
-        if not hasattr(st.session_state.users_db, 'get_matriz_leitura_avisos'):
-            raise AttributeError("Método get_matriz_leitura_avisos não encontrado")
+        if not hasattr(st.session_state.users_db, 'get_matriz_leitura_pagina'):
+            raise AttributeError("Método get_matriz_leitura_pagina não encontrado")
         # Testar conexão básica
         st.session_state.users_db.get_users(incluir_inativos=False)
     except (TypeError, AttributeError):
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script de manutenção do banco de dados
+
+Uso:
+    python manutencao.py setor-stats              # reconstrói o resumo por setor
+    python manutencao.py setor-stats --verificar  # apenas lista divergências
+    python manutencao.py contadores-avisos        # repara contadores de leitura dos avisos
+    python manutencao.py arquivar-avisos          # arquiva avisos expirados/excluídos
+    python manutencao.py ferias-sobrepostas       # lista férias com períodos sobrepostos
+    python manutencao.py acumular-aniversarios    # credita aniversários de admissão até hoje
+    python manutencao.py saldos                   # compara saldo, extrato e férias aprovadas
+    python manutencao.py saldos --aplicar         # corrige as divergências em uma transação
+    python manutencao.py jobs --listar            # rotinas agendadas e última execução
+    python manutencao.py jobs --vencidos          # executa as rotinas vencidas (ex.: via cron)
+    python manutencao.py jobs arquivar_avisos     # executa rotinas específicas agora
+"""
+import argparse
+import csv
+import sys
+from datetime import date
+from pathlib import Path
+
+# Adicionar raiz do projeto ao path
+sys.path.append(str(Path(__file__).parent))
+
+from src.database.setor_stats_repository import SetorStatsRepository
+from src.database.avisos_repository import AvisosRepository
+from src.database.ferias_repository import FeriasRepository
+from src.database.renovacao_repository import RenovacaoRepository
+from src.database.jobs_repository import JobsRepository
+from src.database.saldo_repository import SaldoRepository
+from src.services.saldo_service import SaldoService
+from src.services.agendador import Agendador, jobs_registrados
+from src.services.jobs_padrao import registrar_jobs_padrao
+
+def comando_setor_stats(args):
+    """Compara ou reconstrói a tabela setor_stats"""
+    repositorio = SetorStatsRepository()
+    repositorio.criar_estrutura()
+
+    divergencias = repositorio.verificar_setor_stats()
+    if not divergencias:
+        print("setor_stats consistente com usuarios/ferias")
+        return 0
+
+    print(f"{len(divergencias)} setor(es) divergente(s):")
+    for linha in divergencias:
+        print(
+            f"  {linha['setor']}: "
+            f"colaboradores {linha['colaboradores_atual']} -> {linha['colaboradores_esperado']}, "
+            f"saldo {linha['saldo_atual']} -> {linha['saldo_esperado']}, "
+            f"pendentes {linha['pendentes_atual']} -> {linha['pendentes_esperado']}, "
+            f"aprovados {linha['aprovados_atual']} -> {linha['aprovados_esperado']}"
+        )
+
+    if args.verificar:
+        return 1
+
+    if not repositorio.reconstruir_setor_stats():
+        print("ERRO: Falha ao reconstruir setor_stats")
+        return 1
+
+    print("setor_stats reconstruída")
+    return 0
+
+def comando_contadores_avisos(args):
+    """Compara ou repara total_destinatarios/total_lidos/total_ocultos"""
+    repositorio = AvisosRepository()
+    repositorio.criar_estrutura()
+
+    divergencias = repositorio.verificar_contadores_avisos()
+    if not divergencias:
+        print("Contadores de avisos consistentes")
+        return 0
+
+    print(f"{len(divergencias)} aviso(s) divergente(s):")
+    for linha in divergencias:
+        print(
+            f"  #{linha['id']} {linha['titulo']}: "
+            f"destinatarios {linha['total_destinatarios']} -> {linha['destinatarios_esperado']}, "
+            f"lidos {linha['total_lidos']} -> {linha['lidos_esperado']}, "
+            f"ocultos {linha['total_ocultos']} -> {linha['ocultos_esperado']}"
+        )
+
+    if args.verificar:
+        return 1
+
+    if not repositorio.reparar_contadores_avisos():
+        print("ERRO: Falha ao reparar contadores de avisos")
+        return 1
+
+    print("Contadores de avisos reparados")
+    return 0
+
+def comando_arquivar_avisos(args):
+    """Move avisos expirados ou excluídos para as tabelas de arquivo, em lotes"""
+    repositorio = AvisosRepository()
+    repositorio.criar_estrutura()
+
+    arquivados = repositorio.arquivar_avisos(args.lote)
+    if arquivados is False:
+        print("ERRO: Falha ao arquivar avisos")
+        return 1
+    print(f"{arquivados} aviso(s) arquivado(s)")
+    return 0
+
+def comando_ferias_sobrepostas(args):
+    """Lista pares de férias ativas sobrepostas (impedem a constraint de exclusão)"""
+    repositorio = FeriasRepository()
+    repositorio.criar_estrutura()
+
+    sobreposicoes = repositorio.listar_sobreposicoes_ferias()
+    if not sobreposicoes:
+        print("Nenhuma férias sobreposta")
+        return 0
+
+    print(f"{len(sobreposicoes)} sobreposição(ões) encontrada(s):")
+    for linha in sobreposicoes:
+        print(
+            f"  {linha['nome']}: "
+            f"#{linha['ferias_id']} {linha['data_inicio']:%d/%m/%Y}-{linha['data_fim']:%d/%m/%Y} ({linha['status']}) x "
+            f"#{linha['conflito_id']} {linha['conflito_inicio']:%d/%m/%Y}-{linha['conflito_fim']:%d/%m/%Y} ({linha['conflito_status']})"
+        )
+    return 1
+
+def comando_acumular_aniversarios(args):
+    """Credita o saldo pelo aniversário de admissão (idempotente, recupera dias perdidos)"""
+    repositorio = RenovacaoRepository()
+    repositorio.criar_estrutura()
+
+    resultado = SaldoService(repositorio).acumular_aniversarios(args.ate, args.desde)
+    if not resultado["sucesso"]:
+        print(f"ERRO: {resultado['erro']}")
+        return 1
+
+    print(
+        f"{resultado['aniversarios']} aniversário(s) processado(s), "
+        f"{resultado['colaboradores']} colaborador(es) creditado(s), "
+        f"{resultado['dias']} dia(s) no total"
+    )
+    return 0
+
+def comando_saldos(args):
+    """Reconcilia o saldo de todos os colaboradores com o extrato e as férias aprovadas"""
+    repositorio = SaldoRepository()
+    repositorio.criar_estrutura()
+
+    resultado = SaldoService(repositorio).reconciliar(args.aplicar, usuario_responsavel_nome="manutencao.py")
+    if not resultado["sucesso"]:
+        print(f"ERRO: {resultado['erro']}")
+        return 1
+
+    divergencias = resultado["divergencias"]
+    if not divergencias:
+        print("Saldos consistentes com o extrato e as férias")
+        return 0
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=list(divergencias[0]))
+            escritor.writeheader()
+            escritor.writerows(divergencias)
+        print(f"Relatório completo em {args.csv}")
+
+    resumo = resultado["resumo"]
+    print(
+        f"{resumo['colaboradores']} colaborador(es) divergente(s): "
+        f"{resumo['divergencias_cache']} com saldo diferente do extrato ({resumo['dias_cache']:+d} dia(s)), "
+        f"{resumo['divergencias_ferias']} com férias sem débito/estorno correto ({resumo['dias_ferias']:+d} dia(s)), "
+        f"{resumo['sem_extrato']} sem extrato"
+    )
+    for linha in divergencias[:args.limite]:
+        print(
+            f"  {linha['nome']} ({linha['setor']}): saldo {linha['saldo_atual']}, "
+            f"extrato {linha['saldo_extrato']}, esperado {linha['saldo_esperado']}"
+            + (f", férias {', '.join(f'#{ferias_id}' for ferias_id in linha['ferias_divergentes'])}" if linha['ferias_divergentes'] else "")
+        )
+    if len(divergencias) > args.limite:
+        print(f"  ... e mais {len(divergencias) - args.limite}")
+
+    if not args.aplicar:
+        return 1
+
+    print(
+        f"Corrigido: {resultado['extratos_abertos']} extrato(s) aberto(s), "
+        f"{resultado['caches_realinhados']} saldo(s) realinhado(s) ao extrato, "
+        f"{resultado['ferias_corrigidas']} lançamento(s) de férias"
+    )
+    return 0
+
+def comando_jobs(args):
+    """Executa as rotinas do agendador fora do Streamlit (mesmos locks e histórico)"""
+    repositorio = JobsRepository()
+    repositorio.criar_estrutura()
+    registrar_jobs_padrao()
+    agendador = Agendador(repositorio)
+
+    if args.listar or not (args.vencidos or args.nomes):
+        ultimas = {linha['job']: linha for linha in repositorio.get_ultimas_execucoes() or []}
+        for job in jobs_registrados():
+            ultima = ultimas.get(job.nome)
+            situacao = "nunca executada"
+            if ultima:
+                situacao = (
+                    f"última {ultima['inicio']:%d/%m/%Y %H:%M} "
+                    f"({'ok' if ultima['sucesso'] else 'falha'}, {ultima['duracao_ms']} ms)"
+                )
+            escopo = "por processo" if job.por_processo else "global"
+            print(f"  {job.nome} [{escopo}, a cada {job.intervalo}s]: {job.descricao} - {situacao}")
+        return 0
+
+    if args.vencidos:
+        # Caches por processo não servem a outros processos
+        resultados = agendador.executar_vencidos(locais=False)
+    else:
+        resultados = {nome: agendador.executar_job(nome) for nome in args.nomes}
+
+    if not resultados:
+        print("Nenhuma rotina vencida")
+        return 0
+
+    falhas = 0
+    for nome, resultado in resultados.items():
+        if resultado["sucesso"]:
+            print(f"  {nome}: ok em {resultado['duracao_ms']} ms - {resultado['resultado']}")
+        elif resultado.get("ignorado"):
+            print(f"  {nome}: ignorada - {resultado['erro']}")
+        else:
+            falhas += 1
+            print(f"  {nome}: FALHA - {resultado['erro']}")
+    return 1 if falhas else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Manutenção do banco do Sistema RH")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    setor_stats = subparsers.add_parser("setor-stats", help="Reconcilia o resumo por setor")
+    setor_stats.add_argument("--verificar", action="store_true", help="Apenas lista divergências")
+    setor_stats.set_defaults(executar=comando_setor_stats)
+
+    contadores = subparsers.add_parser("contadores-avisos", help="Repara contadores de leitura dos avisos")
+    contadores.add_argument("--verificar", action="store_true", help="Apenas lista divergências")
+    contadores.set_defaults(executar=comando_contadores_avisos)
+
+    arquivar = subparsers.add_parser("arquivar-avisos", help="Arquiva avisos expirados/excluídos")
+    arquivar.add_argument("--lote", type=int, default=100, help="Avisos por transação (padrão: 100)")
+    arquivar.set_defaults(executar=comando_arquivar_avisos)
+
+    sobrepostas = subparsers.add_parser("ferias-sobrepostas", help="Lista férias com períodos sobrepostos")
+    sobrepostas.set_defaults(executar=comando_ferias_sobrepostas)
+
+    acumular = subparsers.add_parser("acumular-aniversarios", help="Credita saldo pelo aniversário de admissão")
+    acumular.add_argument("--ate", type=date.fromisoformat, help="Último dia processado, AAAA-MM-DD (padrão: hoje)")
+    acumular.add_argument("--desde", type=date.fromisoformat, help="Reprocessa aniversários após este dia, AAAA-MM-DD")
+    acumular.set_defaults(executar=comando_acumular_aniversarios)
+
+    saldos = subparsers.add_parser("saldos", help="Reconcilia o saldo de todos os colaboradores")
+    saldos.add_argument("--aplicar", action="store_true", help="Corrige as divergências (uma transação)")
+    saldos.add_argument("--csv", help="Grava o relatório completo neste arquivo")
+    saldos.add_argument("--limite", type=int, default=50, help="Divergências exibidas (padrão: 50)")
+    saldos.set_defaults(executar=comando_saldos)
+
+    jobs = subparsers.add_parser("jobs", help="Lista ou executa as rotinas agendadas")
+    jobs.add_argument("nomes", nargs="*", help="Rotinas a executar agora")
+    jobs.add_argument("--listar", action="store_true", help="Lista as rotinas e a última execução")
+    jobs.add_argument("--vencidos", action="store_true", help="Executa as rotinas vencidas")
+    jobs.set_defaults(executar=comando_jobs)
+
+    args = parser.parse_args()
+    return args.executar(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
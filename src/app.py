@@ -8,6 +8,11 @@ from .utils.ui_components import create_header
 from .utils.button_styles import apply_button_styles
 from .auth import login_page  
 from .menus import menu_rh, menu_diretoria, menu_coordenador, menu_colaborador
+from .menus.avisos_pessoais import descarregar_leituras_pendentes
+from .utils.profiler import perfilar_rerun
+from .utils.detector_queries import detectar_queries_rerun
+from .services.agendador import agendador_ativo, iniciar_agendador
+from .services.jobs_padrao import registrar_jobs_padrao
 import sys
 import os
 import base64
@@ -24,6 +29,8 @@ def _get_base64_image(image_path):
 # CSS customizado removido - usando tema nativo dark do Streamlit
 
 
+@perfilar_rerun
+@detectar_queries_rerun
 def main():
     import os
     
@@ -39,6 +46,11 @@ def main():
     if "users_db" not in st.session_state:
         from .database import DatabaseManager
         st.session_state.users_db = DatabaseManager()
+    
+    # Rotinas de manutenção em segundo plano (uma thread por processo)
+    if agendador_ativo():
+        registrar_jobs_padrao()
+        iniciar_agendador()
 
     logo_path = "assets/LOGORPONTES-1.png"
 
@@ -50,6 +62,8 @@ def main():
     else:
         user = st.session_state.user
 
+        # Leituras de avisos acumuladas em reruns anteriores
+        descarregar_leituras_pendentes()
 
         # Sidebar
         if os.path.exists(logo_path):
@@ -79,6 +93,7 @@ def main():
         st.sidebar.markdown("---")
 
         if st.sidebar.button("Logout", use_container_width=True):
+            descarregar_leituras_pendentes(forcar=True)
 
             del st.session_state.user
             # Tema nativo mantém cores após rerun
@@ -0,0 +1,54 @@
+"""
+Regras de Negócio para Avisos - Lógica pura sem interface
+
+Define o público de um aviso como regras (tipo, valor) em vez de uma lista
+fixa de destinatários. As regras são resolvidas no momento da leitura.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class RegrasAvisos:
+    """Regras de público dos avisos"""
+    
+    TIPOS_PUBLICO = ('todos', 'setor', 'funcao', 'usuario')
+    
+    @classmethod
+    def montar_regras_publico(cls, todos: bool = False, setores: Iterable[str] = None,
+                              funcoes: Iterable[str] = None, usuarios_ids: Iterable[int] = None) -> List[Tuple[str, str]]:
+        """
+        Converte os filtros do formulário em regras de público.
+        
+        Args:
+            todos: Aviso para todos os colaboradores
+            setores: Setores selecionados
+            funcoes: Funções selecionadas
+            usuarios_ids: IDs de usuários específicos
+            
+        Returns:
+            Lista de tuplas (tipo, valor) sem repetições; vazia se nenhum filtro foi informado
+        """
+        if todos:
+            return [('todos', '')]
+        
+        regras = [('setor', setor) for setor in (setores or [])]
+        regras += [('funcao', funcao) for funcao in (funcoes or [])]
+        regras += [('usuario', str(usuario_id)) for usuario_id in (usuarios_ids or [])]
+        return list(dict.fromkeys(regras))
+    
+    @classmethod
+    def validar_periodo(cls, publicar_em: datetime, expira_em: Optional[datetime]) -> Dict[str, Any]:
+        """
+        Valida o período de exibição de um aviso.
+        
+        Args:
+            publicar_em: Início da exibição
+            expira_em: Fim da exibição (None = sem expiração)
+            
+        Returns:
+            Dict com 'valido' e 'erro'
+        """
+        if expira_em is not None and expira_em <= publicar_em:
+            return {"valido": False, "erro": "A expiração deve ser posterior à publicação"}
+        return {"valido": True, "erro": None}
@@ -0,0 +1,151 @@
+"""
+Regras de Cobertura de Equipe - Lógica pura sem interface
+
+Calcula quantos colaboradores estão ausentes em cada dia a partir dos
+períodos de férias, usando um vetor de diferenças sobre o eixo de datas:
+cada período soma 1 no dia de início e subtrai 1 no dia seguinte ao fim, e
+a soma acumulada dá a contagem diária. O custo é linear no número de
+períodos mais o número de dias, independentemente da duração das férias.
+"""
+
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils.constants import MAX_AUSENTES_PADRAO, MAX_AUSENTES_POR_SETOR
+
+
+class RegrasCobertura:
+    """Ausências simultâneas por dia, picos e violações do limite por setor"""
+
+    @classmethod
+    def limite_setor(cls, setor: Optional[str], limites: Dict[str, int] = None) -> int:
+        """
+        Máximo de colaboradores ausentes ao mesmo tempo no setor.
+
+        Args:
+            setor: Nome do setor
+            limites: Limites por setor (padrão: MAX_AUSENTES_POR_SETOR)
+        """
+        limites = MAX_AUSENTES_POR_SETOR if limites is None else limites
+        return limites.get(setor, MAX_AUSENTES_PADRAO)
+
+    @classmethod
+    def ausencias_por_dia(cls, periodos: Iterable[Tuple[date, date]],
+                          inicio: date, fim: date) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Conta as ausências simultâneas em cada dia da janela.
+
+        Args:
+            periodos: Pares (data_inicio, data_fim), inclusivos
+            inicio: Primeiro dia da janela
+            fim: Último dia da janela
+
+        Returns:
+            Tupla (dias, contagem): datetime64[D] e inteiros, um por dia da janela
+        """
+        periodos = list(periodos)
+        dias, matriz = cls.ausencias_por_dia_grupo(periodos, [0] * len(periodos), 1, inicio, fim)
+        return dias, matriz[0]
+
+    @classmethod
+    def ausencias_por_dia_grupo(cls, periodos: Sequence[Tuple[date, date]], grupos: Sequence[int],
+                                total_grupos: int, inicio: date, fim: date) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Contagem diária separada por grupo (ex.: setor), em uma única passada.
+
+        Cada grupo ocupa uma linha do vetor de diferenças achatado, de modo que
+        um único bincount e uma soma acumulada por linha resolvem todos.
+
+        Args:
+            periodos: Pares (data_inicio, data_fim), inclusivos
+            grupos: Índice do grupo (0 .. total_grupos-1) de cada período
+            total_grupos: Quantidade de linhas da matriz
+            inicio: Primeiro dia da janela
+            fim: Último dia da janela
+
+        Returns:
+            Tupla (dias, matriz): datetime64[D] e matriz grupos x dias
+        """
+        primeiro = np.datetime64(inicio, 'D')
+        dias = np.arange(primeiro, np.datetime64(fim, 'D') + 1)
+        total_dias = len(dias)
+        largura = total_dias + 1
+
+        extremos = np.array(list(periodos), dtype='datetime64[D]').reshape(-1, 2)
+        if not total_dias or not len(extremos):
+            return dias, np.zeros((total_grupos, total_dias), dtype=np.int64)
+
+        # Deslocamentos relativos à janela; períodos fora dela são descartados
+        linhas = np.asarray(grupos, dtype=np.int64)
+        entradas = (extremos[:, 0] - primeiro).astype(np.int64)
+        saidas = (extremos[:, 1] - primeiro).astype(np.int64) + 1
+        dentro = (saidas > 0) & (entradas < total_dias) & (saidas > entradas)
+        base = linhas[dentro] * largura
+        entradas = base + np.clip(entradas[dentro], 0, total_dias)
+        saidas = base + np.clip(saidas[dentro], 0, total_dias)
+
+        tamanho = total_grupos * largura
+        diferencas = (np.bincount(entradas, minlength=tamanho)
+                      - np.bincount(saidas, minlength=tamanho)).reshape(total_grupos, largura)
+        return dias, np.cumsum(diferencas[:, :total_dias], axis=1)
+
+    @classmethod
+    def dias_pico(cls, dias: np.ndarray, contagem: np.ndarray, quantidade: int = 5) -> List[Dict[str, Any]]:
+        """
+        Dias com mais ausências (empates pelo dia mais próximo).
+
+        Returns:
+            Lista de dicts com dia e ausentes, apenas dias com alguma ausência
+        """
+        ordem = np.lexsort((dias, -contagem))[:quantidade]
+        return [
+            {"dia": dias[i].item(), "ausentes": int(contagem[i])}
+            for i in ordem if contagem[i] > 0
+        ]
+
+    @classmethod
+    def violacoes(cls, dias: np.ndarray, contagem: np.ndarray, limite: int) -> List[Dict[str, Any]]:
+        """
+        Intervalos contínuos em que as ausências excedem o limite.
+
+        Returns:
+            Lista de dicts com inicio, fim e pico de ausentes do intervalo
+        """
+        excedido = np.concatenate(([False], contagem > limite, [False]))
+        bordas = np.flatnonzero(np.diff(excedido.astype(np.int8)))
+
+        return [
+            {
+                "inicio": dias[entrada].item(),
+                "fim": dias[saida - 1].item(),
+                "pico": int(contagem[entrada:saida].max()),
+            }
+            for entrada, saida in zip(bordas[::2], bordas[1::2])
+        ]
+
+    @classmethod
+    def resumir(cls, periodos: Iterable[Tuple[date, date]], inicio: date, fim: date,
+                limite: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Contagem diária, picos e violações de uma janela.
+
+        Args:
+            periodos: Pares (data_inicio, data_fim)
+            inicio: Primeiro dia da janela
+            fim: Último dia da janela
+            limite: Máximo de ausentes; sem limite não há violações
+
+        Returns:
+            Dict com dias, ausentes, pico, dias_pico, limite e violacoes
+        """
+        dias, contagem = cls.ausencias_por_dia(periodos, inicio, fim)
+        return {
+            "dias": dias,
+            "ausentes": contagem,
+            "pico": int(contagem.max()) if len(contagem) else 0,
+            "dias_pico": cls.dias_pico(dias, contagem),
+            "limite": limite,
+            "violacoes": cls.violacoes(dias, contagem, limite) if limite is not None else [],
+        }
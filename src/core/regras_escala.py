@@ -0,0 +1,293 @@
+"""
+Regras de Escala Anual de Férias - Lógica pura sem interface
+
+Monta o plano anual de férias de cada setor respeitando o máximo de
+ausentes simultâneos e os períodos bloqueados:
+
+1. Guloso: colaboradores com menos opções preferidas escolhem primeiro a
+   melhor janela que ainda cabe na capacidade diária do setor.
+2. Busca local: quem ficou fora da preferência tenta uma janela melhor
+   realocando um único colega que a bloqueia, aceitando a troca apenas se a
+   satisfação total aumentar.
+
+As janelas candidatas de cada colaborador são avaliadas em bloco com somas
+acumuladas sobre o calendário do ano (ver RegrasPlanejamento).
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .regras_cobertura import RegrasCobertura
+from .regras_planejamento import RegrasPlanejamento
+
+
+class RegrasEscala:
+    """Plano anual de férias por setor com limite de cobertura"""
+
+    # Satisfação por posição da preferência (1ª, 2ª, 3ª ...; além disso, a última)
+    PESOS_PREFERENCIA = (1.0, 0.6, 0.3)
+
+    # Satisfação de uma janela fora das preferências (melhor que ficar sem férias)
+    PESO_FORA_PREFERENCIA = 0.05
+
+    # Desempate entre janelas equivalentes: aproveitamento de fins de semana/feriados
+    PESO_APROVEITAMENTO = 0.01
+
+    MAX_PASSADAS = 3
+    MAX_TENTATIVAS = 5
+
+    @classmethod
+    def peso_preferencia(cls, posicao: int) -> float:
+        """Satisfação de uma janela na preferência `posicao` (0 = primeira)"""
+        return cls.PESOS_PREFERENCIA[min(posicao, len(cls.PESOS_PREFERENCIA) - 1)]
+
+    @classmethod
+    def montar_escala(cls, ano: int, colaboradores: Iterable[Dict[str, Any]], limites: Dict[str, int],
+                      bloqueios: Iterable[Tuple[date, date, Optional[str]]] = (),
+                      ocupacao: Iterable[Tuple[str, date, date]] = (),
+                      inicio_minimo: date = None,
+                      permitir_fora_preferencia: bool = True) -> Dict[str, Any]:
+        """
+        Monta a escala do ano.
+
+        Args:
+            ano: Ano de início das férias
+            colaboradores: Dicts com id, setor, duracao (dias úteis), preferencias
+                           [(inicio, fim), ...] em ordem de prioridade e, opcionalmente,
+                           bloqueados [(inicio, fim)] (férias já cadastradas)
+            limites: Máximo de ausentes simultâneos por setor
+            bloqueios: Períodos sem férias (inicio, fim, setor); setor None = todos
+            ocupacao: Férias já cadastradas (setor, inicio, fim), que consomem capacidade
+            inicio_minimo: Primeiro início permitido (ex.: amanhã, no ano corrente)
+            permitir_fora_preferencia: Aloca fora das preferências quando nenhuma cabe
+
+        Returns:
+            Dict com alocacoes (id, setor, data_inicio, data_fim, dias_cobrados,
+            preferencia, satisfacao), nao_alocados (ids) e satisfacao média
+        """
+        primeiro_dia = date(ano, 1, 1)
+        ultimo_dia = date(ano, 12, 31) + timedelta(days=RegrasPlanejamento.MARGEM_DIAS)
+        calendario = RegrasPlanejamento.calendario(primeiro_dia, ultimo_dia)
+        dias, folga = calendario["dias"], calendario["folga"]
+        antes, depois = RegrasPlanejamento.folgas_adjacentes(folga)
+        soma_cobrados = np.concatenate(([0], np.cumsum(calendario["cobrado"], dtype=np.int64)))
+        inicio_minimo = max(inicio_minimo or primeiro_dia, primeiro_dia)
+        inicios_ano = np.flatnonzero(
+            ~folga & (dias <= np.datetime64(date(ano, 12, 31), 'D')) & (dias >= np.datetime64(inicio_minimo, 'D'))
+        )
+
+        contexto = {
+            "primeiro_dia": primeiro_dia,
+            "ultimo_dia": ultimo_dia,
+            "dias": dias,
+            "antes": antes,
+            "depois": depois,
+            "soma_cobrados": soma_cobrados,
+            "inicios": inicios_ano,
+            "fins": {},
+        }
+
+        por_setor: Dict[str, List[Dict[str, Any]]] = {}
+        for colaborador in colaboradores:
+            por_setor.setdefault(colaborador['setor'], []).append(colaborador)
+
+        bloqueios = list(bloqueios)
+        ocupacao = list(ocupacao)
+
+        alocacoes, nao_alocados = [], []
+        for setor, grupo in por_setor.items():
+            _, ocupados = RegrasCobertura.ausencias_por_dia(
+                [(inicio, fim) for setor_ocupacao, inicio, fim in ocupacao if setor_ocupacao == setor],
+                primeiro_dia, ultimo_dia
+            )
+            _, bloqueados = RegrasCobertura.ausencias_por_dia(
+                [(inicio, fim) for inicio, fim, setor_bloqueio in bloqueios if setor_bloqueio in (None, setor)],
+                primeiro_dia, ultimo_dia
+            )
+            capacidade = np.where(bloqueados > 0, 0, limites.get(setor, 0) - ocupados)
+
+            alocados, sem_vaga = cls._escalar_setor(grupo, capacidade, contexto, permitir_fora_preferencia)
+            alocacoes.extend(alocados)
+            nao_alocados.extend(sem_vaga)
+
+        total = len(alocacoes) + len(nao_alocados)
+        return {
+            "alocacoes": sorted(alocacoes, key=lambda a: (a['setor'], a['data_inicio'], a['id'])),
+            "nao_alocados": nao_alocados,
+            "satisfacao": round(sum(a['satisfacao'] for a in alocacoes) / total, 3) if total else 0.0,
+        }
+
+    @classmethod
+    def _candidatos(cls, colaborador: Dict[str, Any], contexto: Dict[str, Any],
+                    permitir_fora_preferencia: bool) -> Dict[str, np.ndarray]:
+        """Janelas possíveis do colaborador com a satisfação de cada uma"""
+        duracao = int(colaborador['duracao'])
+        inicios = contexto["inicios"]
+        soma_cobrados = contexto["soma_cobrados"]
+        total = len(contexto["dias"])
+
+        # Fins por duração são compartilhados entre colaboradores
+        fins = contexto["fins"].get(duracao)
+        if fins is None:
+            fins = np.searchsorted(soma_cobrados, soma_cobrados[inicios] + duracao, side='left') - 1
+            contexto["fins"][duracao] = fins
+
+        validos = fins < total - 1
+        fins = np.minimum(fins, total - 2)
+
+        if colaborador.get('bloqueados'):
+            _, proprias = RegrasCobertura.ausencias_por_dia(
+                colaborador['bloqueados'], contexto["primeiro_dia"], contexto["ultimo_dia"]
+            )
+            soma_proprias = np.concatenate(([0], np.cumsum(proprias > 0)))
+            validos &= (soma_proprias[fins + 1] - soma_proprias[inicios]) == 0
+
+        dias = contexto["dias"]
+        data_inicio, data_fim = dias[inicios], dias[fins]
+        satisfacao = np.full(len(inicios), -np.inf)
+        preferencia = np.full(len(inicios), -1, dtype=np.int64)
+        for posicao, (inicio_pref, fim_pref) in enumerate(colaborador.get('preferencias') or []):
+            dentro = (validos & (data_inicio >= np.datetime64(inicio_pref, 'D'))
+                      & (data_fim <= np.datetime64(fim_pref, 'D')))
+            melhor = dentro & (cls.peso_preferencia(posicao) > satisfacao)
+            satisfacao[melhor] = cls.peso_preferencia(posicao)
+            preferencia[melhor] = posicao
+
+        if permitir_fora_preferencia:
+            satisfacao[validos & (preferencia < 0)] = cls.PESO_FORA_PREFERENCIA
+
+        escolhidos = np.isfinite(satisfacao)
+        inicios, fins = inicios[escolhidos], fins[escolhidos]
+        descanso = (fins - inicios + 1) + contexto["antes"][inicios] + contexto["depois"][fins]
+        return {
+            "inicios": inicios,
+            "fins": fins,
+            "satisfacao": satisfacao[escolhidos],
+            "preferencia": preferencia[escolhidos],
+            "pontuacao": satisfacao[escolhidos] + cls.PESO_APROVEITAMENTO * descanso / duracao,
+        }
+
+    @classmethod
+    def _melhor_viavel(cls, candidatos: Dict[str, np.ndarray], carga: np.ndarray,
+                       capacidade: np.ndarray) -> Optional[int]:
+        """Índice da melhor janela sem nenhum dia na capacidade máxima (None se não há)"""
+        if not len(candidatos["inicios"]):
+            return None
+        soma_cheios = np.concatenate(([0], np.cumsum(carga >= capacidade)))
+        viaveis = (soma_cheios[candidatos["fins"] + 1] - soma_cheios[candidatos["inicios"]]) == 0
+        if not viaveis.any():
+            return None
+        return int(np.argmax(np.where(viaveis, candidatos["pontuacao"], -np.inf)))
+
+    @classmethod
+    def _escalar_setor(cls, grupo: List[Dict[str, Any]], capacidade: np.ndarray, contexto: Dict[str, Any],
+                       permitir_fora_preferencia: bool) -> Tuple[List[Dict[str, Any]], List[Any]]:
+        """Guloso seguido de busca local com realocação de um colega"""
+        candidatos = [cls._candidatos(colaborador, contexto, permitir_fora_preferencia) for colaborador in grupo]
+        melhor_possivel = np.array([c["pontuacao"].max() if len(c["pontuacao"]) else 0.0 for c in candidatos])
+        carga = np.zeros(len(capacidade), dtype=np.int64)
+        escolha: List[Optional[int]] = [None] * len(grupo)
+        inicio_alocado = np.full(len(grupo), -1, dtype=np.int64)
+        fim_alocado = np.full(len(grupo), -1, dtype=np.int64)
+
+        def alocar(indice, candidato):
+            escolha[indice] = candidato
+            if candidato is None:
+                inicio_alocado[indice] = fim_alocado[indice] = -1
+                return
+            inicio, fim = candidatos[indice]["inicios"][candidato], candidatos[indice]["fins"][candidato]
+            carga[inicio:fim + 1] += 1
+            inicio_alocado[indice], fim_alocado[indice] = inicio, fim
+
+        def liberar(indice):
+            candidato = escolha[indice]
+            if candidato is not None:
+                carga[inicio_alocado[indice]:fim_alocado[indice] + 1] -= 1
+            alocar(indice, None)
+            return candidato
+
+        def pontos(indice, candidato):
+            return 0.0 if candidato is None else float(candidatos[indice]["pontuacao"][candidato])
+
+        # 1. Guloso: menos opções preferidas primeiro
+        ordem = sorted(
+            range(len(grupo)),
+            key=lambda i: (int((candidatos[i]["preferencia"] >= 0).sum()), str(grupo[i]['id']))
+        )
+        for indice in ordem:
+            alocar(indice, cls._melhor_viavel(candidatos[indice], carga, capacidade))
+
+        # 2. Busca local: janela melhor liberada pela realocação de um colega
+        for _ in range(cls.MAX_PASSADAS):
+            melhorou = False
+            for indice in ordem:
+                atual = escolha[indice]
+                pontos_atual = pontos(indice, atual)
+                melhores = np.flatnonzero(candidatos[indice]["pontuacao"] > pontos_atual + 1e-9)
+                if not len(melhores):
+                    continue
+                melhores = melhores[np.argsort(-candidatos[indice]["pontuacao"][melhores])][:cls.MAX_TENTATIVAS]
+
+                liberar(indice)
+                trocou = False
+                for candidato in melhores:
+                    inicio, fim = candidatos[indice]["inicios"][candidato], candidatos[indice]["fins"][candidato]
+                    cheios = np.flatnonzero(carga[inicio:fim + 1] >= capacidade[inicio:fim + 1]) + inicio
+                    if not len(cheios):
+                        alocar(indice, int(candidato))
+                        trocou = True
+                        break
+                    if (capacidade[cheios] <= 0).any():
+                        continue
+
+                    # Colegas cuja saída libera todos os dias cheios
+                    bloqueadores = np.flatnonzero(
+                        (inicio_alocado >= 0) & (inicio_alocado <= cheios[0]) & (fim_alocado >= cheios[-1])
+                    )
+                    ganho_direto = pontos(indice, int(candidato)) - pontos_atual
+                    for colega in bloqueadores[:cls.MAX_TENTATIVAS]:
+                        # Nem a melhor janela do colega compensaria a perda
+                        if ganho_direto + melhor_possivel[colega] - pontos(colega, escolha[colega]) <= 1e-9:
+                            continue
+                        anterior_colega = liberar(colega)
+                        alocar(indice, int(candidato))
+                        novo_colega = cls._melhor_viavel(candidatos[colega], carga, capacidade)
+                        ganho = ganho_direto + pontos(colega, novo_colega) - pontos(colega, anterior_colega)
+                        if novo_colega is not None and ganho > 1e-9:
+                            alocar(colega, novo_colega)
+                            trocou = True
+                            break
+                        liberar(indice)
+                        alocar(colega, anterior_colega)
+                    if trocou:
+                        break
+
+                if trocou:
+                    melhorou = True
+                else:
+                    alocar(indice, atual)
+            if not melhorou:
+                break
+
+        dias = contexto["dias"]
+        soma_cobrados = contexto["soma_cobrados"]
+        alocacoes, nao_alocados = [], []
+        for indice, colaborador in enumerate(grupo):
+            candidato = escolha[indice]
+            if candidato is None:
+                nao_alocados.append(colaborador['id'])
+                continue
+            inicio, fim = int(inicio_alocado[indice]), int(fim_alocado[indice])
+            posicao = int(candidatos[indice]["preferencia"][candidato])
+            alocacoes.append({
+                "id": colaborador['id'],
+                "setor": colaborador['setor'],
+                "data_inicio": dias[inicio].item(),
+                "data_fim": dias[fim].item(),
+                "dias_cobrados": int(soma_cobrados[fim + 1] - soma_cobrados[inicio]),
+                "preferencia": posicao if posicao >= 0 else None,
+                "satisfacao": float(candidatos[indice]["satisfacao"][candidato]),
+            })
+        return alocacoes, nao_alocados
@@ -0,0 +1,170 @@
+"""
+Regras de Planejamento de Férias - Lógica pura sem interface
+
+Sugere períodos de férias que aproveitam fins de semana e feriados. O ano é
+pré-calculado como vetores (dia de folga, dia cobrado do saldo, conflito com
+a equipe) e somas acumuladas, de modo que cada combinação de início e
+duração é avaliada com poucas operações vetoriais, sem laços por dia.
+"""
+
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from ..utils.feriados import obter_feriados_nacionais
+from .regras_cobertura import RegrasCobertura
+
+
+class RegrasPlanejamento:
+    """Busca de janelas de férias com maior aproveitamento de folgas"""
+
+    # Penalidade por dia em que a equipe ficaria acima do limite de ausentes
+    PESO_CONFLITO = 1.0
+
+    # Dias além de 31/12 para férias que começam no fim do ano
+    MARGEM_DIAS = 60
+
+    @classmethod
+    def calendario(cls, inicio: date, fim: date) -> Dict[str, np.ndarray]:
+        """
+        Vetores diários do calendário.
+
+        Os dias cobrados seguem calcular_dias_uteis (segunda a sexta); feriados
+        e fins de semana são folgas que estendem as férias quando adjacentes.
+
+        Returns:
+            Dict com dias (datetime64[D]), folga e cobrado (bool)
+        """
+        dias = np.arange(np.datetime64(inicio, 'D'), np.datetime64(fim, 'D') + 1)
+        feriados = np.array(
+            [feriado for ano in range(inicio.year, fim.year + 1) for feriado in obter_feriados_nacionais(ano)],
+            dtype='datetime64[D]'
+        )
+        # 1970-01-01 foi quinta-feira: (dias + 3) % 7 dá 0 = segunda
+        dia_semana = (dias.astype(np.int64) + 3) % 7
+        cobrado = dia_semana < 5
+        return {
+            "dias": dias,
+            "folga": ~cobrado | np.isin(dias, feriados),
+            "cobrado": cobrado,
+        }
+
+    @classmethod
+    def folgas_adjacentes(cls, folga: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Folgas consecutivas imediatamente antes e depois de cada dia.
+
+        Returns:
+            Tupla (antes, depois) com um valor por dia
+        """
+        total = len(folga)
+        posicoes = np.arange(total)
+
+        # Último dia de trabalho até i (inclusive) e primeiro a partir de i
+        ultimo_trabalho = np.maximum.accumulate(np.where(folga, -1, posicoes))
+        proximo_trabalho = np.minimum.accumulate(np.where(folga, total, posicoes)[::-1])[::-1]
+
+        antes = np.zeros(total, dtype=np.int64)
+        antes[1:] = (posicoes - ultimo_trabalho)[:-1]
+        depois = np.zeros(total, dtype=np.int64)
+        depois[:-1] = (proximo_trabalho - posicoes)[1:]
+        return antes, depois
+
+    @classmethod
+    def sugerir(cls, ano: int, duracoes: Iterable[int], inicio_minimo: date = None,
+                periodos_bloqueados: Iterable[Tuple[date, date]] = (),
+                periodos_equipe: Iterable[Tuple[date, date]] = (), limite_equipe: int = None,
+                quantidade: int = 5) -> List[Dict[str, Any]]:
+        """
+        Melhores janelas de férias iniciadas no ano.
+
+        A pontuação é a quantidade de dias corridos de descanso (incluindo as
+        folgas adjacentes) por dia cobrado do saldo, menos PESO_CONFLITO por
+        dia em que a equipe ficaria acima do limite. Janelas sobrepostas a
+        uma sugestão melhor são descartadas.
+
+        Args:
+            ano: Ano de início das férias
+            duracoes: Quantidades de dias cobrados a considerar
+            inicio_minimo: Primeiro início permitido (antecedência mínima)
+            periodos_bloqueados: Férias já cadastradas do colaborador
+            periodos_equipe: Férias aprovadas dos colegas do setor
+            limite_equipe: Máximo de ausentes simultâneos no setor
+            quantidade: Quantidade de sugestões
+
+        Returns:
+            Lista de dicts com data_inicio, data_fim, dias_cobrados, descanso_inicio,
+            descanso_fim, dias_descanso, dias_conflito e pontuacao
+        """
+        duracoes = np.array(sorted({int(d) for d in duracoes if int(d) > 0}), dtype=np.int64)
+        if not len(duracoes):
+            return []
+
+        primeiro_dia = date(ano, 1, 1)
+        ultimo_dia = date(ano, 12, 31) + timedelta(days=cls.MARGEM_DIAS)
+        calendario = cls.calendario(primeiro_dia, ultimo_dia)
+        dias, folga, cobrado = calendario["dias"], calendario["folga"], calendario["cobrado"]
+        total = len(dias)
+
+        antes, depois = cls.folgas_adjacentes(folga)
+
+        # Somas acumuladas com zero inicial: soma de [s, e] = P[e + 1] - P[s]
+        def acumulada(vetor):
+            return np.concatenate(([0], np.cumsum(vetor, dtype=np.int64)))
+
+        soma_cobrados = acumulada(cobrado)
+        _, bloqueados = RegrasCobertura.ausencias_por_dia(periodos_bloqueados, primeiro_dia, ultimo_dia)
+        soma_bloqueados = acumulada(bloqueados > 0)
+        if limite_equipe is not None:
+            _, equipe = RegrasCobertura.ausencias_por_dia(periodos_equipe, primeiro_dia, ultimo_dia)
+            soma_conflitos = acumulada(equipe >= limite_equipe)
+        else:
+            soma_conflitos = np.zeros(total + 1, dtype=np.int64)
+
+        # Inícios: dias de trabalho do ano a partir do mínimo permitido
+        inicio_minimo = max(inicio_minimo or primeiro_dia, primeiro_dia)
+        no_ano = dias <= np.datetime64(date(ano, 12, 31), 'D')
+        inicios = np.flatnonzero(~folga & no_ano & (dias >= np.datetime64(inicio_minimo, 'D')))
+        if not len(inicios):
+            return []
+
+        # Fim de cada (início, duração): dia em que se completa a duração cobrada
+        alvo = soma_cobrados[inicios][:, None] + duracoes[None, :]
+        fins = np.searchsorted(soma_cobrados, alvo, side='left') - 1
+        validos = fins < total - 1
+        fins = np.minimum(fins, total - 2)
+
+        inicio_s = np.broadcast_to(inicios[:, None], fins.shape)
+        validos &= (soma_bloqueados[fins + 1] - soma_bloqueados[inicio_s]) == 0
+
+        descanso = (fins - inicio_s + 1) + antes[inicio_s] + depois[fins]
+        conflitos = soma_conflitos[fins + 1] - soma_conflitos[inicio_s]
+        pontuacao = descanso / duracoes[None, :] - cls.PESO_CONFLITO * conflitos
+        pontuacao = np.where(validos, pontuacao, -np.inf)
+
+        # Melhor pontuação; empates pelo menor conflito e início mais cedo
+        ordem = np.lexsort((inicio_s.ravel(), conflitos.ravel(), -pontuacao.ravel()))
+
+        sugestoes = []
+        ocupados = np.zeros(total, dtype=bool)
+        for posicao in ordem:
+            if len(sugestoes) >= quantidade or not np.isfinite(pontuacao.flat[posicao]):
+                break
+            inicio, fim = inicio_s.flat[posicao], fins.flat[posicao]
+            if ocupados[inicio:fim + 1].any():
+                continue
+            ocupados[inicio:fim + 1] = True
+
+            sugestoes.append({
+                "data_inicio": dias[inicio].item(),
+                "data_fim": dias[fim].item(),
+                "dias_cobrados": int(duracoes[posicao % len(duracoes)]),
+                "descanso_inicio": dias[inicio - antes[inicio]].item(),
+                "descanso_fim": dias[fim + depois[fim]].item(),
+                "dias_descanso": int(descanso.flat[posicao]),
+                "dias_conflito": int(conflitos.flat[posicao]),
+                "pontuacao": round(float(pontuacao.flat[posicao]), 2),
+            })
+
+        return sugestoes
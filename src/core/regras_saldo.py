@@ -165,4 +165,46 @@ class RegrasSaldo:
             "novo_saldo": novo_saldo,
             "operacao": operacao,
             "valor": valor
-        }
\ No newline at end of file
+        }
+    
+    @classmethod
+    def resumir_reconciliacao(cls, divergencias: list) -> Dict[str, Any]:
+        """
+        Resume o relatório de reconciliação de saldos.
+        
+        Args:
+            divergencias: Linhas com divergencia_cache (cache - extrato),
+                          divergencia_ferias (esperado - extrato) e setor;
+                          divergências None indicam colaborador sem extrato
+            
+        Returns:
+            Dict com totais gerais e por setor
+        """
+        resumo = {
+            "colaboradores": len(divergencias),
+            "sem_extrato": 0,
+            "divergencias_cache": 0,
+            "divergencias_ferias": 0,
+            "dias_cache": 0,
+            "dias_ferias": 0,
+            "por_setor": {}
+        }
+        
+        for linha in divergencias:
+            setor = resumo["por_setor"].setdefault(linha.get("setor"), {"colaboradores": 0, "dias_ferias": 0})
+            setor["colaboradores"] += 1
+            
+            cache = linha.get("divergencia_cache")
+            ferias = linha.get("divergencia_ferias")
+            if cache is None:
+                resumo["sem_extrato"] += 1
+                continue
+            if cache:
+                resumo["divergencias_cache"] += 1
+                resumo["dias_cache"] += cache
+            if ferias:
+                resumo["divergencias_ferias"] += 1
+                resumo["dias_ferias"] += ferias
+                setor["dias_ferias"] += ferias
+        
+        return resumo
@@ -1,87 +1,512 @@
 """
 Repositório de avisos
+
+O público de cada aviso é guardado como regras em avisos_publico
+(todos, setor, função ou usuário específico) e resolvido na leitura, de modo
+que colaboradores admitidos depois da publicação também recebem o aviso.
+As linhas de avisos_destinatarios guardam apenas o estado por usuário
+(lido/oculto) e são criadas na primeira interação.
 """
-import psycopg2
+import threading
+import time
+from collections import OrderedDict
+import psycopg2.extras
 from .base_connection import BaseConnection
 
+# Cache de avisos não lidos por usuário (compartilhado pelas sessões do processo).
+# Ajustado em leitura/ocultação; invalidado por publicação/exclusão ou por tempo.
+TTL_CACHE_NAO_LIDOS = 300  # segundos
+_cache_nao_lidos = {}
+_versao_avisos = 0
+_lock_cache = threading.Lock()
+
+# Cache de conteúdo dos avisos (LRU), invalidado na edição/exclusão
+TAMANHO_CACHE_CONTEUDO = 256
+_cache_conteudo = OrderedDict()
+
+def _invalidar_cache_nao_lidos():
+    """Descarta todas as contagens (novo aviso ou aviso excluído)"""
+    global _versao_avisos
+    with _lock_cache:
+        _versao_avisos += 1
+        _cache_nao_lidos.clear()
+
+def _ajustar_cache_nao_lidos(usuario_id, delta):
+    """Aplica delta à contagem em cache do usuário, se existir"""
+    with _lock_cache:
+        entrada = _cache_nao_lidos.get(usuario_id)
+        if entrada:
+            _cache_nao_lidos[usuario_id] = (max(0, entrada[0] + delta), entrada[1], entrada[2])
+
+# Pares (aviso, colaborador ativo) resultantes das regras de público
+_SQL_PUBLICO = """
+    SELECT DISTINCT p.aviso_id, u.id as usuario_id
+    FROM avisos_publico p
+    JOIN usuarios u ON u.ativo = true AND (
+           p.tipo = 'todos'
+        OR (p.tipo = 'setor' AND u.setor = p.valor)
+        OR (p.tipo = 'funcao' AND u.funcao = p.valor)
+        OR (p.tipo = 'usuario' AND u.id::text = p.valor)
+    )
+"""
+
+# Aviso `a` vigente: ativo, já publicado e não expirado
+_SQL_AVISO_VIGENTE = """
+    a.ativo = true AND a.publicar_em <= CURRENT_TIMESTAMP
+    AND (a.expira_em IS NULL OR a.expira_em > CURRENT_TIMESTAMP)
+"""
+
+# Aviso `a` visível para o usuário `eu` (match indexado em avisos_publico)
+_SQL_VISIVEL_USUARIO = """
+    EXISTS (
+        SELECT 1 FROM avisos_publico p
+        WHERE p.aviso_id = a.id AND (p.tipo, p.valor) IN (
+            ('todos', ''), ('setor', eu.setor), ('funcao', eu.funcao), ('usuario', eu.id::text)
+        )
+    )
+"""
+
+# Opções do trecho destacado nos resultados da busca (markdown)
+_OPCOES_TRECHO = 'StartSel=**, StopSel=**, MaxWords=30, MinWords=12, MaxFragments=2'
+
+# Contadores calculados a partir das regras e do estado por usuário (verificação/reparo)
+_SQL_CONTADORES_ESPERADOS = f"""
+    SELECT a.id as aviso_id,
+           COALESCE(pu.total, 0)::integer as total_destinatarios,
+           COALESCE(ad.lidos, 0)::integer as total_lidos,
+           COALESCE(ad.ocultos, 0)::integer as total_ocultos
+    FROM avisos a
+    LEFT JOIN (
+        SELECT aviso_id, COUNT(*) as total FROM ({_SQL_PUBLICO}) publico GROUP BY aviso_id
+    ) pu ON pu.aviso_id = a.id
+    LEFT JOIN (
+        SELECT ad.aviso_id,
+               COUNT(*) FILTER (WHERE ad.lido = true) as lidos,
+               COUNT(*) FILTER (WHERE COALESCE(ad.oculto, false)) as ocultos
+        FROM avisos_destinatarios ad
+        JOIN ({_SQL_PUBLICO}) publico
+          ON publico.aviso_id = ad.aviso_id AND publico.usuario_id = ad.usuario_id
+        GROUP BY ad.aviso_id
+    ) ad ON ad.aviso_id = a.id
+"""
+
 class AvisosRepository(BaseConnection):
     """Gerenciamento de avisos"""
     
-    def criar_aviso(self, titulo, conteudo, autor_id, destinatarios_ids):
-        """Cria um novo aviso e associa aos destinatários"""
+    def criar_estrutura(self):
+        """Cria contadores, regras de público, estado por usuário e arquivo; migra avisos antigos"""
+        self._execute_query("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                               WHERE table_name = 'avisos' AND column_name = 'total_destinatarios') THEN
+                    ALTER TABLE avisos ADD COLUMN total_destinatarios INTEGER,
+                                       ADD COLUMN total_lidos INTEGER,
+                                       ADD COLUMN total_ocultos INTEGER;
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                               WHERE table_name = 'avisos_destinatarios' AND column_name = 'oculto') THEN
+                    ALTER TABLE avisos_destinatarios ADD COLUMN oculto BOOLEAN DEFAULT false;
+                END IF;
+                -- Agendamento e expiração
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                               WHERE table_name = 'avisos' AND column_name = 'publicar_em') THEN
+                    ALTER TABLE avisos ADD COLUMN publicar_em TIMESTAMP, ADD COLUMN expira_em TIMESTAMP;
+                    UPDATE avisos SET publicar_em = data_criacao;
+                    ALTER TABLE avisos ALTER COLUMN publicar_em SET DEFAULT CURRENT_TIMESTAMP,
+                                       ALTER COLUMN publicar_em SET NOT NULL;
+                END IF;
+                -- Busca textual em português (coluna gerada + índice GIN)
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                               WHERE table_name = 'avisos' AND column_name = 'busca') THEN
+                    ALTER TABLE avisos ADD COLUMN busca tsvector GENERATED ALWAYS AS (
+                        setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') ||
+                        setweight(to_tsvector('portuguese', coalesce(conteudo, '')), 'B')
+                    ) STORED;
+                END IF;
+                -- Uma linha de estado por (aviso, usuário), criada sob demanda via upsert
+                IF NOT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'uq_avisos_destinatarios_aviso_usuario') THEN
+                    DELETE FROM avisos_destinatarios a
+                    USING avisos_destinatarios b
+                    WHERE a.aviso_id = b.aviso_id AND a.usuario_id = b.usuario_id AND a.id > b.id;
+                    DROP INDEX IF EXISTS idx_avisos_destinatarios_aviso;
+                    CREATE UNIQUE INDEX uq_avisos_destinatarios_aviso_usuario
+                        ON avisos_destinatarios (aviso_id, usuario_id);
+                END IF;
+            END;
+            $$;
+            DROP INDEX IF EXISTS idx_avisos_ativos_data;
+            CREATE INDEX IF NOT EXISTS idx_avisos_ativos_data_id ON avisos (data_criacao DESC, id DESC) WHERE ativo = true;
+            CREATE INDEX IF NOT EXISTS idx_avisos_vigentes ON avisos (publicar_em DESC, id DESC)
+                INCLUDE (expira_em) WHERE ativo = true;
+            CREATE INDEX IF NOT EXISTS idx_avisos_arquivaveis ON avisos (expira_em) WHERE expira_em IS NOT NULL;
+            CREATE INDEX IF NOT EXISTS idx_avisos_busca ON avisos USING GIN (busca);
+            CREATE INDEX IF NOT EXISTS idx_avisos_publico_regra ON avisos_publico (tipo, valor, aviso_id);
+            CREATE INDEX IF NOT EXISTS idx_avisos_publico_aviso ON avisos_publico (aviso_id)
+        """)
+        
+        # Arquivo de avisos expirados/excluídos (sem chaves estrangeiras: guarda histórico)
+        self._execute_query("""
+            CREATE TABLE IF NOT EXISTS avisos_arquivo (
+                id INTEGER PRIMARY KEY,
+                titulo TEXT NOT NULL,
+                conteudo TEXT NOT NULL,
+                autor_id INTEGER,
+                data_criacao TIMESTAMP,
+                publicar_em TIMESTAMP,
+                expira_em TIMESTAMP,
+                total_destinatarios INTEGER DEFAULT 0,
+                total_lidos INTEGER DEFAULT 0,
+                total_ocultos INTEGER DEFAULT 0,
+                regras_publico JSONB NOT NULL DEFAULT '[]'::jsonb,
+                motivo TEXT NOT NULL CHECK (motivo IN ('expirado', 'excluido')),
+                arquivado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE IF NOT EXISTS avisos_destinatarios_arquivo (
+                id INTEGER PRIMARY KEY,
+                aviso_id INTEGER NOT NULL,
+                usuario_id INTEGER,
+                lido BOOLEAN DEFAULT false,
+                data_leitura TIMESTAMP,
+                oculto BOOLEAN DEFAULT false
+            );
+            CREATE INDEX IF NOT EXISTS idx_avisos_destinatarios_arquivo_aviso ON avisos_destinatarios_arquivo (aviso_id)
+        """)
+        
+        # Os contadores acompanham admissões, mudanças de setor/função,
+        # inativações e exclusões (o público é resolvido na leitura): o
+        # colaborador que entra ou sai do público leva junto seu lido/oculto
+        self._execute_query("""
+            CREATE OR REPLACE FUNCTION usuarios_publico_avisos() RETURNS trigger AS $$
+            BEGIN
+                WITH antes AS (
+                    SELECT v.aviso_id, COALESCE(ad.lido, false) as lido, COALESCE(ad.oculto, false) as oculto
+                    FROM (
+                        SELECT DISTINCT p.aviso_id FROM avisos_publico p
+                        WHERE TG_OP IN ('UPDATE', 'DELETE') AND OLD.ativo IS TRUE
+                          AND (p.tipo, p.valor) IN (('todos', ''), ('setor', OLD.setor),
+                                                    ('funcao', OLD.funcao), ('usuario', OLD.id::text))
+                    ) v
+                    LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = v.aviso_id AND ad.usuario_id = OLD.id
+                ),
+                depois AS (
+                    SELECT v.aviso_id, COALESCE(ad.lido, false) as lido, COALESCE(ad.oculto, false) as oculto
+                    FROM (
+                        SELECT DISTINCT p.aviso_id FROM avisos_publico p
+                        WHERE TG_OP IN ('INSERT', 'UPDATE') AND NEW.ativo IS TRUE
+                          AND (p.tipo, p.valor) IN (('todos', ''), ('setor', NEW.setor),
+                                                    ('funcao', NEW.funcao), ('usuario', NEW.id::text))
+                    ) v
+                    LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = v.aviso_id AND ad.usuario_id = NEW.id
+                ),
+                delta AS (
+                    SELECT aviso_id, SUM(sinal) as destinatarios,
+                           SUM(sinal * lido::integer) as lidos,
+                           SUM(sinal * oculto::integer) as ocultos
+                    FROM (SELECT aviso_id, -1 as sinal, lido, oculto FROM antes
+                          UNION ALL
+                          SELECT aviso_id, 1, lido, oculto FROM depois) v
+                    GROUP BY aviso_id
+                    HAVING SUM(sinal) <> 0 OR SUM(sinal * lido::integer) <> 0
+                        OR SUM(sinal * oculto::integer) <> 0
+                )
+                UPDATE avisos a SET total_destinatarios = COALESCE(a.total_destinatarios, 0) + delta.destinatarios,
+                                    total_lidos = COALESCE(a.total_lidos, 0) + delta.lidos,
+                                    total_ocultos = COALESCE(a.total_ocultos, 0) + delta.ocultos
+                FROM delta
+                WHERE a.id = delta.aviso_id;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+            
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_usuarios_publico_avisos') THEN
+                    CREATE TRIGGER trg_usuarios_publico_avisos
+                        AFTER INSERT OR DELETE OR UPDATE OF ativo, setor, funcao ON usuarios
+                        FOR EACH ROW EXECUTE FUNCTION usuarios_publico_avisos();
+                END IF;
+            END;
+            $$
+        """)
+        
+        # Avisos antigos (sem regras): cada destinatário materializado vira regra de usuário
+        sem_regras = self._execute_query("""
+            SELECT EXISTS (
+                SELECT 1 FROM avisos a
+                WHERE NOT EXISTS (SELECT 1 FROM avisos_publico p WHERE p.aviso_id = a.id)
+            ) as pendente
+        """, fetch=True)
+        if sem_regras and sem_regras[0]['pendente']:
+            self._execute_query("""
+                INSERT INTO avisos_publico (aviso_id, tipo, valor)
+                SELECT DISTINCT ad.aviso_id, 'usuario', ad.usuario_id::text
+                FROM avisos_destinatarios ad
+                WHERE NOT EXISTS (SELECT 1 FROM avisos_publico p WHERE p.aviso_id = ad.aviso_id)
+            """)
+        
+        # Avisos criados antes dos contadores
+        pendentes = self._execute_query(
+            "SELECT EXISTS (SELECT 1 FROM avisos WHERE total_destinatarios IS NULL) as pendente", fetch=True
+        )
+        if pendentes and pendentes[0]['pendente']:
+            self.reparar_contadores_avisos()
+    
+    def contar_publico(self, regras):
+        """Conta os colaboradores ativos que atendem às regras (tipo, valor)"""
+        if not regras:
+            return 0
+        
+        tipos = [tipo for tipo, _ in regras]
+        valores = [valor for _, valor in regras]
+        result = self._execute_query("""
+            SELECT COUNT(*) as total
+            FROM usuarios u
+            WHERE u.ativo = true AND EXISTS (
+                SELECT 1 FROM unnest(%s::text[], %s::text[]) as r(tipo, valor)
+                WHERE r.tipo = 'todos'
+                   OR (r.tipo = 'setor' AND u.setor = r.valor)
+                   OR (r.tipo = 'funcao' AND u.funcao = r.valor)
+                   OR (r.tipo = 'usuario' AND u.id::text = r.valor)
+            )
+        """, (tipos, valores), fetch=True)
+        return result[0]['total'] if result else 0
+    
+    def criar_aviso(self, titulo, conteudo, autor_id, regras, publicar_em=None, expira_em=None):
+        """
+        Cria um novo aviso com as regras de público.
+        
+        Args:
+            regras: Lista de tuplas (tipo, valor) - ver RegrasAvisos.montar_regras_publico
+            publicar_em: Início da exibição (padrão: imediato)
+            expira_em: Fim da exibição (padrão: sem expiração)
+        """
+        # Tipos inválidos são barrados pelo CHECK de avisos_publico
+        regras = [(tipo, str(valor)) for tipo, valor in regras]
+        if not regras:
+            return False
+        
         try:
-            with psycopg2.connect(self.conn_str) as conn:
+            with self._connect() as conn:
                 with conn.cursor() as cur:
-                    # Inserir aviso
                     cur.execute("""
-                        INSERT INTO avisos (titulo, conteudo, autor_id) 
-                        VALUES (%s, %s, %s) RETURNING id
-                    """, (titulo, conteudo, autor_id))
+                        INSERT INTO avisos (titulo, conteudo, autor_id, publicar_em, expira_em,
+                                            total_destinatarios, total_lidos, total_ocultos)
+                        VALUES (%s, %s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s, 0, 0, 0) RETURNING id
+                    """, (titulo, conteudo, autor_id, publicar_em, expira_em))
                     
                     aviso_id = cur.fetchone()[0]
                     
-                    # Inserir destinatários
-                    for usuario_id in destinatarios_ids:
-                        cur.execute("""
-                            INSERT INTO avisos_destinatarios (aviso_id, usuario_id) 
-                            VALUES (%s, %s)
-                        """, (aviso_id, usuario_id))
+                    # Regras de público em uma única instrução
+                    cur.execute("""
+                        INSERT INTO avisos_publico (aviso_id, tipo, valor)
+                        SELECT %s, r.tipo, r.valor FROM unnest(%s::text[], %s::text[]) as r(tipo, valor)
+                    """, (aviso_id, [tipo for tipo, _ in regras], [valor for _, valor in regras]))
+                    
+                    # Público atual; depois o trigger de usuarios mantém o contador
+                    cur.execute(f"""
+                        UPDATE avisos SET total_destinatarios = (
+                            SELECT COUNT(*) FROM ({_SQL_PUBLICO} WHERE p.aviso_id = %s) publico
+                        )
+                        WHERE id = %s
+                    """, (aviso_id, aviso_id))
                     
                     conn.commit()
-                    return True
+            _invalidar_cache_nao_lidos()
+            return True
         except Exception as e:
             return False
     
-    def get_avisos_usuario(self, usuario_id):
-        """Obtém avisos para um usuário específico (apenas não ocultos)"""
-        # Garantir que a coluna oculto existe
-        self._execute_query("""
-            ALTER TABLE avisos_destinatarios ADD COLUMN IF NOT EXISTS oculto BOOLEAN DEFAULT false
-        """)
+    def get_avisos_usuario_pagina(self, usuario_id, limite=10, cursor=None):
+        """
+        Obtém uma página do resumo dos avisos do usuário (sem o conteúdo).
         
-        return self._execute_query("""
-            SELECT a.id, a.titulo, a.conteudo, a.data_criacao, 
-                   u.nome as autor_nome, ad.lido, ad.data_leitura
-            FROM avisos a
-            JOIN avisos_destinatarios ad ON a.id = ad.aviso_id
-            JOIN usuarios u ON a.autor_id = u.id
-            WHERE ad.usuario_id = %s AND a.ativo = true AND COALESCE(ad.oculto, false) = false
-            ORDER BY a.data_criacao DESC
+        Apenas avisos vigentes; paginação por chave (publicar_em, id) em ordem decrescente.
+        
+        Args:
+            cursor: Tupla (publicar_em, id) do último aviso da página anterior
+        """
+        filtro_cursor = "AND (a.publicar_em, a.id) < (%s, %s)" if cursor else ""
+        params = [usuario_id] + (list(cursor) if cursor else []) + [limite]
+        
+        return self._execute_query(f"""
+            SELECT a.id, a.titulo, a.publicar_em,
+                   autor.nome as autor_nome, COALESCE(ad.lido, false) as lido, ad.data_leitura
+            FROM usuarios eu
+            JOIN avisos a ON {_SQL_AVISO_VIGENTE} AND {_SQL_VISIVEL_USUARIO}
+            JOIN usuarios autor ON a.autor_id = autor.id
+            LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = a.id AND ad.usuario_id = eu.id
+            WHERE eu.id = %s AND COALESCE(ad.oculto, false) = false {filtro_cursor}
+            ORDER BY a.publicar_em DESC, a.id DESC
+            LIMIT %s
+        """, params, fetch=True)
+    
+    def get_conteudo_aviso(self, aviso_id, usuario_id):
+        """
+        Obtém o conteúdo de um aviso vigente e visível para o usuário.
+        
+        A visibilidade é conferida no banco a cada chamada; o cache (LRU)
+        evita apenas trafegar o corpo de avisos já carregados.
+        """
+        with _lock_cache:
+            conteudo = _cache_conteudo.get(aviso_id)
+            if conteudo is not None:
+                _cache_conteudo.move_to_end(aviso_id)
+        
+        result = self._execute_query(f"""
+            SELECT CASE WHEN %s THEN NULL ELSE a.conteudo END as conteudo
+            FROM usuarios eu
+            JOIN avisos a ON {_SQL_AVISO_VIGENTE} AND {_SQL_VISIVEL_USUARIO}
+            WHERE eu.id = %s AND a.id = %s
+        """, (conteudo is not None, usuario_id, aviso_id), fetch=True)
+        if not result:
+            return None
+        if conteudo is not None:
+            return conteudo
+        
+        conteudo = result[0]['conteudo']
+        with _lock_cache:
+            _cache_conteudo[aviso_id] = conteudo
+            if len(_cache_conteudo) > TAMANHO_CACHE_CONTEUDO:
+                _cache_conteudo.popitem(last=False)
+        return conteudo
+    
+    def contar_avisos_nao_lidos(self, usuario_id):
+        """Quantidade de avisos visíveis e não lidos do usuário (sem carregar conteúdo)"""
+        agora = time.monotonic()
+        with _lock_cache:
+            entrada = _cache_nao_lidos.get(usuario_id)
+            versao = _versao_avisos
+        if entrada and entrada[1] == versao and agora - entrada[2] < TTL_CACHE_NAO_LIDOS:
+            return entrada[0]
+        
+        result = self._execute_query(f"""
+            SELECT COUNT(*) as total
+            FROM usuarios eu
+            JOIN avisos a ON {_SQL_AVISO_VIGENTE} AND {_SQL_VISIVEL_USUARIO}
+            LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = a.id AND ad.usuario_id = eu.id
+            WHERE eu.id = %s AND COALESCE(ad.oculto, false) = false AND COALESCE(ad.lido, false) = false
         """, (usuario_id,), fetch=True)
+        if not result:
+            return 0
+        
+        total = result[0]['total']
+        with _lock_cache:
+            if _versao_avisos == versao:
+                _cache_nao_lidos[usuario_id] = (total, versao, agora)
+        return total
+    
+    def _gravar_estado(self, coluna, origem_sql, params, usuario_id):
+        """
+        Grava lido/oculto para os avisos de origem_sql em uma única instrução.
+        
+        Cria as linhas de estado que ainda não existem (upsert), altera apenas as
+        que mudam de valor e ajusta os contadores dos avisos afetados.
+        
+        Returns:
+            Lista de dicts (aviso_id, lido, oculto) alterados, ou False em caso de erro
+        """
+        contador = {'lido': 'total_lidos', 'oculto': 'total_ocultos'}[coluna]
+        lido = coluna == 'lido'
+        colunas_insert = "lido, data_leitura" if lido else "oculto"
+        valores_insert = "true, CURRENT_TIMESTAMP" if lido else "true"
+        data_leitura = ", data_leitura = CURRENT_TIMESTAMP" if lido else ""
+        
+        try:
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute(f"""
+                        WITH alterado AS (
+                            INSERT INTO avisos_destinatarios (aviso_id, usuario_id, {colunas_insert})
+                            SELECT origem.aviso_id, %s, {valores_insert} FROM ({origem_sql}) origem
+                            ON CONFLICT (aviso_id, usuario_id) DO UPDATE
+                            SET {coluna} = true{data_leitura}
+                            WHERE COALESCE(avisos_destinatarios.{coluna}, false) = false
+                            RETURNING aviso_id, COALESCE(lido, false) as lido, COALESCE(oculto, false) as oculto
+                        ),
+                        contadores AS (
+                            UPDATE avisos a SET {contador} = COALESCE(a.{contador}, 0) + al.quantidade
+                            FROM (SELECT aviso_id, COUNT(*) as quantidade FROM alterado GROUP BY aviso_id) al
+                            WHERE a.id = al.aviso_id
+                        )
+                        SELECT aviso_id, lido, oculto FROM alterado
+                    """, [usuario_id] + list(params))
+                    alterados = cur.fetchall()
+                    conn.commit()
+        except Exception as e:
+            return False
+        
+        # Cada aviso que deixou de estar visível e não lido sai da contagem em cache
+        if lido:
+            saiu_da_contagem = sum(1 for linha in alterados if not linha['oculto'])
+        else:
+            saiu_da_contagem = sum(1 for linha in alterados if not linha['lido'])
+        if saiu_da_contagem:
+            _ajustar_cache_nao_lidos(usuario_id, -saiu_da_contagem)
+        return alterados
+    
+    def _sql_avisos_visiveis(self):
+        """Origem de _gravar_estado: IDs informados restritos aos avisos vigentes e visíveis"""
+        return f"""
+            SELECT a.id as aviso_id
+            FROM usuarios eu
+            JOIN avisos a ON {_SQL_AVISO_VIGENTE} AND {_SQL_VISIVEL_USUARIO}
+            WHERE eu.id = %s AND a.id = ANY(%s::integer[])
+        """
+    
+    def marcar_avisos_lidos(self, avisos_ids, usuario_id):
+        """
+        Marca vários avisos como lidos para o usuário em uma única instrução.
+        
+        IDs de avisos arquivados, excluídos ou fora do público do usuário são
+        ignorados (não geram erro nem alteram contadores).
+        """
+        avisos_ids = list(dict.fromkeys(int(aviso_id) for aviso_id in avisos_ids))
+        if not avisos_ids:
+            return []
+        return self._gravar_estado('lido', self._sql_avisos_visiveis(), [usuario_id, avisos_ids], usuario_id)
+    
+    def marcar_todos_avisos_lidos(self, usuario_id):
+        """Marca como lidos todos os avisos visíveis para o usuário"""
+        return self._gravar_estado('lido', f"""
+            SELECT a.id as aviso_id
+            FROM usuarios eu
+            JOIN avisos a ON {_SQL_AVISO_VIGENTE} AND {_SQL_VISIVEL_USUARIO}
+            WHERE eu.id = %s
+        """, [usuario_id], usuario_id)
+    
+    def ocultar_avisos_usuario(self, avisos_ids, usuario_id):
+        """Oculta vários avisos para o usuário em uma única instrução (mesmo filtro de marcar_avisos_lidos)"""
+        avisos_ids = list(dict.fromkeys(int(aviso_id) for aviso_id in avisos_ids))
+        if not avisos_ids:
+            return []
+        return self._gravar_estado('oculto', self._sql_avisos_visiveis(), [usuario_id, avisos_ids], usuario_id)
     
     def marcar_aviso_lido(self, aviso_id, usuario_id):
-        """Marca um aviso como lido"""
-        return self._execute_query("""
-            UPDATE avisos_destinatarios 
-            SET lido = true, data_leitura = CURRENT_TIMESTAMP 
-            WHERE aviso_id = %s AND usuario_id = %s
-        """, (aviso_id, usuario_id))
+        """Marca um aviso como lido (criando o estado do usuário se necessário)"""
+        return bool(self.marcar_avisos_lidos([aviso_id], usuario_id))
     
     def get_avisos_admin(self):
-        """Obtém todos os avisos para administração"""
-        return self._execute_query("""
+        """Obtém os avisos vigentes para administração (contadores mantidos na escrita)"""
+        return self._execute_query(f"""
             SELECT a.id, a.titulo, a.data_criacao, u.nome as autor_nome,
-                   COUNT(ad.id) as total_destinatarios,
-                   COUNT(CASE WHEN ad.lido = true THEN 1 END) as total_lidos
+                   COALESCE(a.total_destinatarios, 0) as total_destinatarios,
+                   COALESCE(a.total_lidos, 0) as total_lidos,
+                   COALESCE(a.total_ocultos, 0) as total_ocultos
             FROM avisos a
             JOIN usuarios u ON a.autor_id = u.id
-            LEFT JOIN avisos_destinatarios ad ON a.id = ad.aviso_id
-            WHERE a.ativo = true
-            GROUP BY a.id, a.titulo, a.data_criacao, u.nome
+            WHERE {_SQL_AVISO_VIGENTE}
             ORDER BY a.data_criacao DESC
         """, fetch=True)
     
     def get_status_leitura_aviso(self, aviso_id):
         """Obtém status de leitura de um aviso específico"""
-        self._execute_query("""
-            ALTER TABLE avisos_destinatarios ADD COLUMN IF NOT EXISTS oculto BOOLEAN DEFAULT false
-        """)
-        
-        return self._execute_query("""
-            SELECT u.nome, u.setor, u.funcao, ad.lido, ad.data_leitura, COALESCE(ad.oculto, false) as oculto
-            FROM avisos_destinatarios ad
-            JOIN usuarios u ON ad.usuario_id = u.id
-            WHERE ad.aviso_id = %s
+        return self._execute_query(f"""
+            SELECT u.nome, u.setor, u.funcao, COALESCE(ad.lido, false) as lido, ad.data_leitura,
+                   COALESCE(ad.oculto, false) as oculto
+            FROM ({_SQL_PUBLICO} WHERE p.aviso_id = %s) publico
+            JOIN usuarios u ON u.id = publico.usuario_id
+            LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = publico.aviso_id AND ad.usuario_id = u.id
             ORDER BY u.nome
         """, (aviso_id,), fetch=True)
     
@@ -94,47 +519,244 @@ class AvisosRepository(BaseConnection):
     
     def atualizar_aviso(self, aviso_id, titulo, conteudo):
         """Atualiza um aviso"""
-        return self._execute_query("""
+        sucesso = self._execute_query("""
             UPDATE avisos SET titulo = %s, conteudo = %s WHERE id = %s
         """, (titulo, conteudo, aviso_id))
+        with _lock_cache:
+            _cache_conteudo.pop(aviso_id, None)
+        return sucesso
     
     def excluir_aviso(self, aviso_id):
         """Exclui um aviso (marca como inativo)"""
-        return self._execute_query("""
+        sucesso = self._execute_query("""
             UPDATE avisos SET ativo = false WHERE id = %s
         """, (aviso_id,))
+        _invalidar_cache_nao_lidos()
+        with _lock_cache:
+            _cache_conteudo.pop(aviso_id, None)
+        return sucesso
     
-    def get_matriz_leitura_avisos(self):
-        """Obtém matriz de leitura: todos os avisos ativos (incluindo ocultos pelos usuários)"""
-        # Primeiro garantir que a coluna oculto existe
-        self._execute_query("""
-            ALTER TABLE avisos_destinatarios ADD COLUMN IF NOT EXISTS oculto BOOLEAN DEFAULT false
-        """)
+    def buscar_avisos(self, termo, limite=20, offset=0):
+        """
+        Busca textual (português) nos avisos ativos, ordenada por relevância.
+        
+        O termo aceita a sintaxe de busca web ("frase exata", -excluir, OR).
+        Cada linha traz total_resultados para a paginação.
+        """
+        return self._execute_query(f"""
+            WITH resultado AS (
+                SELECT a.id, a.titulo, a.conteudo, a.data_criacao, a.autor_id,
+                       ts_rank_cd(a.busca, q.consulta) as relevancia,
+                       COUNT(*) OVER() as total_resultados,
+                       q.consulta
+                FROM avisos a, websearch_to_tsquery('portuguese', %s) q(consulta)
+                WHERE a.ativo = true AND a.busca @@ q.consulta
+                ORDER BY relevancia DESC, a.data_criacao DESC, a.id DESC
+                LIMIT %s OFFSET %s
+            )
+            SELECT r.id, r.titulo, r.data_criacao, autor.nome as autor_nome,
+                   ROUND(r.relevancia::numeric, 4) as relevancia, r.total_resultados,
+                   ts_headline('portuguese', r.conteudo, r.consulta, '{_OPCOES_TRECHO}') as trecho
+            FROM resultado r
+            JOIN usuarios autor ON autor.id = r.autor_id
+            ORDER BY r.relevancia DESC, r.data_criacao DESC, r.id DESC
+        """, (termo, limite, offset), fetch=True)
+    
+    def buscar_avisos_usuario(self, usuario_id, termo, limite=10, offset=0):
+        """Busca textual restrita aos avisos visíveis (e não ocultos) para o usuário"""
+        return self._execute_query(f"""
+            WITH resultado AS (
+                SELECT a.id, a.titulo, a.conteudo, a.publicar_em, a.autor_id,
+                       COALESCE(ad.lido, false) as lido, ad.data_leitura,
+                       ts_rank_cd(a.busca, q.consulta) as relevancia,
+                       COUNT(*) OVER() as total_resultados,
+                       q.consulta
+                FROM usuarios eu
+                CROSS JOIN websearch_to_tsquery('portuguese', %s) q(consulta)
+                JOIN avisos a ON {_SQL_AVISO_VIGENTE} AND a.busca @@ q.consulta AND {_SQL_VISIVEL_USUARIO}
+                LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = a.id AND ad.usuario_id = eu.id
+                WHERE eu.id = %s AND COALESCE(ad.oculto, false) = false
+                ORDER BY relevancia DESC, a.publicar_em DESC, a.id DESC
+                LIMIT %s OFFSET %s
+            )
+            SELECT r.id, r.titulo, r.publicar_em, autor.nome as autor_nome, r.lido, r.data_leitura,
+                   r.total_resultados,
+                   ts_headline('portuguese', r.conteudo, r.consulta, '{_OPCOES_TRECHO}') as trecho
+            FROM resultado r
+            JOIN usuarios autor ON autor.id = r.autor_id
+            ORDER BY r.relevancia DESC, r.publicar_em DESC, r.id DESC
+        """, (termo, usuario_id, limite, offset), fetch=True)
+    
+    def get_avisos_resumo_leitura(self, limite=10, offset=0):
+        """
+        Obtém uma página de avisos ativos com a taxa de leitura dos contadores.
         
+        Lê apenas avisos (índice de ativos por data); o público e o estado por
+        usuário só são percorridos no detalhamento por setor.
+        Cada linha traz total_avisos (total de avisos ativos) para a paginação.
+        """
         return self._execute_query("""
-            SELECT 
-                u.nome,
-                u.setor,
-                u.funcao,
-                a.id as aviso_id,
-                a.titulo,
-                COALESCE(ad.lido, false) as lido,
-                ad.data_leitura,
-                COALESCE(ad.oculto, false) as oculto
+            SELECT a.id as aviso_id, a.titulo, a.data_criacao, a.publicar_em, a.expira_em,
+                   CASE WHEN a.publicar_em > CURRENT_TIMESTAMP THEN 'Agendado'
+                        WHEN a.expira_em <= CURRENT_TIMESTAMP THEN 'Expirado'
+                        ELSE 'Vigente' END as situacao,
+                   COALESCE(a.total_destinatarios, 0) as total_destinatarios,
+                   COALESCE(a.total_lidos, 0) as total_lidos,
+                   COALESCE(a.total_ocultos, 0) as total_ocultos,
+                   ROUND(100.0 * COALESCE(a.total_lidos, 0) / NULLIF(a.total_destinatarios, 0), 1) as taxa_leitura,
+                   COUNT(*) OVER() as total_avisos
             FROM avisos a
-            JOIN avisos_destinatarios ad ON a.id = ad.aviso_id
-            JOIN usuarios u ON ad.usuario_id = u.id
-            WHERE a.ativo = true AND u.ativo = true
-            ORDER BY a.data_criacao DESC, u.nome
-        """, fetch=True)
+            WHERE a.ativo = true
+            ORDER BY a.data_criacao DESC, a.id DESC
+            LIMIT %s OFFSET %s
+        """, (limite, offset), fetch=True)
+    
+    def get_taxa_leitura_setores(self, aviso_id):
+        """Obtém a taxa de leitura de um aviso agrupada por setor"""
+        return self._execute_query(f"""
+            SELECT u.setor,
+                   COUNT(*) as total_destinatarios,
+                   COUNT(*) FILTER (WHERE ad.lido = true) as total_lidos,
+                   ROUND(100.0 * COUNT(*) FILTER (WHERE ad.lido = true) / COUNT(*), 1) as taxa_leitura
+            FROM ({_SQL_PUBLICO} WHERE p.aviso_id = %s) publico
+            JOIN usuarios u ON u.id = publico.usuario_id
+            LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = publico.aviso_id AND ad.usuario_id = u.id
+            GROUP BY u.setor
+            ORDER BY u.setor
+        """, (aviso_id,), fetch=True)
+    
+    def get_matriz_leitura_pagina(self, avisos_ids, limite=50, offset=0, setor=None):
+        """
+        Obtém uma janela da matriz de leitura: uma página de colaboradores
+        destinatários dos avisos informados.
+        
+        Cada linha traz o colaborador e o estado de leitura por aviso em
+        listas paralelas (avisos_ids/lidos), além de total_usuarios para a paginação.
+        """
+        if not avisos_ids:
+            return []
+        
+        filtro_setor = "AND u.setor = %s" if setor else ""
+        params = [list(avisos_ids)] + ([setor] if setor else []) + [limite, offset]
+        
+        return self._execute_query(f"""
+            SELECT u.id as usuario_id, u.nome, u.setor, u.funcao,
+                   array_agg(publico.aviso_id ORDER BY publico.aviso_id) as avisos_ids,
+                   array_agg(COALESCE(ad.lido, false) ORDER BY publico.aviso_id) as lidos,
+                   COUNT(*) OVER() as total_usuarios
+            FROM ({_SQL_PUBLICO} WHERE p.aviso_id = ANY(%s)) publico
+            JOIN usuarios u ON u.id = publico.usuario_id
+            LEFT JOIN avisos_destinatarios ad ON ad.aviso_id = publico.aviso_id AND ad.usuario_id = u.id
+            WHERE true {filtro_setor}
+            GROUP BY u.id, u.nome, u.setor, u.funcao
+            ORDER BY u.nome, u.id
+            LIMIT %s OFFSET %s
+        """, params, fetch=True)
     
     def remover_aviso_usuario(self, aviso_id, usuario_id):
-        """Oculta aviso da visualização do usuário"""
-        self._execute_query("""
-            ALTER TABLE avisos_destinatarios ADD COLUMN IF NOT EXISTS oculto BOOLEAN DEFAULT false
-        """)
+        """Oculta aviso da visualização do usuário (criando o estado se necessário)"""
+        return bool(self.ocultar_avisos_usuario([aviso_id], usuario_id))
+    
+    def arquivar_avisos(self, lote=100):
+        """
+        Move avisos expirados ou excluídos (e seu estado por usuário) para o arquivo.
         
-        return self._execute_query("""
-            UPDATE avisos_destinatarios SET oculto = true 
-            WHERE aviso_id = %s AND usuario_id = %s
-        """, (aviso_id, usuario_id))
\ No newline at end of file
+        Cada lote é uma única instrução: copia para avisos_arquivo e
+        avisos_destinatarios_arquivo e remove das tabelas ativas (as regras de
+        público são guardadas em JSON no próprio arquivo).
+        
+        Returns:
+            Quantidade de avisos arquivados, ou False se uma consulta falhar
+            (lotes anteriores à falha já ficam arquivados)
+        """
+        total = 0
+        while True:
+            arquivados = self._executar_lote_arquivo("""
+                WITH lote AS (
+                    SELECT id FROM avisos
+                    WHERE ativo = false OR expira_em <= CURRENT_TIMESTAMP
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ),
+                estado AS (
+                    INSERT INTO avisos_destinatarios_arquivo (id, aviso_id, usuario_id, lido, data_leitura, oculto)
+                    SELECT ad.id, ad.aviso_id, ad.usuario_id, ad.lido, ad.data_leitura, ad.oculto
+                    FROM avisos_destinatarios ad
+                    WHERE ad.aviso_id IN (SELECT id FROM lote)
+                ),
+                copiados AS (
+                    INSERT INTO avisos_arquivo (id, titulo, conteudo, autor_id, data_criacao, publicar_em, expira_em,
+                                                total_destinatarios, total_lidos, total_ocultos, regras_publico, motivo)
+                    SELECT a.id, a.titulo, a.conteudo, a.autor_id, a.data_criacao, a.publicar_em, a.expira_em,
+                           a.total_destinatarios, a.total_lidos, a.total_ocultos,
+                           (SELECT COALESCE(jsonb_agg(jsonb_build_object('tipo', p.tipo, 'valor', p.valor)), '[]'::jsonb)
+                            FROM avisos_publico p WHERE p.aviso_id = a.id),
+                           CASE WHEN a.ativo THEN 'expirado' ELSE 'excluido' END
+                    FROM avisos a
+                    WHERE a.id IN (SELECT id FROM lote)
+                    RETURNING id
+                )
+                DELETE FROM avisos WHERE id IN (SELECT id FROM copiados)
+                RETURNING id
+            """, (lote,))
+            
+            if arquivados is False:
+                if total:
+                    _invalidar_cache_nao_lidos()
+                return False
+            if not arquivados:
+                break
+            
+            total += len(arquivados)
+            with _lock_cache:
+                for linha in arquivados:
+                    _cache_conteudo.pop(linha['id'], None)
+            if len(arquivados) < lote:
+                break
+        
+        if total:
+            _invalidar_cache_nao_lidos()
+        return total
+    
+    def _executar_lote_arquivo(self, sql, params):
+        """Executa um lote do arquivamento; False em caso de erro (lista vazia = nada a arquivar)"""
+        try:
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute(sql, params)
+                    linhas = cur.fetchall()
+                    conn.commit()
+                    return linhas
+        except Exception:
+            return False
+    
+    def verificar_contadores_avisos(self):
+        """Lista avisos cujos contadores divergem das regras e do estado por usuário"""
+        return self._execute_query(f"""
+            WITH esperado AS ({_SQL_CONTADORES_ESPERADOS})
+            SELECT a.id, a.titulo,
+                   a.total_destinatarios, e.total_destinatarios as destinatarios_esperado,
+                   a.total_lidos, e.total_lidos as lidos_esperado,
+                   a.total_ocultos, e.total_ocultos as ocultos_esperado
+            FROM avisos a
+            JOIN esperado e ON e.aviso_id = a.id
+            WHERE a.total_destinatarios IS DISTINCT FROM e.total_destinatarios
+               OR a.total_lidos IS DISTINCT FROM e.total_lidos
+               OR a.total_ocultos IS DISTINCT FROM e.total_ocultos
+            ORDER BY a.id
+        """, fetch=True)
+    
+    def reparar_contadores_avisos(self):
+        """Recalcula os contadores divergentes a partir das regras e do estado por usuário"""
+        return self._execute_query(f"""
+            UPDATE avisos a
+            SET total_destinatarios = e.total_destinatarios,
+                total_lidos = e.total_lidos,
+                total_ocultos = e.total_ocultos
+            FROM ({_SQL_CONTADORES_ESPERADOS}) e
+            WHERE e.aviso_id = a.id
+              AND (a.total_destinatarios IS DISTINCT FROM e.total_destinatarios
+                   OR a.total_lidos IS DISTINCT FROM e.total_lidos
+                   OR a.total_ocultos IS DISTINCT FROM e.total_ocultos)
+        """)
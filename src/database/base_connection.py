@@ -1,24 +1,94 @@
 """
 Conexão base PostgreSQL
 """
+import time
 import streamlit as st
 import psycopg2
+import psycopg2.extensions
 import psycopg2.extras
 import urllib.parse
 
+# Observadores de queries (profiler, detector de N+1, etc.)
+_observadores_query = []
+
+
+def registrar_observador_query(observador):
+    """
+    Registra função chamada após cada query executada.
+
+    Args:
+        observador: Callable (query, params, duracao_segundos)
+    """
+    if observador not in _observadores_query:
+        _observadores_query.append(observador)
+
+
+def remover_observador_query(observador):
+    """Remove observador registrado"""
+    if observador in _observadores_query:
+        _observadores_query.remove(observador)
+
+
+def _notificar_query(query, params, duracao):
+    """Repassa a query executada aos observadores"""
+    for observador in list(_observadores_query):
+        try:
+            observador(query, params, duracao)
+        except Exception:
+            pass
+
+
+class _ExecucaoMonitorada:
+    """Mixin de cursor que mede o tempo de cada execute"""
+
+    def execute(self, query, vars=None):
+        if not _observadores_query:
+            return super().execute(query, vars)
+
+        inicio = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            _notificar_query(query, vars, time.perf_counter() - inicio)
+
+
+class _CursorMonitorado(_ExecucaoMonitorada, psycopg2.extensions.cursor):
+    pass
+
+
+class _RealDictCursorMonitorado(_ExecucaoMonitorada, psycopg2.extras.RealDictCursor):
+    pass
+
+
+class ConexaoMonitorada(psycopg2.extensions.connection):
+    """Conexão cujos cursores notificam os observadores de query"""
+
+    def cursor(self, *args, **kwargs):
+        factory = kwargs.get('cursor_factory')
+        if factory is None:
+            kwargs['cursor_factory'] = _CursorMonitorado
+        elif factory is psycopg2.extras.RealDictCursor:
+            kwargs['cursor_factory'] = _RealDictCursorMonitorado
+        return super().cursor(*args, **kwargs)
+
+
 class BaseConnection:
     """Classe base para conexão PostgreSQL"""
-    
+
     def __init__(self):
         # Construir connection string
         pg_config = st.secrets["connections"]["postgresql"]
         password_escaped = urllib.parse.quote_plus(pg_config['password'])
         self.conn_str = f"postgresql://{pg_config['username']}:{password_escaped}@{pg_config['host']}:{pg_config['port']}/{pg_config['database']}"
-    
+
+    def _connect(self):
+        """Abre conexão monitorada"""
+        return psycopg2.connect(self.conn_str, connection_factory=ConexaoMonitorada)
+
     def _execute_query(self, query, params=None, fetch=False):
         """Executa query simples"""
         try:
-            with psycopg2.connect(self.conn_str) as conn:
+            with self._connect() as conn:
                 with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
                     cur.execute(query, params)
                     if fetch:
@@ -26,4 +96,55 @@ class BaseConnection:
                     conn.commit()
                     return True
         except Exception as e:
-            return False if not fetch else []
\ No newline at end of file
+            return False if not fetch else []
+
+    def _consultar_pagina(self, sql_base, params, coluna, decrescente=False, cursor=None, limite=50, totais=""):
+        """
+        Página por chave (coluna, id) sobre uma consulta base.
+
+        A base deve expor `id` e a coluna de ordenação sem NULLs. O filtro do
+        cursor, a ordenação e o LIMIT são aplicados sobre a própria base
+        (subconsulta simples, incorporada pelo planejador), de modo que o
+        índice de (coluna, id) é usado em todas as páginas.
+
+        O total (e os agregados extras de `totais`, ex.: ", SUM(x) as total_x")
+        é calculado em uma consulta separada só na primeira página; as
+        seguintes o recebem pelo cursor. Os totais são repetidos em cada linha.
+
+        Args:
+            cursor: 'proximo' da página anterior (valor da coluna, id, totais)
+
+        Returns:
+            Dict com 'linhas', 'total' e 'proximo' (cursor da página seguinte ou None)
+        """
+        comparador, direcao = ('<', 'DESC') if decrescente else ('>', 'ASC')
+        chave = list(cursor[:2]) if cursor else []
+        totais_base = cursor[2] if cursor and len(cursor) > 2 else None
+        filtro_cursor = f"WHERE (b.{coluna}, b.id) {comparador} (%s, %s)" if chave else ""
+
+        linhas = self._execute_query(f"""
+            SELECT b.*
+            FROM ({sql_base}) b
+            {filtro_cursor}
+            ORDER BY b.{coluna} {direcao}, b.id {direcao}
+            LIMIT %s
+        """, list(params) + chave + [limite + 1], fetch=True) or []
+
+        if totais_base is None:
+            resultado = self._execute_query(f"""
+                SELECT COUNT(*) as total_registros{totais}
+                FROM ({sql_base}) b
+            """, list(params), fetch=True)
+            totais_base = dict(resultado[0]) if resultado else {"total_registros": 0}
+
+        linhas = [{**linha, **totais_base} for linha in linhas]
+        proximo = None
+        if len(linhas) > limite:
+            linhas = linhas[:limite]
+            proximo = (linhas[-1][coluna], linhas[-1]['id'], totais_base)
+
+        return {
+            "linhas": linhas,
+            "total": totais_base["total_registros"],
+            "proximo": proximo,
+        }
@@ -8,6 +8,8 @@ from .users_repository import UsersRepository
 from .ferias_repository import FeriasRepository
 from .avisos_repository import AvisosRepository
 from .renovacao_repository import RenovacaoRepository
+from .setor_stats_repository import SetorStatsRepository
+from .saldo_repository import SaldoRepository
 
 class DatabaseManager(BaseConnection):
     """Classe principal que combina todos os repositórios"""
@@ -21,6 +23,8 @@ class DatabaseManager(BaseConnection):
         self.ferias = FeriasRepository()
         self.avisos = AvisosRepository()
         self.renovacao = RenovacaoRepository()
+        self.setor_stats = SetorStatsRepository()
+        self.saldo = SaldoRepository()
         
         # Inicializar banco
         self.init_database()
@@ -49,6 +53,9 @@ class DatabaseManager(BaseConnection):
             ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS ativo BOOLEAN DEFAULT true
         """)
         
+        # Busca de colaboradores por nome (unaccent + pg_trgm, se disponíveis)
+        self.users.criar_estrutura()
+        
         # Criar tabela ferias
         self._execute_query("""
             CREATE TABLE IF NOT EXISTS ferias (
@@ -62,6 +69,14 @@ class DatabaseManager(BaseConnection):
             )
         """)
         
+        # Período (daterange) e restrição de férias sobrepostas
+        self.ferias.criar_estrutura()
+        
+        # Histórico de férias por colaborador (paginação por data de início)
+        self._execute_query("""
+            CREATE INDEX IF NOT EXISTS idx_ferias_usuario_inicio ON ferias (usuario_id, data_inicio DESC, id DESC)
+        """)
+        
         # Criar tabela avisos
         self._execute_query("""
             CREATE TABLE IF NOT EXISTS avisos (
@@ -70,7 +85,12 @@ class DatabaseManager(BaseConnection):
                 conteudo TEXT NOT NULL,
                 autor_id INTEGER REFERENCES usuarios(id),
                 data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ativo BOOLEAN DEFAULT true
+                ativo BOOLEAN DEFAULT true,
+                publicar_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                expira_em TIMESTAMP,
+                total_destinatarios INTEGER DEFAULT 0,
+                total_lidos INTEGER DEFAULT 0,
+                total_ocultos INTEGER DEFAULT 0
             )
         """)
         
@@ -86,6 +106,11 @@ class DatabaseManager(BaseConnection):
             )
         """)
         
+        # Índice do estado de leitura por colaborador
+        self._execute_query("""
+            CREATE INDEX IF NOT EXISTS idx_avisos_destinatarios_usuario ON avisos_destinatarios (usuario_id)
+        """)
+        
         # Criar tabela renovacao_saldo
         self._execute_query("""
             CREATE TABLE IF NOT EXISTS renovacao_saldo (
@@ -97,6 +122,28 @@ class DatabaseManager(BaseConnection):
             )
         """)
         
+        # Registro do acúmulo por aniversário de admissão
+        self.renovacao.criar_estrutura()
+        
+        # Extrato de saldo (movimentos somente de inclusão)
+        self.saldo.criar_estrutura()
+        
+        # Criar tabela avisos_publico (regras de público dos avisos)
+        self._execute_query("""
+            CREATE TABLE IF NOT EXISTS avisos_publico (
+                id SERIAL PRIMARY KEY,
+                aviso_id INTEGER REFERENCES avisos(id) ON DELETE CASCADE,
+                tipo TEXT NOT NULL CHECK (tipo IN ('todos', 'setor', 'funcao', 'usuario')),
+                valor TEXT NOT NULL DEFAULT ''
+            )
+        """)
+        
+        # Contadores, regras de público, arquivo e migração de avisos antigos
+        self.avisos.criar_estrutura()
+        
+        # Resumo por setor mantido por triggers
+        self.setor_stats.criar_estrutura()
+        
         # Criar admin se não existir
         self._create_admin_user()
     
@@ -124,6 +171,26 @@ class DatabaseManager(BaseConnection):
     def get_users(self, setor=None, incluir_inativos=False):
         return self.users.get_users(setor, incluir_inativos)
     
+    def listar_usuarios(self, status='ativos', setor=None, funcao=None, saldo_min=None, saldo_max=None,
+                        termo=None, ordenar_por=None, decrescente=False, limite=50, cursor=None):
+        return self.users.listar_usuarios(status, setor, funcao, saldo_min, saldo_max,
+                                          termo, ordenar_por, decrescente, limite, cursor)
+    
+    def buscar_usuarios(self, termo, limite=20, incluir_inativos=False, setor=None):
+        return self.users.buscar_usuarios(termo, limite, incluir_inativos, setor)
+    
+    def get_estatisticas_setores(self):
+        return self.users.get_estatisticas_setores()
+    
+    def get_setor_stats(self):
+        return self.setor_stats.get_setor_stats()
+    
+    def verificar_setor_stats(self):
+        return self.setor_stats.verificar_setor_stats()
+    
+    def reconstruir_setor_stats(self):
+        return self.setor_stats.reconstruir_setor_stats()
+    
     def create_user(self, nome, email, senha, setor, funcao, nivel_acesso="colaborador", saldo_ferias=12, data_admissao=None):
         return self.users.create_user(nome, email, senha, setor, funcao, nivel_acesso, saldo_ferias, data_admissao)
     
@@ -148,9 +215,24 @@ class DatabaseManager(BaseConnection):
     def add_ferias(self, usuario_id, data_inicio, data_fim, status="Pendente", usuario_nivel="colaborador"):
         return self.ferias.add_ferias(usuario_id, data_inicio, data_fim, status, usuario_nivel)
     
+    def add_ferias_lote(self, ferias):
+        return self.ferias.add_ferias_lote(ferias)
+    
     def get_ferias_usuario(self, usuario_id):
         return self.ferias.get_ferias_usuario(usuario_id)
     
+    def get_ferias_usuario_pagina(self, usuario_id, ordenar_por='data_inicio', decrescente=True, cursor=None, limite=25):
+        return self.ferias.get_ferias_usuario_pagina(usuario_id, ordenar_por, decrescente, cursor, limite)
+    
+    def get_conflitos_periodo(self, usuario_id, data_inicio, data_fim, ignorar_id=None):
+        return self.ferias.get_conflitos_periodo(usuario_id, data_inicio, data_fim, ignorar_id)
+    
+    def get_ausencias_periodo(self, data_inicio, data_fim, setor=None, incluir_pendentes=False, apenas_ativos=True):
+        return self.ferias.get_ausencias_periodo(data_inicio, data_fim, setor, incluir_pendentes, apenas_ativos)
+    
+    def listar_sobreposicoes_ferias(self):
+        return self.ferias.listar_sobreposicoes_ferias()
+    
     def get_all_ferias(self, status=None, data_inicio=None, data_fim=None):
         return self.ferias.get_all_ferias(status, data_inicio, data_fim)
     
@@ -160,15 +242,33 @@ class DatabaseManager(BaseConnection):
     def delete_ferias(self, ferias_id, usuario_responsavel_id=None):
         return self.ferias.delete_ferias(ferias_id, usuario_responsavel_id)
     
-    def criar_aviso(self, titulo, conteudo, autor_id, destinatarios_ids):
-        return self.avisos.criar_aviso(titulo, conteudo, autor_id, destinatarios_ids)
+    def criar_aviso(self, titulo, conteudo, autor_id, regras, publicar_em=None, expira_em=None):
+        return self.avisos.criar_aviso(titulo, conteudo, autor_id, regras, publicar_em, expira_em)
+    
+    def contar_publico(self, regras):
+        return self.avisos.contar_publico(regras)
+    
+    def get_avisos_usuario_pagina(self, usuario_id, limite=10, cursor=None):
+        return self.avisos.get_avisos_usuario_pagina(usuario_id, limite, cursor)
     
-    def get_avisos_usuario(self, usuario_id):
-        return self.avisos.get_avisos_usuario(usuario_id)
+    def get_conteudo_aviso(self, aviso_id, usuario_id):
+        return self.avisos.get_conteudo_aviso(aviso_id, usuario_id)
+    
+    def contar_avisos_nao_lidos(self, usuario_id):
+        return self.avisos.contar_avisos_nao_lidos(usuario_id)
     
     def marcar_aviso_lido(self, aviso_id, usuario_id):
         return self.avisos.marcar_aviso_lido(aviso_id, usuario_id)
     
+    def marcar_avisos_lidos(self, avisos_ids, usuario_id):
+        return self.avisos.marcar_avisos_lidos(avisos_ids, usuario_id)
+    
+    def marcar_todos_avisos_lidos(self, usuario_id):
+        return self.avisos.marcar_todos_avisos_lidos(usuario_id)
+    
+    def ocultar_avisos_usuario(self, avisos_ids, usuario_id):
+        return self.avisos.ocultar_avisos_usuario(avisos_ids, usuario_id)
+    
     def get_avisos_admin(self):
         return self.avisos.get_avisos_admin()
     
@@ -184,12 +284,33 @@ class DatabaseManager(BaseConnection):
     def excluir_aviso(self, aviso_id):
         return self.avisos.excluir_aviso(aviso_id)
     
-    def get_matriz_leitura_avisos(self):
-        return self.avisos.get_matriz_leitura_avisos()
+    def buscar_avisos(self, termo, limite=20, offset=0):
+        return self.avisos.buscar_avisos(termo, limite, offset)
+    
+    def buscar_avisos_usuario(self, usuario_id, termo, limite=10, offset=0):
+        return self.avisos.buscar_avisos_usuario(usuario_id, termo, limite, offset)
+    
+    def get_avisos_resumo_leitura(self, limite=10, offset=0):
+        return self.avisos.get_avisos_resumo_leitura(limite, offset)
+    
+    def get_taxa_leitura_setores(self, aviso_id):
+        return self.avisos.get_taxa_leitura_setores(aviso_id)
+    
+    def get_matriz_leitura_pagina(self, avisos_ids, limite=50, offset=0, setor=None):
+        return self.avisos.get_matriz_leitura_pagina(avisos_ids, limite, offset, setor)
     
     def remover_aviso_usuario(self, aviso_id, usuario_id):
         return self.avisos.remover_aviso_usuario(aviso_id, usuario_id)
     
+    def verificar_contadores_avisos(self):
+        return self.avisos.verificar_contadores_avisos()
+    
+    def reparar_contadores_avisos(self):
+        return self.avisos.reparar_contadores_avisos()
+    
+    def arquivar_avisos(self, lote=100):
+        return self.avisos.arquivar_avisos(lote)
+    
     def verificar_renovacao_ano(self, ano):
         return self.renovacao.verificar_renovacao_ano(ano)
     
@@ -202,8 +323,30 @@ class DatabaseManager(BaseConnection):
     def get_historico_renovacoes(self):
         return self.renovacao.get_historico_renovacoes()
     
+    def acumular_aniversarios(self, dias_anuais, saldo_maximo, ate=None, desde=None):
+        return self.renovacao.acumular_aniversarios(dias_anuais, saldo_maximo, ate, desde)
+    
+    def get_historico_acumulos(self, limite=100):
+        return self.renovacao.get_historico_acumulos(limite)
+    
     def desfazer_ultima_renovacao(self, usuario_responsavel_id):
         return self.renovacao.desfazer_ultima_renovacao(usuario_responsavel_id)
     
+    # Extrato de saldo
+    def get_saldo_em(self, usuario_id, momento):
+        return self.saldo.get_saldo_em(usuario_id, momento)
+    
+    def get_saldos_em(self, momento, setor=None):
+        return self.saldo.get_saldos_em(momento, setor)
+    
+    def get_extrato_pagina(self, usuario_id, cursor=None, limite=20):
+        return self.saldo.get_extrato_pagina(usuario_id, cursor, limite)
+    
+    def verificar_saldos(self):
+        return self.saldo.verificar_saldos()
+    
+    def reconciliar_saldos(self, aplicar=False, usuario_responsavel_id=None, usuario_responsavel_nome=None):
+        return self.saldo.reconciliar_saldos(aplicar, usuario_responsavel_id, usuario_responsavel_nome)
+    
     def close(self):
         pass
\ No newline at end of file
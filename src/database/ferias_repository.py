@@ -2,11 +2,97 @@
 Repositório de férias
 """
 import psycopg2
+import psycopg2.extras
 from .base_connection import BaseConnection
+from .saldo_repository import registrar_movimento
+
+# Observadores de alterações de férias (caches de mapas de ausência, etc.)
+_observadores_ferias = []
+
+def registrar_observador_ferias(observador):
+    """
+    Registra função chamada após cada inclusão, alteração ou exclusão de férias.
+    
+    Args:
+        observador: Callable (data_inicio, data_fim) do período afetado
+    """
+    if observador not in _observadores_ferias:
+        _observadores_ferias.append(observador)
+
+def _notificar_alteracao_ferias(data_inicio, data_fim):
+    """Repassa o período alterado aos observadores"""
+    for observador in list(_observadores_ferias):
+        try:
+            observador(data_inicio, data_fim)
+        except Exception:
+            pass
+
+# Férias que ocupam o período (canceladas/rejeitadas não bloqueiam novas datas).
+# Expressão IMMUTABLE: usada também no predicado da restrição de exclusão.
+def _sql_ocupa_periodo(coluna="status"):
+    return f"lower(COALESCE({coluna}, '')) NOT IN ('cancelada', 'cancelado', 'rejeitada', 'rejeitado')"
+
+def status_ocupa_periodo(status):
+    """Mesma regra de _sql_ocupa_periodo, para um status já lido"""
+    return (status or "").lower() not in ('cancelada', 'cancelado', 'rejeitada', 'rejeitado')
 
 class FeriasRepository(BaseConnection):
     """Gerenciamento de férias"""
     
+    def criar_estrutura(self):
+        """
+        Cria a coluna periodo (daterange) e a restrição que impede férias
+        sobrepostas do mesmo colaborador.
+        
+        A restrição precisa de btree_gist; sem a extensão (ou com sobreposições
+        antigas a corrigir) fica apenas o índice GiST e o bloqueio por
+        colaborador em add_ferias.
+        """
+        self._execute_query(f"""
+            DO $$
+            BEGIN
+                BEGIN
+                    CREATE EXTENSION IF NOT EXISTS btree_gist;
+                EXCEPTION WHEN OTHERS THEN
+                    RAISE NOTICE 'Restrição de sobreposição sem btree_gist: %', SQLERRM;
+                END;
+                
+                IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                               WHERE table_name = 'ferias' AND column_name = 'periodo') THEN
+                    ALTER TABLE ferias ADD COLUMN periodo daterange
+                        GENERATED ALWAYS AS (daterange(data_inicio, data_fim, '[]')) STORED;
+                END IF;
+                
+                IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'ferias_sem_sobreposicao') THEN
+                    CREATE INDEX IF NOT EXISTS idx_ferias_periodo ON ferias USING GIST (periodo);
+                    
+                    IF NOT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'btree_gist') THEN
+                        RETURN;
+                    END IF;
+                    
+                    IF EXISTS (
+                        SELECT 1 FROM ferias a
+                        JOIN ferias b ON b.usuario_id = a.usuario_id AND b.id > a.id AND b.periodo && a.periodo
+                        WHERE {_sql_ocupa_periodo('a.status')}
+                          AND {_sql_ocupa_periodo('b.status')}
+                    ) THEN
+                        RAISE NOTICE 'Férias sobrepostas existentes (manutencao.py ferias-sobrepostas); restrição não criada';
+                    ELSE
+                        ALTER TABLE ferias ADD CONSTRAINT ferias_sem_sobreposicao
+                            EXCLUDE USING GIST (usuario_id WITH =, periodo WITH &&)
+                            WHERE ({_sql_ocupa_periodo()});
+                    END IF;
+                END IF;
+            END;
+            $$
+        """)
+        
+        # Ausências aprovadas que tocam uma janela (quem está fora, mapas, cobertura)
+        self._execute_query("""
+            CREATE INDEX IF NOT EXISTS idx_ferias_aprovadas_periodo ON ferias USING GIST (periodo)
+            WHERE lower(status) IN ('aprovado', 'aprovada')
+        """)
+    
     def add_ferias(self, usuario_id, data_inicio, data_fim, status="Pendente", usuario_nivel="colaborador"):
         """Adiciona férias"""
         try:
@@ -14,95 +100,298 @@ class FeriasRepository(BaseConnection):
             from ..utils.calculos import calcular_dias_uteis
             dias_utilizados = calcular_dias_uteis(data_inicio, data_fim)
             
-            with psycopg2.connect(self.conn_str) as conn:
+            with self._connect() as conn:
                 with conn.cursor() as cur:
+                    # Serializa cadastros do mesmo colaborador e confere sobreposição na transação
+                    cur.execute("SELECT id FROM usuarios WHERE id = %s FOR UPDATE", (usuario_id,))
+                    cur.execute(f"""
+                        SELECT 1 FROM ferias
+                        WHERE usuario_id = %s AND periodo && daterange(%s, %s, '[]') AND {_sql_ocupa_periodo()}
+                        LIMIT 1
+                    """, (usuario_id, data_inicio, data_fim))
+                    if cur.fetchone():
+                        return False
+                    
                     # Inserir férias
                     cur.execute("""
                         INSERT INTO ferias (usuario_id, data_inicio, data_fim, dias_utilizados, status) 
                         VALUES (%s, %s, %s, %s, %s)
+                        RETURNING id
                     """, (usuario_id, data_inicio, data_fim, dias_utilizados, status))
+                    ferias_id = cur.fetchone()[0]
                     
-                    # Atualizar saldo se aprovada
+                    # Debitar saldo se aprovada
                     if status.lower() in ["aprovado", "aprovada"]:
-                        cur.execute("""
-                            UPDATE usuarios SET saldo_ferias = saldo_ferias - %s WHERE id = %s
-                        """, (dias_utilizados, usuario_id))
+                        registrar_movimento(cur, usuario_id, -dias_utilizados, 'ferias', ferias_id,
+                                            f"Férias {data_inicio:%d/%m/%Y} a {data_fim:%d/%m/%Y}")
                     
                     conn.commit()
-                    return True
+            _notificar_alteracao_ferias(data_inicio, data_fim)
+            return True
         except:
             return False
     
+    def add_ferias_lote(self, ferias):
+        """
+        Cadastra várias férias pendentes em uma única transação (escala anual).
+        
+        Períodos que se sobrepõem a férias já cadastradas do colaborador são
+        ignorados em vez de abortar o lote.
+        
+        Args:
+            ferias: Lista de tuplas (usuario_id, data_inicio, data_fim, dias_utilizados)
+            
+        Returns:
+            Lista de dicts (id, usuario_id, data_inicio, data_fim) cadastrados, ou False em caso de erro
+        """
+        if not ferias:
+            return []
+        
+        usuarios, inicios, fins, dias = (list(coluna) for coluna in zip(*ferias))
+        try:
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    # Mesma serialização por colaborador de add_ferias (ordem fixa evita deadlock)
+                    cur.execute(
+                        "SELECT id FROM usuarios WHERE id = ANY(%s) ORDER BY id FOR UPDATE",
+                        (sorted(set(usuarios)),)
+                    )
+                    cur.execute(f"""
+                        INSERT INTO ferias (usuario_id, data_inicio, data_fim, dias_utilizados, status)
+                        SELECT n.usuario_id, n.data_inicio, n.data_fim, n.dias_utilizados, 'Pendente'
+                        FROM unnest(%s::integer[], %s::date[], %s::date[], %s::integer[])
+                             as n(usuario_id, data_inicio, data_fim, dias_utilizados)
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM ferias f
+                            WHERE f.usuario_id = n.usuario_id
+                              AND f.periodo && daterange(n.data_inicio, n.data_fim, '[]')
+                              AND {_sql_ocupa_periodo('f.status')}
+                        )
+                        ON CONFLICT DO NOTHING
+                        RETURNING id, usuario_id, data_inicio, data_fim
+                    """, (usuarios, inicios, fins, dias))
+                    cadastradas = cur.fetchall()
+                    conn.commit()
+        except Exception:
+            return False
+        
+        if cadastradas:
+            _notificar_alteracao_ferias(min(f['data_inicio'] for f in cadastradas),
+                                        max(f['data_fim'] for f in cadastradas))
+        return cadastradas
+    
     def get_ferias_usuario(self, usuario_id):
         """Obtém férias do usuário"""
         return self._execute_query("SELECT * FROM ferias WHERE usuario_id = %s ORDER BY data_inicio DESC", (usuario_id,), fetch=True)
     
+    def get_ferias_usuario_pagina(self, usuario_id, ordenar_por='data_inicio', decrescente=True, cursor=None, limite=25):
+        """
+        Página do histórico de férias do usuário (paginação por chave).
+        
+        Args:
+            ordenar_por: 'data_inicio', 'dias_utilizados' ou 'status'
+            cursor: 'proximo' da página anterior
+            
+        Returns:
+            Dict com 'linhas', 'total' e 'proximo'; as linhas trazem também
+            total_dias_aprovados de todo o histórico
+        """
+        if ordenar_por not in ('data_inicio', 'dias_utilizados', 'status'):
+            raise ValueError(f"Ordenação inválida: {ordenar_por}")
+        
+        return self._consultar_pagina(
+            """
+                SELECT id, data_inicio, data_fim, dias_utilizados, COALESCE(status, 'Pendente') as status
+                FROM ferias
+                WHERE usuario_id = %s
+            """,
+            [usuario_id], ordenar_por, decrescente, cursor, limite,
+            totais=", COALESCE(SUM(dias_utilizados) FILTER (WHERE lower(status) IN ('aprovado', 'aprovada')), 0) as total_dias_aprovados"
+        )
+    
+    def get_conflitos_periodo(self, usuario_id, data_inicio, data_fim, ignorar_id=None):
+        """
+        Férias do colaborador que se sobrepõem ao período (extremos inclusivos).
+        
+        Usa o índice GiST de periodo; canceladas e rejeitadas são ignoradas.
+        
+        Args:
+            ignorar_id: Férias a desconsiderar (ex.: a própria, ao reativar)
+        """
+        return self._execute_query(f"""
+            SELECT id, data_inicio, data_fim, dias_utilizados, status
+            FROM ferias
+            WHERE usuario_id = %s
+              AND periodo && daterange(%s, %s, '[]')
+              AND {_sql_ocupa_periodo()}
+              AND id IS DISTINCT FROM %s
+            ORDER BY data_inicio
+        """, (usuario_id, data_inicio, data_fim, ignorar_id), fetch=True)
+    
+    def get_ausencias_periodo(self, data_inicio, data_fim, setor=None, incluir_pendentes=False, apenas_ativos=True):
+        """
+        Férias que tocam a janela (extremos inclusivos).
+        
+        Args:
+            setor: Restringe a um setor (None = empresa toda)
+            incluir_pendentes: Considera também as férias ainda não aprovadas
+            apenas_ativos: Ignora colaboradores inativos (False para histórico)
+        """
+        filtro_status = (
+            _sql_ocupa_periodo('f.status') if incluir_pendentes
+            else "lower(f.status) IN ('aprovado', 'aprovada')"
+        )
+        filtro_setor = "AND u.setor = %s" if setor else ""
+        params = (data_inicio, data_fim) + ((setor,) if setor else ())
+        
+        return self._execute_query(f"""
+            SELECT f.id, f.usuario_id, u.nome, u.setor, f.data_inicio, f.data_fim, f.status
+            FROM ferias f
+            JOIN usuarios u ON u.id = f.usuario_id
+            WHERE f.periodo && daterange(%s, %s, '[]')
+              AND {filtro_status}
+              {"AND u.ativo = true" if apenas_ativos else ""}
+              {filtro_setor}
+            ORDER BY u.setor, f.data_inicio
+        """, params, fetch=True)
+    
+    def listar_sobreposicoes_ferias(self):
+        """Pares de férias sobrepostas do mesmo colaborador (impedem a restrição de exclusão)"""
+        return self._execute_query(f"""
+            SELECT u.nome, a.id as ferias_id, a.data_inicio, a.data_fim, a.status,
+                   b.id as conflito_id, b.data_inicio as conflito_inicio, b.data_fim as conflito_fim,
+                   b.status as conflito_status
+            FROM ferias a
+            JOIN ferias b ON b.usuario_id = a.usuario_id AND b.id > a.id AND b.periodo && a.periodo
+            JOIN usuarios u ON u.id = a.usuario_id
+            WHERE {_sql_ocupa_periodo('a.status')}
+              AND {_sql_ocupa_periodo('b.status')}
+            ORDER BY u.nome, a.data_inicio
+        """, fetch=True)
+    
     def get_all_ferias(self, status=None, data_inicio=None, data_fim=None):
-        """Obtém todas as férias"""
-        return self._execute_query("""
+        """
+        Obtém todas as férias, opcionalmente filtradas.
+        
+        Args:
+            status: Status exato (sem diferenciar maiúsculas)
+            data_inicio: Férias que terminam a partir desta data
+            data_fim: Férias que começam até esta data
+        """
+        condicoes = []
+        params = []
+        if status:
+            condicoes.append("lower(f.status) = lower(%s)")
+            params.append(status)
+        if data_inicio or data_fim:
+            # Extremo ausente = janela aberta
+            condicoes.append("f.periodo && daterange(%s, %s, '[]')")
+            params.extend([data_inicio, data_fim])
+        
+        filtro = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        return self._execute_query(f"""
             SELECT f.*, u.nome as nome_usuario 
             FROM ferias f 
             JOIN usuarios u ON f.usuario_id = u.id 
+            {filtro}
             ORDER BY f.data_inicio DESC
-        """, fetch=True)
+        """, tuple(params) if params else None, fetch=True)
     
     def update_ferias_status(self, ferias_id, novo_status, usuario_responsavel_id=None):
-        """Atualiza status das férias"""
+        """
+        Atualiza status das férias.
+        
+        Reativar férias canceladas/rejeitadas passa pela mesma verificação de
+        sobreposição de add_ferias (com o colaborador bloqueado); havendo
+        conflito, retorna False sem alterar nada.
+        """
         try:
-            # Buscar férias atual
-            ferias_list = self._execute_query("SELECT usuario_id, dias_utilizados, status FROM ferias WHERE id = %s", (ferias_id,), fetch=True)
-            
-            if ferias_list:
-                ferias = ferias_list[0]
-                usuario_id = ferias['usuario_id']
-                dias_utilizados = ferias['dias_utilizados']
-                status_atual = ferias['status']
-                
-                with psycopg2.connect(self.conn_str) as conn:
-                    with conn.cursor() as cur:
-                        # Atualizar status
-                        cur.execute("UPDATE ferias SET status = %s WHERE id = %s", (novo_status, ferias_id))
-                        
-                        # Ajustar saldo
-                        status_atual_lower = status_atual.lower() if status_atual else ""
-                        novo_status_lower = novo_status.lower() if novo_status else ""
-                        
-                        # Se mudou de não-aprovado para aprovado
-                        if status_atual_lower not in ["aprovado", "aprovada"] and novo_status_lower in ["aprovado", "aprovada"]:
-                            cur.execute("UPDATE usuarios SET saldo_ferias = saldo_ferias - %s WHERE id = %s", (dias_utilizados, usuario_id))
-                        # Se mudou de aprovado para não-aprovado
-                        elif status_atual_lower in ["aprovado", "aprovada"] and novo_status_lower not in ["aprovado", "aprovada"]:
-                            cur.execute("UPDATE usuarios SET saldo_ferias = saldo_ferias + %s WHERE id = %s", (dias_utilizados, usuario_id))
-                        
-                        conn.commit()
-                        return True
-            return False
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    ferias = self._bloquear_ferias(cur, ferias_id)
+                    if not ferias:
+                        return False
+                    usuario_id = ferias['usuario_id']
+                    dias_utilizados = ferias['dias_utilizados']
+                    status_atual = ferias['status']
+                    
+                    # Confere sobreposição ao reativar
+                    if status_ocupa_periodo(novo_status):
+                        cur.execute(f"""
+                            SELECT 1 FROM ferias
+                            WHERE usuario_id = %s AND periodo && daterange(%s, %s, '[]') AND {_sql_ocupa_periodo()}
+                              AND id <> %s
+                            LIMIT 1
+                        """, (usuario_id, ferias['data_inicio'], ferias['data_fim'], ferias_id))
+                        if cur.fetchone():
+                            return False
+                    
+                    # Atualizar status
+                    cur.execute("UPDATE ferias SET status = %s WHERE id = %s", (novo_status, ferias_id))
+                    
+                    # Ajustar saldo
+                    status_atual_lower = status_atual.lower() if status_atual else ""
+                    novo_status_lower = novo_status.lower() if novo_status else ""
+                    
+                    motivo = (f"Férias {ferias['data_inicio']:%d/%m/%Y} a {ferias['data_fim']:%d/%m/%Y}: "
+                              f"{status_atual or 'Pendente'} -> {novo_status}")
+                    # Se mudou de não-aprovado para aprovado
+                    if status_atual_lower not in ["aprovado", "aprovada"] and novo_status_lower in ["aprovado", "aprovada"]:
+                        registrar_movimento(cur, usuario_id, -dias_utilizados, 'ferias', ferias_id, motivo,
+                                            usuario_responsavel_id)
+                    # Se mudou de aprovado para não-aprovado
+                    elif status_atual_lower in ["aprovado", "aprovada"] and novo_status_lower not in ["aprovado", "aprovada"]:
+                        registrar_movimento(cur, usuario_id, dias_utilizados, 'estorno', ferias_id, motivo,
+                                            usuario_responsavel_id)
+                    
+                    conn.commit()
+            _notificar_alteracao_ferias(ferias['data_inicio'], ferias['data_fim'])
+            return True
         except:
             return False
     
     def delete_ferias(self, ferias_id, usuario_responsavel_id=None):
         """Exclui férias"""
         try:
-            # Buscar férias antes de excluir
-            ferias_list = self._execute_query("SELECT usuario_id, dias_utilizados, status FROM ferias WHERE id = %s", (ferias_id,), fetch=True)
-            
-            if ferias_list:
-                ferias = ferias_list[0]
-                usuario_id = ferias['usuario_id']
-                dias_utilizados = ferias['dias_utilizados']
-                status = ferias['status']
-                
-                with psycopg2.connect(self.conn_str) as conn:
-                    with conn.cursor() as cur:
-                        # Excluir férias
-                        cur.execute("DELETE FROM ferias WHERE id = %s", (ferias_id,))
-                        
-                        # Se estava aprovada, devolver ao saldo
-                        if status.lower() in ["aprovado", "aprovada"]:
-                            cur.execute("UPDATE usuarios SET saldo_ferias = saldo_ferias + %s WHERE id = %s", (dias_utilizados, usuario_id))
-                        
-                        conn.commit()
-                        return True
-            return False
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    ferias = self._bloquear_ferias(cur, ferias_id)
+                    if not ferias:
+                        return False
+                    
+                    # Excluir férias
+                    cur.execute("DELETE FROM ferias WHERE id = %s", (ferias_id,))
+                    
+                    # Se estava aprovada, devolver ao saldo
+                    if (ferias['status'] or "").lower() in ["aprovado", "aprovada"]:
+                        registrar_movimento(
+                            cur, ferias['usuario_id'], ferias['dias_utilizados'], 'estorno', ferias_id,
+                            f"Exclusão das férias {ferias['data_inicio']:%d/%m/%Y} a {ferias['data_fim']:%d/%m/%Y}",
+                            usuario_responsavel_id
+                        )
+                    
+                    conn.commit()
+            _notificar_alteracao_ferias(ferias['data_inicio'], ferias['data_fim'])
+            return True
         except:
-            return False
\ No newline at end of file
+            return False
+    
+    def _bloquear_ferias(self, cur, ferias_id):
+        """
+        Bloqueia o colaborador e as férias e relê a linha na transação.
+        
+        O débito/estorno parte do status lido com a linha bloqueada: duas
+        aprovações simultâneas (ou clique duplo) não debitam duas vezes.
+        A ordem dos locks (usuário, férias) é a mesma de add_ferias.
+        """
+        cur.execute("""
+            SELECT id FROM usuarios
+            WHERE id = (SELECT usuario_id FROM ferias WHERE id = %s)
+            FOR UPDATE
+        """, (ferias_id,))
+        cur.execute("""
+            SELECT usuario_id, data_inicio, data_fim, dias_utilizados, status
+            FROM ferias WHERE id = %s
+            FOR UPDATE
+        """, (ferias_id,))
+        return cur.fetchone()
\ No newline at end of file
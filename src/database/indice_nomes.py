@@ -0,0 +1,101 @@
+"""
+Índice de nomes sem acento - trigramas em memória
+
+Usado pela busca de colaboradores quando o banco não tem as extensões
+unaccent/pg_trgm. Segue a mesma ideia do pg_trgm: cada palavra normalizada é completada com espaços ("  joao ")
+e quebrada em trigramas; a similaridade é a fração de trigramas em comum.
+"""
+
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Set, Tuple
+
+_RE_NAO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+
+def normalizar_nome(texto) -> str:
+    """Minúsculas, sem acentos e com espaços simples ("João  D'Ávila" -> "joao d avila")"""
+    if not texto:
+        return ""
+    sem_acento = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    return _RE_NAO_ALFANUMERICO.sub(" ", sem_acento.lower()).strip()
+
+
+def trigramas(texto: str) -> Set[str]:
+    """Trigramas das palavras de um texto já normalizado"""
+    resultado = set()
+    for palavra in texto.split():
+        completa = f"  {palavra} "
+        resultado.update(completa[i:i + 3] for i in range(len(completa) - 2))
+    return resultado
+
+
+class IndiceNomes:
+    """Índice invertido trigrama -> ids, com ranking por prefixo e similaridade"""
+
+    def __init__(self, registros: Iterable[Tuple[int, str]] = ()):
+        self._nomes: Dict[int, str] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        for registro_id, nome in registros:
+            self.adicionar(registro_id, nome)
+
+    def __len__(self) -> int:
+        return len(self._nomes)
+
+    def adicionar(self, registro_id: int, nome: str):
+        """Inclui (ou substitui) um nome no índice"""
+        self.remover(registro_id)
+        normalizado = normalizar_nome(nome)
+        self._nomes[registro_id] = normalizado
+        for trigrama in trigramas(normalizado):
+            self._postings.setdefault(trigrama, set()).add(registro_id)
+
+    def remover(self, registro_id: int):
+        """Retira um nome do índice"""
+        normalizado = self._nomes.pop(registro_id, None)
+        if normalizado is None:
+            return
+        for trigrama in trigramas(normalizado):
+            ids = self._postings.get(trigrama)
+            if ids:
+                ids.discard(registro_id)
+                if not ids:
+                    del self._postings[trigrama]
+
+    def buscar(self, termo: str, limite: int = 20, similaridade_minima: float = 0.3) -> List[int]:
+        """
+        Busca nomes parecidos com o termo.
+
+        Ordem: nomes que começam pelo termo, depois os que o contêm, depois
+        os mais similares (tolerando erros de digitação).
+
+        Args:
+            termo: Texto digitado (acentos e caixa são ignorados)
+            limite: Máximo de resultados
+            similaridade_minima: Fração mínima dos trigramas do termo encontrada no nome
+
+        Returns:
+            Lista de ids ordenada por relevância
+        """
+        consulta = normalizar_nome(termo)
+        if not consulta:
+            return []
+
+        trigramas_consulta = trigramas(consulta)
+        contagem: Dict[int, int] = {}
+        for trigrama in trigramas_consulta:
+            for registro_id in self._postings.get(trigrama, ()):
+                contagem[registro_id] = contagem.get(registro_id, 0) + 1
+
+        candidatos = []
+        for registro_id, comuns in contagem.items():
+            nome = self._nomes[registro_id]
+            similaridade = comuns / len(trigramas_consulta)
+            contem = consulta in nome
+            if not contem and similaridade < similaridade_minima:
+                continue
+            prefixo = nome.startswith(consulta) or f" {consulta}" in f" {nome}"
+            candidatos.append((not prefixo, not contem, -similaridade, nome, registro_id))
+
+        candidatos.sort()
+        return [candidato[-1] for candidato in candidatos[:limite]]
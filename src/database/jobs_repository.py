@@ -0,0 +1,161 @@
+"""
+Repositório de rotinas agendadas (jobs)
+
+Histórico de execuções e advisory locks do PostgreSQL: um lock de líder,
+mantido por uma conexão dedicada enquanto o processo agenda as rotinas, e
+um lock por rotina, que impede a mesma rotina de rodar em paralelo (ex.:
+agendador do app e script de manutenção ao mesmo tempo).
+"""
+import json
+from contextlib import contextmanager
+import psycopg2.extras
+from .base_connection import BaseConnection
+
+# Classes dos advisory locks de dois inteiros (classe, objeto)
+CLASSE_LOCK_LIDER = 480001
+CLASSE_LOCK_JOB = 480002
+
+class JobsRepository(BaseConnection):
+    """Histórico e coordenação das rotinas agendadas"""
+
+    def criar_estrutura(self):
+        """Tabela de execuções das rotinas"""
+        self._execute_query("""
+            CREATE TABLE IF NOT EXISTS jobs_execucoes (
+                id SERIAL PRIMARY KEY,
+                job TEXT NOT NULL,
+                inicio TIMESTAMP NOT NULL,
+                fim TIMESTAMP NOT NULL,
+                duracao_ms INTEGER NOT NULL,
+                sucesso BOOLEAN NOT NULL,
+                resultado JSONB,
+                erro TEXT,
+                executor TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_execucoes_job_inicio ON jobs_execucoes (job, inicio DESC)
+        """)
+
+    def adquirir_lider(self):
+        """
+        Tenta se tornar o líder do agendamento (pg_try_advisory_lock).
+
+        O lock pertence à sessão: a conexão retornada deve ficar aberta
+        enquanto o processo for líder e ser fechada para liberá-lo.
+
+        Returns:
+            Conexão que detém o lock, ou None se outro processo é o líder
+        """
+        conn = None
+        try:
+            conn = self._connect()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_lock(%s, 0)", (CLASSE_LOCK_LIDER,))
+                if cur.fetchone()[0]:
+                    return conn
+        except Exception:
+            pass
+        if conn is not None:
+            conn.close()
+        return None
+
+    def lider_ativo(self, conn):
+        """Confere se a conexão do líder continua aberta (o lock some com ela)"""
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    @contextmanager
+    def lock_job(self, job):
+        """
+        Lock exclusivo da rotina durante a execução.
+
+        Yields:
+            True se o lock foi obtido, False se a rotina já roda em outro processo
+        """
+        conn = None
+        obtido = False
+        try:
+            conn = self._connect()
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_try_advisory_lock(%s, hashtext(%s))", (CLASSE_LOCK_JOB, job))
+                obtido = cur.fetchone()[0]
+        except Exception:
+            if conn is not None:
+                conn.close()
+            conn = None
+        try:
+            yield obtido
+        finally:
+            if conn is not None:
+                # Fechar a sessão libera o lock
+                conn.close()
+
+    def registrar_execucao(self, job, inicio, fim, duracao_ms, sucesso, resultado=None, erro=None, executor=None):
+        """Grava uma execução no histórico"""
+        return self._execute_query("""
+            INSERT INTO jobs_execucoes (job, inicio, fim, duracao_ms, sucesso, resultado, erro, executor)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (job, inicio, fim, duracao_ms, sucesso,
+              json.dumps(resultado, default=str) if resultado is not None else None, erro, executor))
+
+    def get_ultimas_execucoes(self, job=None):
+        """
+        Última execução de cada rotina (define quando rodar de novo).
+
+        Args:
+            job: Restringe a uma rotina
+
+        Returns:
+            Lista de execuções, ou None se a consulta falhar (sem histórico não
+            se sabe o que está vencido)
+        """
+        filtro_job = "WHERE job = %s" if job else ""
+        try:
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute(f"""
+                        SELECT DISTINCT ON (job) job, inicio, fim, duracao_ms, sucesso, erro, executor
+                        FROM jobs_execucoes
+                        {filtro_job}
+                        ORDER BY job, inicio DESC
+                    """, (job,) if job else None)
+                    return cur.fetchall()
+        except Exception:
+            return None
+
+    def get_execucoes(self, job=None, limite=100):
+        """Histórico de execuções, mais recentes primeiro"""
+        if job:
+            return self._execute_query("""
+                SELECT * FROM jobs_execucoes WHERE job = %s ORDER BY inicio DESC LIMIT %s
+            """, (job, limite), fetch=True)
+        return self._execute_query("""
+            SELECT * FROM jobs_execucoes ORDER BY inicio DESC LIMIT %s
+        """, (limite,), fetch=True)
+
+    def get_metricas_jobs(self, dias=30):
+        """Execuções, falhas e tempos (médio, p95, máximo) de cada rotina no período"""
+        return self._execute_query("""
+            SELECT job,
+                   COUNT(*) as execucoes,
+                   COUNT(*) FILTER (WHERE NOT sucesso) as falhas,
+                   ROUND(AVG(duracao_ms)) as duracao_media_ms,
+                   ROUND(percentile_cont(0.95) WITHIN GROUP (ORDER BY duracao_ms)::numeric) as duracao_p95_ms,
+                   MAX(duracao_ms) as duracao_max_ms,
+                   MAX(inicio) as ultima_execucao
+            FROM jobs_execucoes
+            WHERE inicio >= CURRENT_TIMESTAMP - make_interval(days => %s)
+            GROUP BY job
+            ORDER BY job
+        """, (dias,), fetch=True)
+
+    def limpar_execucoes(self, dias=90):
+        """Remove o histórico mais antigo que `dias`"""
+        return self._execute_query("""
+            DELETE FROM jobs_execucoes WHERE inicio < CURRENT_TIMESTAMP - make_interval(days => %s)
+        """, (dias,))
@@ -2,11 +2,107 @@
 Repositório de renovação de saldo
 """
 from datetime import date
+import psycopg2.extras
 from .base_connection import BaseConnection
 
+# Serializa execuções concorrentes do acúmulo (pg_advisory_xact_lock)
+CHAVE_LOCK_ACUMULO = 470001
+
+# Acúmulo por aniversário de admissão em uma única instrução:
+# 1. aniversários de colaboradores ativos em (desde, ate], com recuperação de
+#    dias sem execução (desde padrão: último aniversário registrado);
+# 2. crédito proporcional ao período desde o aniversário anterior ou desde a
+#    última renovação anual (o que for mais recente);
+# 3. teto SALDO_MAXIMO aplicado sobre a soma acumulada de cada colaborador;
+# 4. registro em acumulo_aniversario (único por colaborador/aniversário, o
+#    que torna a execução idempotente) e crédito no extrato só dos inseridos.
+SQL_ACUMULAR_ANIVERSARIOS = """
+    WITH parametros AS (
+        SELECT %(ate)s::date AS ate,
+               COALESCE(%(desde)s::date,
+                        (SELECT max(data_aniversario) FROM acumulo_aniversario),
+                        %(ate)s::date - 1) AS desde,
+               (SELECT max(data_aplicacao)::date FROM renovacao_saldo) AS ultima_renovacao
+    ),
+    aniversarios AS (
+        SELECT u.id AS usuario_id, u.saldo_ferias, a.aniversario,
+               GREATEST((a.aniversario - interval '1 year')::date, p.ultima_renovacao) AS inicio_periodo,
+               a.aniversario - (a.aniversario - interval '1 year')::date AS dias_ano
+        FROM usuarios u
+        CROSS JOIN parametros p
+        CROSS JOIN LATERAL (
+            SELECT (u.data_admissao + make_interval(years => anos))::date AS aniversario
+            FROM generate_series(
+                GREATEST(1, extract(year FROM p.desde)::int - extract(year FROM u.data_admissao)::int),
+                extract(year FROM p.ate)::int - extract(year FROM u.data_admissao)::int
+            ) AS anos
+        ) a
+        WHERE u.ativo = true AND u.data_admissao IS NOT NULL
+          AND a.aniversario > p.desde AND a.aniversario <= p.ate
+          AND NOT EXISTS (
+              SELECT 1 FROM acumulo_aniversario r
+              WHERE r.usuario_id = u.id AND r.data_aniversario = a.aniversario
+          )
+    ),
+    calculados AS (
+        SELECT usuario_id, aniversario, inicio_periodo, COALESCE(saldo_ferias, 0) AS saldo,
+               GREATEST(0, round(%(dias_anuais)s * (aniversario - inicio_periodo)::numeric / dias_ano))::int AS dias
+        FROM aniversarios
+    ),
+    acumulados AS (
+        SELECT *, sum(dias) OVER (PARTITION BY usuario_id ORDER BY aniversario) AS acumulado
+        FROM calculados
+    ),
+    creditos AS (
+        SELECT usuario_id, aniversario, inicio_periodo, dias,
+               GREATEST(saldo, LEAST(saldo + acumulado - dias, %(saldo_maximo)s)) AS saldo_anterior,
+               GREATEST(saldo, LEAST(saldo + acumulado, %(saldo_maximo)s)) AS saldo_posterior
+        FROM acumulados
+    ),
+    inseridos AS (
+        INSERT INTO acumulo_aniversario
+            (usuario_id, data_aniversario, inicio_periodo, dias_calculados, dias_creditados, saldo_anterior, saldo_posterior)
+        SELECT usuario_id, aniversario, inicio_periodo, dias,
+               saldo_posterior - saldo_anterior, saldo_anterior, saldo_posterior
+        FROM creditos
+        ON CONFLICT (usuario_id, data_aniversario) DO NOTHING
+        RETURNING id, usuario_id, data_aniversario, dias_creditados
+    ),
+    movimentos AS (
+        INSERT INTO saldo_movimentos (usuario_id, dias, tipo, referencia_id, motivo)
+        SELECT usuario_id, dias_creditados, 'acumulo', id,
+               'Aniversário de admissão ' || to_char(data_aniversario, 'DD/MM/YYYY')
+        FROM inseridos
+        WHERE dias_creditados <> 0
+        ORDER BY usuario_id, data_aniversario
+        RETURNING usuario_id
+    )
+    SELECT (SELECT count(*) FROM inseridos) AS aniversarios,
+           (SELECT count(DISTINCT usuario_id) FROM movimentos) AS colaboradores,
+           (SELECT COALESCE(sum(dias_creditados), 0) FROM inseridos) AS dias
+"""
+
 class RenovacaoRepository(BaseConnection):
     """Gerenciamento de renovação anual de saldo"""
     
+    def criar_estrutura(self):
+        """Registro do acúmulo por aniversário de admissão"""
+        self._execute_query("""
+            CREATE TABLE IF NOT EXISTS acumulo_aniversario (
+                id SERIAL PRIMARY KEY,
+                usuario_id INTEGER NOT NULL REFERENCES usuarios(id),
+                data_aniversario DATE NOT NULL,
+                inicio_periodo DATE NOT NULL,
+                dias_calculados INTEGER NOT NULL,
+                dias_creditados INTEGER NOT NULL,
+                saldo_anterior INTEGER NOT NULL,
+                saldo_posterior INTEGER NOT NULL,
+                data_aplicacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE (usuario_id, data_aniversario)
+            );
+            CREATE INDEX IF NOT EXISTS idx_acumulo_aniversario_data ON acumulo_aniversario (data_aniversario)
+        """)
+    
     def verificar_renovacao_ano(self, ano):
         """Verifica se já houve renovação no ano"""
         result = self._execute_query("SELECT COUNT(*) as count FROM renovacao_saldo WHERE ano = %s", (ano,), fetch=True)
@@ -20,27 +116,25 @@ class RenovacaoRepository(BaseConnection):
             if result and result[0]['count'] > 0:
                 return False, "Já foi realizada renovação para este ano"
             
-            # Atualizar saldos
-            success1 = self._execute_query(
-                "UPDATE usuarios SET saldo_ferias = saldo_ferias + %s WHERE ativo = true",
-                (saldo_adicional,)
-            )
-            
-            if not success1:
-                return False, "Erro ao atualizar saldos"
-            
-            # Registrar renovação
-            success2 = self._execute_query(
-                "INSERT INTO renovacao_saldo (ano, saldo_padrao, usuario_responsavel_id) VALUES (%s, %s, %s)",
-                (ano, saldo_adicional, usuario_responsavel_id)
-            )
-            
-            if not success2:
-                return False, "Erro ao registrar renovação"
-            
-            # Contar usuários
-            usuarios = self._execute_query("SELECT COUNT(*) as count FROM usuarios WHERE ativo = true", fetch=True)
-            total = usuarios[0]['count'] if usuarios else 0
+            with self._connect() as conn:
+                with conn.cursor() as cur:
+                    # Registrar renovação
+                    cur.execute("""
+                        INSERT INTO renovacao_saldo (ano, saldo_padrao, usuario_responsavel_id) VALUES (%s, %s, %s)
+                        ON CONFLICT (ano) DO NOTHING
+                        RETURNING id
+                    """, (ano, saldo_adicional, usuario_responsavel_id))
+                    renovacao = cur.fetchone()
+                    if not renovacao:
+                        return False, "Já foi realizada renovação para este ano"
+                    
+                    # Creditar saldos (um movimento por colaborador ativo)
+                    cur.execute("""
+                        INSERT INTO saldo_movimentos (usuario_id, dias, tipo, referencia_id, motivo, usuario_responsavel_id)
+                        SELECT id, %s, 'renovacao', %s, %s, %s FROM usuarios WHERE ativo = true ORDER BY id
+                    """, (saldo_adicional, renovacao[0], f"Renovação anual {ano}", usuario_responsavel_id))
+                    total = cur.rowcount
+                    conn.commit()
             
             return True, f"Renovação aplicada! {total} colaboradores receberam +{saldo_adicional} dias para {ano}."
             
@@ -56,6 +150,48 @@ class RenovacaoRepository(BaseConnection):
         
         return self.renovar_saldo_anual_simples(ano, saldo_adicional, usuario_responsavel_id)
     
+    def acumular_aniversarios(self, dias_anuais, saldo_maximo, ate=None, desde=None):
+        """
+        Credita o saldo dos colaboradores que fazem aniversário de admissão.
+        
+        Idempotente: cada aniversário é creditado uma única vez, então pode
+        ser executado várias vezes ao dia e recupera dias sem execução.
+        
+        Args:
+            dias_anuais: Dias creditados por ano completo
+            saldo_maximo: Teto do saldo após o crédito
+            ate: Último dia processado (padrão: hoje)
+            desde: Processa aniversários posteriores a este dia (padrão: último registrado)
+            
+        Returns:
+            Dict com aniversarios, colaboradores e dias creditados, ou False em caso de erro
+        """
+        try:
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute("SELECT pg_advisory_xact_lock(%s)", (CHAVE_LOCK_ACUMULO,))
+                    cur.execute(SQL_ACUMULAR_ANIVERSARIOS, {
+                        "ate": ate or date.today(),
+                        "desde": desde,
+                        "dias_anuais": dias_anuais,
+                        "saldo_maximo": saldo_maximo,
+                    })
+                    resultado = dict(cur.fetchone())
+                    conn.commit()
+                    return resultado
+        except Exception:
+            return False
+    
+    def get_historico_acumulos(self, limite=100):
+        """Últimos créditos por aniversário de admissão"""
+        return self._execute_query("""
+            SELECT a.*, u.nome, u.setor
+            FROM acumulo_aniversario a
+            JOIN usuarios u ON u.id = a.usuario_id
+            ORDER BY a.data_aniversario DESC, a.id DESC
+            LIMIT %s
+        """, (limite,), fetch=True)
+    
     def get_historico_renovacoes(self):
         """Obtém histórico de renovações"""
         return self._execute_query("""
@@ -85,23 +221,19 @@ class RenovacaoRepository(BaseConnection):
             if data_renovacao != date.today():
                 return False, "Só é possível desfazer renovações do mesmo dia"
             
-            # Subtrair o valor que foi adicionado
-            success1 = self._execute_query(
-                "UPDATE usuarios SET saldo_ferias = saldo_ferias - %s WHERE ativo = true AND saldo_ferias >= %s",
-                (saldo_adicionado, saldo_adicionado)
-            )
-            
-            if not success1:
-                return False, "Erro ao atualizar saldos"
-            
-            # Remover registro de renovação
-            success2 = self._execute_query(
-                "DELETE FROM renovacao_saldo WHERE id = %s",
-                (renovacao['id'],)
-            )
-            
-            if not success2:
-                return False, "Erro ao remover registro"
+            with self._connect() as conn:
+                with conn.cursor() as cur:
+                    # Subtrair o valor que foi adicionado
+                    cur.execute("""
+                        INSERT INTO saldo_movimentos (usuario_id, dias, tipo, referencia_id, motivo, usuario_responsavel_id)
+                        SELECT id, -%s, 'renovacao_desfeita', %s, %s, %s
+                        FROM usuarios WHERE ativo = true AND saldo_ferias >= %s ORDER BY id
+                    """, (saldo_adicionado, renovacao['id'], f"Renovação {renovacao['ano']} desfeita",
+                          usuario_responsavel_id, saldo_adicionado))
+                    
+                    # Remover registro de renovação
+                    cur.execute("DELETE FROM renovacao_saldo WHERE id = %s", (renovacao['id'],))
+                    conn.commit()
             
             return True, f"Renovação desfeita! Valor de {saldo_adicionado} dias foi removido dos saldos."
             
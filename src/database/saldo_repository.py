@@ -0,0 +1,369 @@
+"""
+Repositório do extrato de saldo (saldo_movimentos)
+
+Todo crédito ou débito de saldo é uma linha nova em saldo_movimentos; a
+tabela não aceita UPDATE nem DELETE. Um trigger aplica cada movimento em
+usuarios.saldo_ferias (cache da soma do extrato) e grava em saldo_apos o
+saldo resultante, de modo que "saldo na data X" é uma única descida no
+índice (usuario_id, data_movimento), sem somar o histórico.
+
+Alterações diretas de usuarios.saldo_ferias (scripts antigos) também são
+registradas, como 'ajuste_direto'.
+
+A reconciliação compara, para todos os colaboradores em uma consulta:
+- o cache (usuarios.saldo_ferias) com a soma do extrato;
+- os débitos/estornos de cada férias no extrato com o status atual da
+  tabela ferias (aprovada: -dias_utilizados; demais: 0).
+"""
+import psycopg2
+import psycopg2.extras
+from .base_connection import BaseConnection
+
+TIPOS_MOVIMENTO = (
+    'abertura',            # saldo existente ao criar o colaborador ou o extrato
+    'ferias',              # débito de férias aprovadas
+    'estorno',             # devolução de férias canceladas/excluídas
+    'renovacao',           # renovação anual
+    'renovacao_desfeita',  # reversão da renovação anual
+    'acumulo',             # aniversário de admissão
+    'ajuste',              # ajuste manual (RH, edição do cadastro, reconciliação)
+    'ajuste_direto',       # UPDATE direto em usuarios.saldo_ferias
+)
+
+_SQL_INSERIR_MOVIMENTO = """
+    INSERT INTO saldo_movimentos
+        (usuario_id, dias, tipo, referencia_id, motivo, usuario_responsavel_id, usuario_responsavel_nome)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    RETURNING saldo_apos
+"""
+
+def registrar_movimento(cur, usuario_id, dias, tipo, referencia_id=None, motivo=None,
+                        usuario_responsavel_id=None, usuario_responsavel_nome=None):
+    """
+    Registra um movimento na transação do cursor (o trigger atualiza o saldo).
+
+    Returns:
+        Saldo após o movimento
+    """
+    cur.execute(_SQL_INSERIR_MOVIMENTO, (usuario_id, dias, tipo, referencia_id, motivo,
+                                         usuario_responsavel_id, usuario_responsavel_nome))
+    linha = cur.fetchone()
+    return linha['saldo_apos'] if isinstance(linha, dict) else linha[0]
+
+# Efeito esperado de cada férias no extrato. Férias registradas antes da
+# abertura do extrato já estão no saldo de abertura: o extrato só pode ter
+# o débito posterior (pendente na abertura) ou o estorno (aprovada na
+# abertura); fora disso, assume-se que não estava aprovada. Férias excluídas
+# só existem no extrato e valem como estão.
+_SQL_FERIAS_ESPERADAS = """
+    aberturas AS (
+        SELECT usuario_id, MIN(data_movimento) as abertura_em
+        FROM saldo_movimentos
+        WHERE tipo = 'abertura'
+        GROUP BY usuario_id
+    ),
+    movimentos_ferias AS (
+        SELECT usuario_id, referencia_id as ferias_id, SUM(dias) as liquido
+        FROM saldo_movimentos
+        WHERE tipo IN ('ferias', 'estorno') AND referencia_id IS NOT NULL
+        GROUP BY usuario_id, referencia_id
+    ),
+    ferias_atual AS (
+        SELECT f.id as ferias_id, f.usuario_id, f.dias_utilizados,
+               CASE WHEN lower(f.status) IN ('aprovado', 'aprovada') THEN -f.dias_utilizados ELSE 0 END as final,
+               COALESCE(f.data_registro >= a.abertura_em, false) as apos_abertura
+        FROM ferias f
+        LEFT JOIN aberturas a ON a.usuario_id = f.usuario_id
+    ),
+    ferias_esperadas AS (
+        SELECT COALESCE(f.usuario_id, m.usuario_id) as usuario_id,
+               COALESCE(f.ferias_id, m.ferias_id) as ferias_id,
+               COALESCE(m.liquido, 0) as liquido,
+               CASE
+                   WHEN f.ferias_id IS NULL THEN m.liquido
+                   WHEN f.apos_abertura THEN f.final
+                   WHEN COALESCE(m.liquido, 0) IN (f.final, f.final + f.dias_utilizados) THEN COALESCE(m.liquido, 0)
+                   ELSE f.final
+               END as esperado
+        FROM ferias_atual f
+        FULL OUTER JOIN movimentos_ferias m
+            ON m.ferias_id = f.ferias_id AND m.usuario_id = f.usuario_id
+    )
+"""
+
+_SQL_DIVERGENCIAS_SALDO = f"""
+    WITH {_SQL_FERIAS_ESPERADAS},
+    extrato AS (
+        SELECT usuario_id, SUM(dias) as saldo_extrato
+        FROM saldo_movimentos
+        GROUP BY usuario_id
+    ),
+    ferias_usuario AS (
+        SELECT usuario_id,
+               SUM(esperado - liquido) as correcao_ferias,
+               array_agg(ferias_id ORDER BY ferias_id) FILTER (WHERE esperado <> liquido) as ferias_divergentes
+        FROM ferias_esperadas
+        GROUP BY usuario_id
+    ),
+    saldos AS (
+        SELECT u.id as usuario_id, u.nome, u.setor, u.ativo,
+               COALESCE(u.saldo_ferias, 0) as saldo_atual,
+               e.saldo_extrato,
+               e.saldo_extrato + COALESCE(fu.correcao_ferias, 0) as saldo_esperado,
+               fu.ferias_divergentes
+        FROM usuarios u
+        LEFT JOIN extrato e ON e.usuario_id = u.id
+        LEFT JOIN ferias_usuario fu ON fu.usuario_id = u.id
+    )
+    SELECT usuario_id, nome, setor, ativo, saldo_atual, saldo_extrato, saldo_esperado,
+           saldo_atual - saldo_extrato as divergencia_cache,
+           saldo_esperado - saldo_extrato as divergencia_ferias,
+           COALESCE(ferias_divergentes, '{{}}') as ferias_divergentes
+    FROM saldos
+    WHERE saldo_extrato IS NULL
+       OR saldo_atual <> saldo_extrato
+       OR saldo_esperado <> saldo_extrato
+    ORDER BY setor, nome, usuario_id
+"""
+
+# Chave do lock da reconciliação (pg_advisory_xact_lock)
+CHAVE_LOCK_RECONCILIACAO = 500001
+
+class SaldoRepository(BaseConnection):
+    """Extrato de saldo e consultas de saldo em uma data"""
+
+    def criar_estrutura(self):
+        """Tabela, triggers e movimento de abertura dos colaboradores existentes"""
+        tipos = ", ".join(f"'{tipo}'" for tipo in TIPOS_MOVIMENTO)
+        self._execute_query(f"""
+            CREATE TABLE IF NOT EXISTS saldo_movimentos (
+                id BIGSERIAL PRIMARY KEY,
+                usuario_id INTEGER NOT NULL REFERENCES usuarios(id) ON DELETE CASCADE,
+                data_movimento TIMESTAMP NOT NULL,
+                dias INTEGER NOT NULL,
+                saldo_apos INTEGER NOT NULL,
+                tipo TEXT NOT NULL CHECK (tipo IN ({tipos})),
+                referencia_id INTEGER,
+                motivo TEXT,
+                usuario_responsavel_id INTEGER,
+                usuario_responsavel_nome TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_saldo_movimentos_usuario_data
+                ON saldo_movimentos (usuario_id, data_movimento DESC, id DESC)
+        """)
+
+        self._execute_query("""
+            -- Aplica o movimento no cache e grava o saldo resultante
+            CREATE OR REPLACE FUNCTION saldo_movimentos_aplicar() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.tipo = 'abertura' THEN
+                    -- Registra o saldo atual sem alterá-lo
+                    SELECT COALESCE(saldo_ferias, 0) INTO NEW.dias
+                    FROM usuarios WHERE id = NEW.usuario_id FOR UPDATE;
+                    NEW.saldo_apos := NEW.dias;
+                ELSIF NEW.tipo = 'ajuste_direto' THEN
+                    -- Já aplicado pelo UPDATE que originou o movimento
+                    IF pg_trigger_depth() < 2 THEN
+                        RAISE EXCEPTION 'ajuste_direto é registrado apenas pelo trigger de usuarios';
+                    END IF;
+                ELSE
+                    UPDATE usuarios SET saldo_ferias = COALESCE(saldo_ferias, 0) + NEW.dias
+                    WHERE id = NEW.usuario_id
+                    RETURNING saldo_ferias INTO NEW.saldo_apos;
+                END IF;
+
+                IF NEW.saldo_apos IS NULL THEN
+                    RAISE EXCEPTION 'Colaborador % não encontrado', NEW.usuario_id;
+                END IF;
+
+                -- Após o lock da linha do colaborador: a ordem por data segue a ordem de aplicação
+                NEW.data_movimento := COALESCE(NEW.data_movimento, clock_timestamp());
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            -- Extrato somente de inclusão (linhas saem apenas com a exclusão do colaborador)
+            CREATE OR REPLACE FUNCTION saldo_movimentos_imutavel() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'DELETE' AND NOT EXISTS (SELECT 1 FROM usuarios WHERE id = OLD.usuario_id) THEN
+                    RETURN OLD;
+                END IF;
+                RAISE EXCEPTION 'saldo_movimentos é somente de inclusão';
+            END;
+            $$ LANGUAGE plpgsql;
+
+            -- Abertura do extrato de novos colaboradores
+            CREATE OR REPLACE FUNCTION usuarios_abrir_extrato() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO saldo_movimentos (usuario_id, dias, tipo, motivo)
+                VALUES (NEW.id, 0, 'abertura', 'Saldo inicial do cadastro');
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            -- UPDATE direto do saldo (fora do extrato) vira movimento registrado
+            -- (exceto o realinhamento do cache feito pela reconciliação)
+            CREATE OR REPLACE FUNCTION usuarios_saldo_direto() RETURNS trigger AS $$
+            BEGIN
+                IF pg_trigger_depth() = 1 AND NEW.saldo_ferias IS DISTINCT FROM OLD.saldo_ferias
+                   AND current_setting('saldo.reconciliacao', true) IS DISTINCT FROM 'on' THEN
+                    INSERT INTO saldo_movimentos (usuario_id, dias, saldo_apos, tipo, motivo)
+                    VALUES (NEW.id, COALESCE(NEW.saldo_ferias, 0) - COALESCE(OLD.saldo_ferias, 0),
+                            COALESCE(NEW.saldo_ferias, 0), 'ajuste_direto',
+                            'Alteração direta de usuarios.saldo_ferias');
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_saldo_movimentos_aplicar') THEN
+                    CREATE TRIGGER trg_saldo_movimentos_aplicar
+                        BEFORE INSERT ON saldo_movimentos
+                        FOR EACH ROW EXECUTE FUNCTION saldo_movimentos_aplicar();
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_saldo_movimentos_imutavel') THEN
+                    CREATE TRIGGER trg_saldo_movimentos_imutavel
+                        BEFORE UPDATE OR DELETE ON saldo_movimentos
+                        FOR EACH ROW EXECUTE FUNCTION saldo_movimentos_imutavel();
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_usuarios_abrir_extrato') THEN
+                    CREATE TRIGGER trg_usuarios_abrir_extrato
+                        AFTER INSERT ON usuarios
+                        FOR EACH ROW EXECUTE FUNCTION usuarios_abrir_extrato();
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_usuarios_saldo_direto') THEN
+                    CREATE TRIGGER trg_usuarios_saldo_direto
+                        AFTER UPDATE OF saldo_ferias ON usuarios
+                        FOR EACH ROW EXECUTE FUNCTION usuarios_saldo_direto();
+                END IF;
+            END;
+            $$
+        """)
+
+        # Colaboradores anteriores ao extrato: o saldo atual vira a abertura
+        self._execute_query("""
+            INSERT INTO saldo_movimentos (usuario_id, dias, tipo, motivo)
+            SELECT u.id, 0, 'abertura', 'Saldo na criação do extrato'
+            FROM usuarios u
+            WHERE NOT EXISTS (SELECT 1 FROM saldo_movimentos m WHERE m.usuario_id = u.id)
+        """)
+
+    def get_saldo_em(self, usuario_id, momento):
+        """
+        Saldo do colaborador em um instante (último movimento até ele).
+
+        Returns:
+            Saldo, ou None se o extrato do colaborador começa depois do instante
+        """
+        resultado = self._execute_query("""
+            SELECT saldo_apos FROM saldo_movimentos
+            WHERE usuario_id = %s AND data_movimento <= %s
+            ORDER BY data_movimento DESC, id DESC
+            LIMIT 1
+        """, (usuario_id, momento), fetch=True)
+        return resultado[0]['saldo_apos'] if resultado else None
+
+    def get_saldos_em(self, momento, setor=None):
+        """Saldo de cada colaborador em um instante (uma descida no índice por colaborador)"""
+        filtro_setor = "AND u.setor = %s" if setor else ""
+        params = [momento] + ([setor] if setor else [])
+        return self._execute_query(f"""
+            SELECT u.id, u.nome, u.setor, m.saldo_apos as saldo
+            FROM usuarios u
+            JOIN LATERAL (
+                SELECT saldo_apos FROM saldo_movimentos
+                WHERE usuario_id = u.id AND data_movimento <= %s
+                ORDER BY data_movimento DESC, id DESC
+                LIMIT 1
+            ) m ON true
+            WHERE true {filtro_setor}
+            ORDER BY u.nome
+        """, params, fetch=True)
+
+    def get_extrato_pagina(self, usuario_id, cursor=None, limite=20):
+        """Movimentos do colaborador, mais recentes primeiro (paginação por chave)"""
+        return self._consultar_pagina(
+            """
+                SELECT id, data_movimento, dias, saldo_apos, tipo, motivo, usuario_responsavel_nome
+                FROM saldo_movimentos
+                WHERE usuario_id = %s
+            """,
+            [usuario_id], 'data_movimento', True, cursor, limite
+        )
+
+    def verificar_saldos(self):
+        """
+        Colaboradores cujo saldo diverge do extrato ou das férias (uma consulta).
+
+        Returns:
+            Lista com saldo_atual (cache), saldo_extrato, saldo_esperado,
+            divergencia_cache, divergencia_ferias e ferias_divergentes
+        """
+        return self._execute_query(_SQL_DIVERGENCIAS_SALDO, fetch=True)
+
+    def reconciliar_saldos(self, aplicar=False, usuario_responsavel_id=None, usuario_responsavel_nome=None):
+        """
+        Relatório de divergências e, opcionalmente, correção em uma transação.
+
+        Com o extrato bloqueado para escrita, a correção:
+        1. abre o extrato de quem não tem movimentos;
+        2. realinha o cache à soma do extrato (o extrato é a referência);
+        3. lança em cada férias divergente o débito ou estorno que falta.
+
+        Returns:
+            Dict com divergencias e quantidades corrigidas, ou False em caso de erro
+        """
+        try:
+            with self._connect() as conn:
+                with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+                    cur.execute("SELECT pg_advisory_xact_lock(%s)", (CHAVE_LOCK_RECONCILIACAO,))
+                    if aplicar:
+                        # Nenhum movimento novo até o fim da correção
+                        cur.execute("LOCK TABLE saldo_movimentos IN EXCLUSIVE MODE")
+                    cur.execute(_SQL_DIVERGENCIAS_SALDO)
+                    divergencias = [dict(linha) for linha in cur.fetchall()]
+                    resultado = {"divergencias": divergencias, "extratos_abertos": 0,
+                                 "caches_realinhados": 0, "ferias_corrigidas": 0}
+                    if not aplicar or not divergencias:
+                        conn.rollback()
+                        return resultado
+
+                    cur.execute("""
+                        INSERT INTO saldo_movimentos (usuario_id, dias, tipo, motivo)
+                        SELECT u.id, 0, 'abertura', 'Reconciliação: extrato inexistente'
+                        FROM usuarios u
+                        WHERE NOT EXISTS (SELECT 1 FROM saldo_movimentos m WHERE m.usuario_id = u.id)
+                    """)
+                    resultado["extratos_abertos"] = cur.rowcount
+
+                    cur.execute("SET LOCAL saldo.reconciliacao = 'on'")
+                    cur.execute("""
+                        UPDATE usuarios u SET saldo_ferias = e.saldo_extrato
+                        FROM (
+                            SELECT usuario_id, SUM(dias) as saldo_extrato
+                            FROM saldo_movimentos
+                            GROUP BY usuario_id
+                        ) e
+                        WHERE e.usuario_id = u.id AND u.saldo_ferias IS DISTINCT FROM e.saldo_extrato
+                    """)
+                    resultado["caches_realinhados"] = cur.rowcount
+
+                    cur.execute(f"""
+                        WITH {_SQL_FERIAS_ESPERADAS}
+                        INSERT INTO saldo_movimentos
+                            (usuario_id, dias, tipo, referencia_id, motivo, usuario_responsavel_id, usuario_responsavel_nome)
+                        SELECT usuario_id, esperado - liquido,
+                               CASE WHEN esperado < liquido THEN 'ferias' ELSE 'estorno' END,
+                               ferias_id, 'Reconciliação', %s, %s
+                        FROM ferias_esperadas
+                        WHERE esperado <> liquido
+                        ORDER BY usuario_id, ferias_id
+                    """, (usuario_responsavel_id, usuario_responsavel_nome))
+                    resultado["ferias_corrigidas"] = cur.rowcount
+
+                    conn.commit()
+                    return resultado
+        except Exception:
+            return False
@@ -0,0 +1,186 @@
+"""
+Repositório de estatísticas por setor
+
+Mantém a tabela resumo setor_stats atualizada por triggers na mesma
+transação das alterações em usuarios e ferias, para que os relatórios leiam
+poucas linhas independentemente do número de colaboradores.
+"""
+from .base_connection import BaseConnection
+
+# Agregação completa a partir das tabelas de origem (usada na reconstrução)
+_SQL_STATS_ESPERADAS = """
+    SELECT u.setor,
+           COUNT(*) as colaboradores,
+           COALESCE(SUM(u.saldo_ferias), 0) as saldo_total,
+           COALESCE(SUM(f.dias_pendentes), 0) as dias_pendentes,
+           COALESCE(SUM(f.dias_aprovados), 0) as dias_aprovados
+    FROM usuarios u
+    LEFT JOIN (
+        SELECT usuario_id,
+               SUM(dias_utilizados) FILTER (WHERE lower(status) = 'pendente') as dias_pendentes,
+               SUM(dias_utilizados) FILTER (WHERE lower(status) IN ('aprovado', 'aprovada')) as dias_aprovados
+        FROM ferias
+        GROUP BY usuario_id
+    ) f ON f.usuario_id = u.id
+    WHERE u.ativo = true
+    GROUP BY u.setor
+"""
+
+class SetorStatsRepository(BaseConnection):
+    """Resumo incremental de colaboradores, saldos e férias por setor"""
+
+    def criar_estrutura(self):
+        """Cria tabela, funções e triggers; popula a tabela se estiver vazia"""
+        self._execute_query("""
+            CREATE TABLE IF NOT EXISTS setor_stats (
+                setor TEXT PRIMARY KEY,
+                colaboradores INTEGER NOT NULL DEFAULT 0,
+                saldo_total BIGINT NOT NULL DEFAULT 0,
+                dias_pendentes BIGINT NOT NULL DEFAULT 0,
+                dias_aprovados BIGINT NOT NULL DEFAULT 0,
+                atualizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Aplica um delta ao setor (upsert incremental)
+        self._execute_query("""
+            CREATE OR REPLACE FUNCTION setor_stats_aplicar(
+                p_setor TEXT, p_colaboradores INTEGER, p_saldo BIGINT,
+                p_pendentes BIGINT, p_aprovados BIGINT
+            ) RETURNS void AS $$
+            BEGIN
+                IF p_colaboradores = 0 AND p_saldo = 0 AND p_pendentes = 0 AND p_aprovados = 0 THEN
+                    RETURN;
+                END IF;
+                INSERT INTO setor_stats (setor, colaboradores, saldo_total, dias_pendentes, dias_aprovados)
+                VALUES (p_setor, p_colaboradores, p_saldo, p_pendentes, p_aprovados)
+                ON CONFLICT (setor) DO UPDATE SET
+                    colaboradores = setor_stats.colaboradores + EXCLUDED.colaboradores,
+                    saldo_total = setor_stats.saldo_total + EXCLUDED.saldo_total,
+                    dias_pendentes = setor_stats.dias_pendentes + EXCLUDED.dias_pendentes,
+                    dias_aprovados = setor_stats.dias_aprovados + EXCLUDED.dias_aprovados,
+                    atualizado_em = CURRENT_TIMESTAMP;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+
+        # Alterações de saldo, status ativo ou setor do colaborador
+        self._execute_query("""
+            CREATE OR REPLACE FUNCTION setor_stats_usuarios() RETURNS trigger AS $$
+            DECLARE
+                v_pendentes BIGINT;
+                v_aprovados BIGINT;
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') AND COALESCE(OLD.ativo, false) THEN
+                    SELECT COALESCE(SUM(dias_utilizados) FILTER (WHERE lower(status) = 'pendente'), 0),
+                           COALESCE(SUM(dias_utilizados) FILTER (WHERE lower(status) IN ('aprovado', 'aprovada')), 0)
+                    INTO v_pendentes, v_aprovados
+                    FROM ferias WHERE usuario_id = OLD.id;
+                    PERFORM setor_stats_aplicar(OLD.setor, -1, -COALESCE(OLD.saldo_ferias, 0), -v_pendentes, -v_aprovados);
+                END IF;
+
+                IF TG_OP IN ('INSERT', 'UPDATE') AND COALESCE(NEW.ativo, false) THEN
+                    SELECT COALESCE(SUM(dias_utilizados) FILTER (WHERE lower(status) = 'pendente'), 0),
+                           COALESCE(SUM(dias_utilizados) FILTER (WHERE lower(status) IN ('aprovado', 'aprovada')), 0)
+                    INTO v_pendentes, v_aprovados
+                    FROM ferias WHERE usuario_id = NEW.id;
+                    PERFORM setor_stats_aplicar(NEW.setor, 1, COALESCE(NEW.saldo_ferias, 0), v_pendentes, v_aprovados);
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+
+        # Alterações de status/dias das férias
+        self._execute_query("""
+            CREATE OR REPLACE FUNCTION setor_stats_ferias() RETURNS trigger AS $$
+            DECLARE
+                v_setor TEXT;
+                v_ativo BOOLEAN;
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    SELECT setor, ativo INTO v_setor, v_ativo FROM usuarios WHERE id = OLD.usuario_id;
+                    IF COALESCE(v_ativo, false) THEN
+                        PERFORM setor_stats_aplicar(v_setor, 0, 0,
+                            -(CASE WHEN lower(OLD.status) = 'pendente' THEN OLD.dias_utilizados ELSE 0 END),
+                            -(CASE WHEN lower(OLD.status) IN ('aprovado', 'aprovada') THEN OLD.dias_utilizados ELSE 0 END));
+                    END IF;
+                END IF;
+
+                IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                    SELECT setor, ativo INTO v_setor, v_ativo FROM usuarios WHERE id = NEW.usuario_id;
+                    IF COALESCE(v_ativo, false) THEN
+                        PERFORM setor_stats_aplicar(v_setor, 0, 0,
+                            CASE WHEN lower(NEW.status) = 'pendente' THEN NEW.dias_utilizados ELSE 0 END,
+                            CASE WHEN lower(NEW.status) IN ('aprovado', 'aprovada') THEN NEW.dias_utilizados ELSE 0 END);
+                    END IF;
+                END IF;
+
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+
+        # Triggers criados uma única vez (evita lock nas tabelas a cada sessão)
+        self._execute_query("""
+            DO $$
+            BEGIN
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_setor_stats_usuarios') THEN
+                    CREATE TRIGGER trg_setor_stats_usuarios
+                        AFTER INSERT OR DELETE OR UPDATE OF saldo_ferias, ativo, setor ON usuarios
+                        FOR EACH ROW EXECUTE FUNCTION setor_stats_usuarios();
+                END IF;
+                IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'trg_setor_stats_ferias') THEN
+                    CREATE TRIGGER trg_setor_stats_ferias
+                        AFTER INSERT OR DELETE OR UPDATE OF status, dias_utilizados, usuario_id ON ferias
+                        FOR EACH ROW EXECUTE FUNCTION setor_stats_ferias();
+                END IF;
+            END;
+            $$
+        """)
+
+        # Primeira carga
+        existentes = self._execute_query("SELECT COUNT(*) as count FROM setor_stats", fetch=True)
+        if existentes and existentes[0]['count'] == 0:
+            self.reconstruir_setor_stats()
+
+    def get_setor_stats(self):
+        """Obtém o resumo por setor (uma linha por setor)"""
+        return self._execute_query("""
+            SELECT setor, colaboradores, saldo_total,
+                   CASE WHEN colaboradores > 0
+                        THEN ROUND(saldo_total::numeric / colaboradores, 1)
+                        ELSE 0 END as saldo_medio,
+                   dias_pendentes, dias_aprovados, atualizado_em
+            FROM setor_stats
+            WHERE colaboradores > 0 OR dias_pendentes <> 0 OR dias_aprovados <> 0
+            ORDER BY setor
+        """, fetch=True)
+
+    def verificar_setor_stats(self):
+        """Lista setores cujo resumo diverge da agregação completa"""
+        return self._execute_query(f"""
+            WITH esperado AS ({_SQL_STATS_ESPERADAS})
+            SELECT COALESCE(e.setor, s.setor) as setor,
+                   COALESCE(s.colaboradores, 0) as colaboradores_atual, COALESCE(e.colaboradores, 0) as colaboradores_esperado,
+                   COALESCE(s.saldo_total, 0) as saldo_atual, COALESCE(e.saldo_total, 0) as saldo_esperado,
+                   COALESCE(s.dias_pendentes, 0) as pendentes_atual, COALESCE(e.dias_pendentes, 0) as pendentes_esperado,
+                   COALESCE(s.dias_aprovados, 0) as aprovados_atual, COALESCE(e.dias_aprovados, 0) as aprovados_esperado
+            FROM esperado e
+            FULL OUTER JOIN setor_stats s ON s.setor = e.setor
+            WHERE COALESCE(s.colaboradores, 0) <> COALESCE(e.colaboradores, 0)
+               OR COALESCE(s.saldo_total, 0) <> COALESCE(e.saldo_total, 0)
+               OR COALESCE(s.dias_pendentes, 0) <> COALESCE(e.dias_pendentes, 0)
+               OR COALESCE(s.dias_aprovados, 0) <> COALESCE(e.dias_aprovados, 0)
+            ORDER BY 1
+        """, fetch=True)
+
+    def reconstruir_setor_stats(self):
+        """Reconstrói o resumo do zero em uma única transação"""
+        return self._execute_query(f"""
+            LOCK TABLE setor_stats IN EXCLUSIVE MODE;
+            DELETE FROM setor_stats;
+            INSERT INTO setor_stats (setor, colaboradores, saldo_total, dias_pendentes, dias_aprovados)
+            {_SQL_STATS_ESPERADAS};
+        """)
@@ -1,13 +1,202 @@
 """
 Repositório de usuários
 """
+import threading
+import time
 import bcrypt
 from datetime import date
 from .base_connection import BaseConnection
+from .saldo_repository import registrar_movimento
+from .indice_nomes import IndiceNomes
+
+# Busca por nome: índice unaccent + pg_trgm no banco; sem as extensões, índice
+# de trigramas em memória (compartilhado pelas sessões do processo)
+TTL_INDICE_NOMES = 300  # segundos
+_busca_indexada = None
+_indice_nomes = None
+_lock_indice = threading.Lock()
+
+def _invalidar_indice_nomes():
+    """Descarta o índice em memória (nome incluído, alterado ou removido)"""
+    global _indice_nomes
+    with _lock_indice:
+        _indice_nomes = None
+
+# Colunas retornadas pelas listagens (sem senha_hash; sem NULL nas ordenáveis)
+_COLUNAS_LISTAGEM = """
+    u.id, u.nome, u.email, u.setor, u.funcao, u.nivel_acesso,
+    COALESCE(u.saldo_ferias, 0) as saldo_ferias, u.ativo, u.data_admissao, u.data_cadastro
+"""
+
+# Colunas aceitas para ordenar a listagem (paginação por chave coluna + id)
+ORDENACOES_USUARIOS = ('nome', 'setor', 'funcao', 'saldo_ferias', 'relevancia')
+
+STATUS_USUARIOS = ('ativos', 'inativos', 'todos')
 
 class UsersRepository(BaseConnection):
     """Gerenciamento de usuários"""
     
+    def criar_estrutura(self):
+        """Habilita unaccent/pg_trgm (se permitido) e cria o índice de busca por nome"""
+        self._execute_query("""
+            DO $$
+            BEGIN
+                BEGIN
+                    CREATE EXTENSION IF NOT EXISTS unaccent;
+                    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                EXCEPTION WHEN OTHERS THEN
+                    RAISE NOTICE 'Busca por nome sem extensões: %', SQLERRM;
+                END;
+                
+                IF (SELECT COUNT(*) FROM pg_extension WHERE extname IN ('unaccent', 'pg_trgm')) = 2 THEN
+                    -- unaccent() não é IMMUTABLE; o wrapper com dicionário fixo pode ser indexado
+                    IF NOT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'usuarios_nome_busca') THEN
+                        CREATE FUNCTION usuarios_nome_busca(texto TEXT) RETURNS TEXT AS $f$
+                            SELECT btrim(regexp_replace(
+                                lower(public.unaccent('public.unaccent'::regdictionary, texto)),
+                                '[^0-9a-z]+', ' ', 'g'))
+                        $f$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE;
+                    END IF;
+                    CREATE INDEX IF NOT EXISTS idx_usuarios_nome_busca
+                        ON usuarios USING GIN (usuarios_nome_busca(nome) gin_trgm_ops);
+                END IF;
+            END;
+            $$
+        """)
+    
+    def listar_usuarios(self, status='ativos', setor=None, funcao=None, saldo_min=None, saldo_max=None,
+                        termo=None, ordenar_por=None, decrescente=False, limite=50, cursor=None):
+        """
+        Página de colaboradores com todos os filtros aplicados no banco.
+        
+        Args:
+            status: 'ativos', 'inativos' ou 'todos'
+            setor, funcao: Igualdade (None = todos)
+            saldo_min, saldo_max: Faixa de saldo inclusiva (None = sem limite)
+            termo: Parte do nome, ignorando acentos e maiúsculas
+            ordenar_por: Uma de ORDENACOES_USUARIOS; padrão é relevância
+                         (decrescente) quando há termo e nome caso contrário
+            cursor: 'proximo' da página anterior
+            
+        Returns:
+            Dict com 'linhas', 'total' e 'proximo' (ver _consultar_pagina); as
+            linhas trazem também total_ativos e total_inativos do resultado
+        """
+        if status not in STATUS_USUARIOS:
+            raise ValueError(f"Status inválido: {status}")
+        if ordenar_por is not None and ordenar_por not in ORDENACOES_USUARIOS:
+            raise ValueError(f"Ordenação inválida: {ordenar_por}")
+        
+        condicoes, params = [], []
+        if status != 'todos':
+            condicoes.append("u.ativo = %s")
+            params.append(status == 'ativos')
+        if setor:
+            condicoes.append("u.setor = %s")
+            params.append(setor)
+        if funcao:
+            condicoes.append("u.funcao = %s")
+            params.append(funcao)
+        if saldo_min is not None:
+            condicoes.append("u.saldo_ferias >= %s")
+            params.append(saldo_min)
+        if saldo_max is not None:
+            condicoes.append("u.saldo_ferias <= %s")
+            params.append(saldo_max)
+        
+        relevancia, params_relevancia = "0", []
+        termo = (termo or "").strip()
+        if termo:
+            filtro_nome = self._filtro_nome(termo)
+            if filtro_nome is None:
+                return {"linhas": [], "total": 0, "proximo": None}
+            condicao_nome, params_nome, relevancia, params_relevancia = filtro_nome
+            condicoes.append(condicao_nome)
+            params += params_nome
+            if ordenar_por is None:
+                ordenar_por, decrescente = 'relevancia', True
+        
+        where = " AND ".join(condicoes) or "true"
+        return self._consultar_pagina(
+            f"""
+                SELECT {_COLUNAS_LISTAGEM}, {relevancia} as relevancia
+                FROM usuarios u
+                WHERE {where}
+            """,
+            params_relevancia + params,
+            ordenar_por or 'nome', decrescente, cursor, limite,
+            totais=""",
+                COUNT(*) FILTER (WHERE ativo) as total_ativos,
+                COUNT(*) FILTER (WHERE NOT COALESCE(ativo, true)) as total_inativos"""
+        )
+    
+    def buscar_usuarios(self, termo, limite=20, incluir_inativos=False, setor=None):
+        """
+        Busca colaboradores pelo nome, ignorando acentos e maiúsculas.
+        
+        Ordem: nomes que começam pelo termo, depois similaridade (tolera
+        erros de digitação). Sem termo, retorna os primeiros em ordem alfabética.
+        
+        Returns:
+            Lista de dicts (colunas de listar_usuarios), no máximo `limite`
+        """
+        return self.listar_usuarios(
+            status='todos' if incluir_inativos else 'ativos', setor=setor, termo=termo, limite=limite
+        )["linhas"]
+    
+    def _filtro_nome(self, termo):
+        """
+        Condição e relevância (maior = melhor) para a busca por nome.
+        
+        Returns:
+            Tupla (condição, params, relevância, params_relevância), ou None se nenhum nome atende
+        """
+        if self._busca_indexada_disponivel():
+            # usuarios_nome_busca(%s) é constante (IMMUTABLE): LIKE e <% usam o índice GIN.
+            # Relevância: palavra iniciada pelo termo vale 1, mais a similaridade (0 a 1)
+            return (
+                """(usuarios_nome_busca(u.nome) LIKE '%%' || usuarios_nome_busca(%s) || '%%'
+                    OR usuarios_nome_busca(%s) <%% usuarios_nome_busca(u.nome))""",
+                [termo, termo],
+                """(CASE WHEN (' ' || usuarios_nome_busca(u.nome)) LIKE '%% ' || usuarios_nome_busca(%s) || '%%'
+                         THEN 1 ELSE 0 END
+                    + word_similarity(usuarios_nome_busca(%s), usuarios_nome_busca(u.nome)))::float8""",
+                [termo, termo],
+            )
+        
+        # Sem extensões: ranking no índice em memória (posição negativa = maior relevância)
+        indice = self._indice_nomes()
+        candidatos = indice.buscar(termo, len(indice))
+        if not candidatos:
+            return None
+        return ("u.id = ANY(%s)", [candidatos], "-array_position(%s::integer[], u.id)", [candidatos])
+    
+    def _busca_indexada_disponivel(self):
+        """Verifica (uma vez por processo) se o banco tem o índice unaccent + pg_trgm"""
+        global _busca_indexada
+        if _busca_indexada is None:
+            result = self._execute_query(
+                "SELECT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'usuarios_nome_busca') as disponivel",
+                fetch=True
+            )
+            if not result:
+                return False
+            _busca_indexada = bool(result[0]['disponivel'])
+        return _busca_indexada
+    
+    def _indice_nomes(self):
+        """Índice em memória de todos os nomes, reconstruído após alterações ou expiração"""
+        global _indice_nomes
+        with _lock_indice:
+            if _indice_nomes and time.monotonic() - _indice_nomes[1] < TTL_INDICE_NOMES:
+                return _indice_nomes[0]
+        
+        registros = self._execute_query("SELECT id, nome FROM usuarios", fetch=True) or []
+        indice = IndiceNomes((registro['id'], registro['nome']) for registro in registros)
+        with _lock_indice:
+            _indice_nomes = (indice, time.monotonic())
+        return indice
+    
     def authenticate_user(self, email, senha):
         """Autentica usuário (apenas usuários ativos)"""
         try:
@@ -44,6 +233,20 @@ class UsersRepository(BaseConnection):
         except Exception as e:
             return []
     
+    def get_estatisticas_setores(self):
+        """Obtém total, saldo médio e saldo total por setor (ativos), com linha de total geral"""
+        return self._execute_query("""
+            SELECT setor,
+                   GROUPING(setor) = 1 as total_geral,
+                   COUNT(*) as colaboradores,
+                   ROUND(AVG(saldo_ferias)::numeric, 1) as saldo_medio,
+                   COALESCE(SUM(saldo_ferias), 0) as saldo_total
+            FROM usuarios
+            WHERE ativo = true
+            GROUP BY ROLLUP (setor)
+            ORDER BY GROUPING(setor), setor
+        """, fetch=True)
+    
     def create_user(self, nome, email, senha, setor, funcao, nivel_acesso="colaborador", saldo_ferias=12, data_admissao=None):
         """Cria usuário"""
         try:
@@ -61,6 +264,8 @@ class UsersRepository(BaseConnection):
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
             """, (nome, email, senha_hash, setor, funcao, nivel_acesso, saldo_ferias, data_admissao or date.today()))
             
+            if success:
+                _invalidar_indice_nomes()
             return success
             
         except Exception as e:
@@ -69,11 +274,24 @@ class UsersRepository(BaseConnection):
             return False
     
     def update_user(self, user_id, nome, email, setor, funcao, nivel_acesso, saldo_ferias):
-        """Atualiza usuário"""
-        return self._execute_query("""
-            UPDATE usuarios SET nome=%s, email=%s, setor=%s, funcao=%s, 
-            nivel_acesso=%s, saldo_ferias=%s WHERE id=%s
-        """, (nome, email, setor, funcao, nivel_acesso, saldo_ferias, user_id))
+        """Atualiza usuário (mudança de saldo vira ajuste no extrato)"""
+        try:
+            with self._connect() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE usuarios SET nome=%s, email=%s, setor=%s, funcao=%s, nivel_acesso=%s
+                        WHERE id=%s
+                        RETURNING COALESCE(saldo_ferias, 0)
+                    """, (nome, email, setor, funcao, nivel_acesso, user_id))
+                    linha = cur.fetchone()
+                    if linha and saldo_ferias is not None and int(saldo_ferias) != linha[0]:
+                        registrar_movimento(cur, user_id, int(saldo_ferias) - linha[0], 'ajuste',
+                                            motivo="Edição do cadastro")
+                    conn.commit()
+        except Exception:
+            return False
+        _invalidar_indice_nomes()
+        return True
     
     def inativar_usuario(self, user_id):
         """Inativa usuário"""
@@ -85,11 +303,27 @@ class UsersRepository(BaseConnection):
     
     def delete_user(self, user_id):
         """Exclui usuário"""
-        return self._execute_query("DELETE FROM usuarios WHERE id=%s", (user_id,))
+        success = self._execute_query("DELETE FROM usuarios WHERE id=%s", (user_id,))
+        if success:
+            _invalidar_indice_nomes()
+        return success
     
     def update_saldo_ferias(self, user_id, novo_saldo, usuario_responsavel_id=None, usuario_responsavel_nome=None, motivo="Ajuste manual"):
-        """Atualiza saldo"""
-        return self._execute_query("UPDATE usuarios SET saldo_ferias=%s WHERE id=%s", (novo_saldo, user_id))
+        """Ajusta o saldo para `novo_saldo` registrando a diferença no extrato"""
+        try:
+            with self._connect() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT COALESCE(saldo_ferias, 0) FROM usuarios WHERE id = %s FOR UPDATE", (user_id,))
+                    linha = cur.fetchone()
+                    if not linha:
+                        return False
+                    if int(novo_saldo) != linha[0]:
+                        registrar_movimento(cur, user_id, int(novo_saldo) - linha[0], 'ajuste', None, motivo,
+                                            usuario_responsavel_id, usuario_responsavel_nome)
+                    conn.commit()
+                    return True
+        except Exception:
+            return False
     
     def update_password(self, user_id, nova_senha):
         """Atualiza senha do usuário"""
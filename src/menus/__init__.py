@@ -5,24 +5,37 @@ from .gerenciar_colaboradores import menu_gerenciar_colaboradores
 from .dashboard import menu_dashboard
 from .avisos import menu_avisos
 from .renovacao_saldo import menu_renovacao_saldo
+from .escala_ferias import menu_escala_ferias
+from .rotinas import menu_rotinas
 
 from .menu_colaborador import menu_colaborador
 from .menu_diretoria import menu_diretoria
 from .menu_coordenador import menu_coordenador
+from .perfil_render import menu_perfil_render
+from ..utils.error_handler import CriticalOperationManager
+from ..utils.profiler import perfil_ativo
 # Alertas removidos
 
+@CriticalOperationManager.monitor_resource_usage
 def menu_rh():
     """Menu principal para RH (Master)"""
     st.markdown("### Painel Gestão de Pessoas - Acesso Master")
 
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
+    abas = [
         "Cadastrar Colaborador",
         "Gerenciar Férias", 
         "Gerenciar Colaboradores",
         "Avisos",
         "Renovação Saldo",
-        "Relatórios"
-    ])
+        "Relatórios",
+        "Escala de Férias",
+        "Rotinas"
+    ]
+    # Aba de desempenho apenas com o profiler ligado
+    if perfil_ativo():
+        abas.append("Desempenho")
+    
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8, *tab_extra = st.tabs(abas)
 
     with tab1:
         menu_cadastro_colaborador()
@@ -41,6 +54,16 @@ def menu_rh():
     
     with tab6:
         menu_dashboard()
+    
+    with tab7:
+        menu_escala_ferias()
+    
+    with tab8:
+        menu_rotinas()
+    
+    if tab_extra:
+        with tab_extra[0]:
+            menu_perfil_render()
 
 # Funções movidas para arquivos separados
 
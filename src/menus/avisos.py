@@ -1,7 +1,14 @@
 import streamlit as st
 import pandas as pd
+from datetime import date, datetime, time, timedelta
 from ..utils.constants import SETORES, FUNCOES
+from ..utils.error_handler import CriticalOperationManager
+from ..core.regras_avisos import RegrasAvisos
 
+AVISOS_POR_PAGINA = 10
+COLABORADORES_POR_PAGINA = 50
+
+@CriticalOperationManager.monitor_resource_usage
 def menu_avisos():
     """Menu para gerenciar avisos"""
     st.markdown("#### Gerenciar Avisos")
@@ -17,17 +24,22 @@ def menu_avisos():
         with col_f2:
             funcoes_selecionadas = st.multiselect("Funções", FUNCOES)
         with col_f3:
-            usuarios_especificos = st.multiselect("Usuários específicos", _get_usuarios_opcoes())
+            opcoes_usuarios = _get_usuarios_opcoes()
+            usuarios_especificos = st.multiselect("Usuários específicos", list(opcoes_usuarios.keys()))
+        usuarios_ids = [opcoes_usuarios[opcao] for opcao in usuarios_especificos]
     else:
-        # Mostrar preview dos destinatários
-        try:
-            total_usuarios = len(st.session_state.users_db.get_users())
-            st.success(f"📢 **Todos os colaboradores serão notificados** ({total_usuarios} pessoas)")
-        except:
-            st.success("📢 **Todos os colaboradores serão notificados**")
         setores_selecionados = []
         funcoes_selecionadas = []
-        usuarios_especificos = []
+        usuarios_ids = []
+    
+    # Regras de público: resolvidas na leitura, alcançam também futuros colaboradores
+    regras = RegrasAvisos.montar_regras_publico(todos_usuarios, setores_selecionados, funcoes_selecionadas, usuarios_ids)
+    total_publico = st.session_state.users_db.contar_publico(regras) if regras else 0
+    
+    if todos_usuarios:
+        st.success(f"📢 **Todos os colaboradores serão notificados** ({total_publico} pessoas)")
+    elif regras:
+        st.info(f"📢 {total_publico} colaboradores atendem aos filtros selecionados")
     
     st.markdown("---")
     
@@ -37,193 +49,233 @@ def menu_avisos():
         titulo = st.text_input("Título do Aviso", placeholder="Digite o título do aviso")
         conteudo = st.text_area("Conteúdo", placeholder="Digite o conteúdo do aviso", height=150)
         
+        col_publicar, col_expirar = st.columns(2)
+        with col_publicar:
+            data_publicacao = st.date_input("Publicar em", value=date.today(), min_value=date.today(), format="DD/MM/YYYY")
+        with col_expirar:
+            data_expiracao = st.date_input("Expira em (opcional)", value=None, min_value=date.today(), format="DD/MM/YYYY",
+                                           help="O aviso deixa de ser exibido ao final deste dia")
+        
         if st.form_submit_button("Publicar Aviso", type="primary", use_container_width=True):
             if not titulo or not conteudo:
                 st.error("Título e conteúdo são obrigatórios!")
                 return
             
-            # Determinar destinatários
-            if todos_usuarios:
-                destinatarios = st.session_state.users_db.get_users()
-            else:
-                destinatarios = _filtrar_destinatarios(setores_selecionados, funcoes_selecionadas, usuarios_especificos)
-                
-                # Se nenhum filtro foi selecionado, avisar
-                if not setores_selecionados and not funcoes_selecionadas and not usuarios_especificos:
-                    st.error("Selecione pelo menos um filtro: setor, função ou usuário específico!")
-                    return
+            # Se nenhum filtro foi selecionado, avisar
+            if not regras:
+                st.error("Selecione pelo menos um filtro: setor, função ou usuário específico!")
+                return
             
-            if not destinatarios:
+            if total_publico == 0:
                 st.error("Selecione pelo menos um destinatário!")
                 return
             
+            # Hoje = publicação imediata; expiração ao final do dia escolhido
+            publicar_em = datetime.now() if data_publicacao <= date.today() else datetime.combine(data_publicacao, time.min)
+            expira_em = datetime.combine(data_expiracao + timedelta(days=1), time.min) if data_expiracao else None
+            
+            validacao = RegrasAvisos.validar_periodo(publicar_em, expira_em)
+            if not validacao["valido"]:
+                st.error(validacao["erro"])
+                return
+            
             # Criar aviso
-            destinatarios_ids = [user['id'] for user in destinatarios]
             sucesso = st.session_state.users_db.criar_aviso(
-                titulo, conteudo, st.session_state.user['id'], destinatarios_ids
+                titulo, conteudo, st.session_state.user['id'], regras, publicar_em, expira_em
             )
             
-            if sucesso:
-                st.success(f"Aviso publicado para {len(destinatarios)} colaboradores!")
+            if sucesso and data_publicacao > date.today():
+                st.success(f"Aviso agendado para {data_publicacao.strftime('%d/%m/%Y')} ({total_publico} colaboradores)!")
+            elif sucesso:
+                st.success(f"Aviso publicado para {total_publico} colaboradores!")
             else:
                 st.error("Erro ao publicar aviso!")
     
     st.markdown("---")
     
+    # Busca textual nos avisos
+    st.markdown("##### Buscar Avisos")
+    
+    try:
+        _mostrar_busca_avisos()
+    except Exception as e:
+        st.error(f"Erro na busca de avisos: {type(e).__name__}: {str(e)}")
+    
+    st.markdown("---")
+    
     # Seção de matriz de leitura
     st.markdown("##### Status de Leitura por Colaborador")
     
     try:
-        matriz_dados = st.session_state.users_db.get_matriz_leitura_avisos()
-        
-        if not matriz_dados:
-            st.info("Nenhum aviso publicado ainda.")
-            return
-        
-        if len(matriz_dados) == 0:
-            st.info("Nenhum aviso ativo encontrado.")
-            return
-        else:
-            # Converter para DataFrame
-            df_matriz = pd.DataFrame(matriz_dados)
-            
-            # Adicionar coluna oculto se não existir (para compatibilidade)
-            if 'oculto' not in df_matriz.columns:
-                df_matriz['oculto'] = False
-            
-            # Criar tabela pivot: colaboradores x avisos
-            pivot_table = df_matriz.pivot_table(
-                index=['nome', 'setor', 'funcao'],
-                columns='titulo',
-                values='lido',
-                fill_value=False,
-                aggfunc='first'
-            )
-            
-            # Resetar índice
-            pivot_table = pivot_table.reset_index()
-            
-            # Converter para ícones
-            for col in pivot_table.columns:
-                if col not in ['nome', 'setor', 'funcao']:
-                    pivot_table[col] = pivot_table[col].apply(
-                        lambda x: '✅' if x else '❌'
-                    )
-            
-            # Verificar se há colunas necessárias
-            if 'titulo' not in df_matriz.columns or 'aviso_id' not in df_matriz.columns:
-                st.error("Dados de avisos incompletos")
-                return
-            
-            # Seletor de avisos com ações
-            avisos_disponiveis = df_matriz[['titulo', 'aviso_id']].drop_duplicates()
-            
-            if avisos_disponiveis.empty:
-                st.info("Nenhum aviso encontrado")
-                return
-            
-            avisos_dict = {str(row['titulo']): int(row['aviso_id']) for _, row in avisos_disponiveis.iterrows()}
-            
-
-            
-            col_sel, col_edit, col_del = st.columns([3, 1, 1])
-            
-            with col_sel:
-                aviso_selecionado = st.selectbox(
-                    "Selecionar aviso para visualizar:",
-                    list(avisos_dict.keys())
-                )
-            
-            # Obter ID do aviso selecionado
-            aviso_id = avisos_dict.get(aviso_selecionado)
-            
-            if not aviso_id:
-                st.error("ID do aviso não encontrado")
-                return
-            
-            with col_edit:
-                if st.button("Editar", key=f"edit_{aviso_id}", use_container_width=True):
-                    st.session_state.editando_aviso = aviso_id
-                    st.rerun()
-            
-            with col_del:
-                if st.button("Excluir", key=f"del_{aviso_id}", use_container_width=True, type="secondary"):
-                    if st.session_state.users_db.excluir_aviso(aviso_id):
-                        st.success("Aviso excluído!")
-                        st.rerun()
-                    else:
-                        st.error("Erro ao excluir aviso")
-            
-            # Mostrar formulário de edição se necessário
-            if st.session_state.get('editando_aviso'):
-                _mostrar_formulario_edicao(st.session_state.editando_aviso)
-                return
-            
-            # Filtrar dados pelo aviso selecionado
-            df_filtrado = df_matriz[df_matriz['titulo'] == aviso_selecionado]
-            
-            # Criar tabela apenas com o aviso selecionado
-            tabela_aviso = df_filtrado[['nome', 'setor', 'funcao', 'lido']].copy()
-            
-            # Criar status simples
-            tabela_aviso['status'] = tabela_aviso['lido'].apply(
-                lambda x: '✅ Lido' if x else '❌ Não lido'
-            )
-            
-            st.dataframe(
-                tabela_aviso[['nome', 'setor', 'funcao', 'status']],
-                column_config={
-                    'nome': 'Nome',
-                    'setor': 'Setor', 
-                    'funcao': 'Função',
-                    'status': 'Status'
-                },
-                use_container_width=True,
-                hide_index=True
-            )
-                
+        _mostrar_matriz_leitura()
     except Exception as e:
         st.error(f"Erro ao carregar matriz de leitura: {type(e).__name__}: {str(e)}")
 
 
+def _paginador(tamanho_pagina, chave, rotulo="Página"):
+    """Seletor de página; retorna o offset correspondente"""
+    pagina = st.number_input(rotulo, min_value=1, value=1, step=1, key=chave)
+    return (int(pagina) - 1) * tamanho_pagina
+
+def _legenda_pagina(offset, quantidade, total, descricao):
+    """Legenda com a faixa exibida e o total de registros"""
+    st.caption(f"Exibindo {offset + 1}–{offset + quantidade} de {total} {descricao}")
+
+def _mostrar_busca_avisos():
+    """Busca textual (português) em título e conteúdo dos avisos ativos"""
+    termo = st.text_input(
+        "Termos da busca", key="busca_avisos_admin",
+        placeholder='Ex.: férias coletivas, "plano de saúde", reunião -cancelada'
+    )
+    if not termo.strip():
+        return
+    
+    offset = _paginador(AVISOS_POR_PAGINA, "pagina_busca_avisos_admin", "Página de resultados")
+    resultados = st.session_state.users_db.buscar_avisos(termo.strip(), AVISOS_POR_PAGINA, offset)
+    
+    if not resultados:
+        st.info("Nenhum aviso encontrado.")
+        return
+    
+    df_resultados = pd.DataFrame(resultados)
+    df_resultados['data_criacao'] = df_resultados['data_criacao'].apply(
+        lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else str(x)
+    )
+    df_resultados['trecho'] = df_resultados['trecho'].str.replace('**', '', regex=False)
+    st.dataframe(
+        df_resultados[['titulo', 'data_criacao', 'autor_nome', 'trecho', 'relevancia']],
+        column_config={
+            'titulo': 'Aviso',
+            'data_criacao': 'Publicado em',
+            'autor_nome': 'Autor',
+            'trecho': 'Trecho',
+            'relevancia': 'Relevância'
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+    _legenda_pagina(offset, len(resultados), resultados[0]['total_resultados'], "avisos encontrados")
+
+def _mostrar_matriz_leitura():
+    """Matriz de leitura paginada: janela de avisos x janela de colaboradores"""
+    db = st.session_state.users_db
+    
+    # Página de avisos com taxa de leitura calculada no banco
+    offset_avisos = _paginador(AVISOS_POR_PAGINA, "pagina_avisos_matriz", "Página de avisos")
+    avisos = db.get_avisos_resumo_leitura(AVISOS_POR_PAGINA, offset_avisos)
+    
+    if not avisos:
+        if offset_avisos:
+            st.info("Página sem avisos. Volte para uma página anterior.")
+        else:
+            st.info("Nenhum aviso publicado ainda.")
+        return
+    
+    df_avisos = pd.DataFrame(avisos)
+    for coluna in ('publicar_em', 'expira_em'):
+        df_avisos[coluna] = df_avisos[coluna].apply(
+            lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else ''
+        )
+    st.dataframe(
+        df_avisos[['titulo', 'situacao', 'publicar_em', 'expira_em', 'total_destinatarios', 'total_lidos', 'taxa_leitura']],
+        column_config={
+            'titulo': 'Aviso',
+            'situacao': 'Situação',
+            'publicar_em': 'Publicado em',
+            'expira_em': 'Expira em',
+            'total_destinatarios': 'Destinatários',
+            'total_lidos': 'Lidos',
+            'taxa_leitura': st.column_config.NumberColumn('Taxa de Leitura', format="%.1f%%")
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+    _legenda_pagina(offset_avisos, len(avisos), avisos[0]['total_avisos'], "avisos")
+    
+    avisos_dict = {f"{aviso['titulo']} (#{aviso['aviso_id']})": int(aviso['aviso_id']) for aviso in avisos}
+    
+    col_sel, col_edit, col_del = st.columns([3, 1, 1])
+    
+    with col_sel:
+        aviso_selecionado = st.selectbox(
+            "Selecionar aviso para visualizar:",
+            list(avisos_dict.keys())
+        )
+    
+    aviso_id = avisos_dict.get(aviso_selecionado)
+    
+    with col_edit:
+        if st.button("Editar", key=f"edit_{aviso_id}", use_container_width=True):
+            st.session_state.editando_aviso = aviso_id
+            st.rerun()
+    
+    with col_del:
+        if st.button("Excluir", key=f"del_{aviso_id}", use_container_width=True, type="secondary"):
+            if db.excluir_aviso(aviso_id):
+                st.success("Aviso excluído!")
+                st.rerun()
+            else:
+                st.error("Erro ao excluir aviso")
+    
+    # Mostrar formulário de edição se necessário
+    if st.session_state.get('editando_aviso'):
+        _mostrar_formulario_edicao(st.session_state.editando_aviso)
+        return
+    
+    # Taxa de leitura por setor do aviso selecionado
+    taxas_setor = db.get_taxa_leitura_setores(aviso_id)
+    if taxas_setor:
+        st.markdown("###### Leitura por Setor")
+        st.dataframe(
+            pd.DataFrame(taxas_setor),
+            column_config={
+                'setor': 'Setor',
+                'total_destinatarios': 'Destinatários',
+                'total_lidos': 'Lidos',
+                'taxa_leitura': st.column_config.NumberColumn('Taxa de Leitura', format="%.1f%%")
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    # Janela de colaboradores x avisos da página atual
+    st.markdown("###### Colaboradores")
+    setor_filtro = st.selectbox("Setor", ['Todos'] + SETORES, key="setor_matriz_avisos")
+    setor = None if setor_filtro == 'Todos' else setor_filtro
+    
+    offset_usuarios = _paginador(COLABORADORES_POR_PAGINA, f"pagina_usuarios_matriz_{setor_filtro}", "Página de colaboradores")
+    
+    ids_pagina = [int(aviso['aviso_id']) for aviso in avisos]
+    linhas = db.get_matriz_leitura_pagina(ids_pagina, COLABORADORES_POR_PAGINA, offset_usuarios, setor)
+    
+    if not linhas:
+        st.info("Nenhum destinatário encontrado para os avisos desta página.")
+        return
+    
+    # Montagem da grade apenas para a janela carregada
+    titulos = {id_aviso: rotulo for rotulo, id_aviso in avisos_dict.items()}
+    grade = []
+    for linha in linhas:
+        leitura = dict(zip(linha['avisos_ids'], linha['lidos']))
+        registro = {'Nome': linha['nome'], 'Setor': linha['setor'], 'Função': linha['funcao']}
+        for id_aviso in ids_pagina:
+            if id_aviso in leitura:
+                registro[titulos[id_aviso]] = '✅' if leitura[id_aviso] else '❌'
+            else:
+                registro[titulos[id_aviso]] = '—'
+        grade.append(registro)
+    
+    st.dataframe(pd.DataFrame(grade), use_container_width=True, hide_index=True)
+    _legenda_pagina(offset_usuarios, len(linhas), linhas[0]['total_usuarios'], "colaboradores")
+
+
 def _get_usuarios_opcoes():
-    """Retorna lista de usuários para seleção"""
+    """Retorna usuários para seleção ({rótulo: id})"""
     try:
         usuarios = st.session_state.users_db.get_users()
-        return [f"{user['nome']} - {user['setor']}" for user in usuarios]
-    except:
-        return []
-
-def _filtrar_destinatarios(setores, funcoes, usuarios_especificos):
-    """Filtra destinatários baseado nos critérios selecionados"""
-    try:
-        todos_usuarios = st.session_state.users_db.get_users()
-        destinatarios = []
-        
-        # Filtrar por setores
-        if setores:
-            destinatarios.extend([user for user in todos_usuarios if user['setor'] in setores])
-        
-        # Filtrar por funções
-        if funcoes:
-            destinatarios.extend([user for user in todos_usuarios if user['funcao'] in funcoes])
-        
-        # Usuários específicos
-        if usuarios_especificos:
-            nomes_selecionados = [nome.split(' - ')[0] for nome in usuarios_especificos]
-            destinatarios.extend([user for user in todos_usuarios if user['nome'] in nomes_selecionados])
-        
-        # Remover duplicatas
-        destinatarios_unicos = []
-        ids_vistos = set()
-        for user in destinatarios:
-            if user['id'] not in ids_vistos:
-                destinatarios_unicos.append(user)
-                ids_vistos.add(user['id'])
-        
-        return destinatarios_unicos
+        return {f"{user['nome']} - {user['setor']}": user['id'] for user in usuarios}
     except:
-        return []
+        return {}
 
 def _mostrar_detalhes_aviso(aviso_id):
     """Mostra detalhes de leitura de um aviso específico"""
@@ -0,0 +1,171 @@
+import streamlit as st
+from ..utils.buffer_leituras import BufferLeituras
+
+AVISOS_POR_PAGINA = 10
+
+def _buffer_leituras():
+    """Buffer de leituras da sessão"""
+    if 'buffer_leituras' not in st.session_state:
+        st.session_state.buffer_leituras = BufferLeituras()
+    return st.session_state.buffer_leituras
+
+def descarregar_leituras_pendentes(forcar=False):
+    """Grava as leituras acumuladas se o buffer estiver cheio/antigo (ou se forçado)"""
+    buffer = st.session_state.get('buffer_leituras')
+    user = st.session_state.get('user')
+    if not buffer or not user or not len(buffer):
+        return
+    
+    if forcar or buffer.deve_descarregar():
+        buffer.descarregar(lambda ids: st.session_state.users_db.marcar_avisos_lidos(ids, user['id']))
+
+def _ocultar_aviso(aviso_id, usuario_id):
+    """Callback: grava leituras pendentes e oculta o aviso"""
+    descarregar_leituras_pendentes(forcar=True)
+    st.session_state.users_db.remover_aviso_usuario(aviso_id, usuario_id)
+
+def _marcar_todos_lidos(usuario_id):
+    """Callback: marca todos os avisos visíveis como lidos"""
+    descarregar_leituras_pendentes(forcar=True)
+    st.session_state.users_db.marcar_todos_avisos_lidos(usuario_id)
+
+def mostrar_avisos_pessoais(user, permitir_ocultar=True):
+    """
+    Seção de avisos da área pessoal.
+    
+    O cabeçalho mostra apenas a contagem de não lidos; a lista só é carregada
+    quando o usuário a expande, paginada e sem o conteúdo, que é buscado
+    aviso a aviso ao abrir.
+    """
+    descarregar_leituras_pendentes()
+    buffer = _buffer_leituras()
+    
+    # Leituras ainda no buffer já contam como lidas (atualização otimista)
+    nao_lidos = max(0, st.session_state.users_db.contar_avisos_nao_lidos(user['id']) - len(buffer))
+    
+    if nao_lidos:
+        st.markdown(f"##### Avisos :red[● {nao_lidos} não lido{'s' if nao_lidos > 1 else ''}]")
+    else:
+        st.markdown("##### Avisos")
+    
+    if not st.toggle("Mostrar avisos", key=f"mostrar_avisos_{user['id']}"):
+        return
+    
+    if nao_lidos:
+        st.button(
+            "Marcar todos como lidos", key=f"todos_lidos_{user['id']}",
+            on_click=_marcar_todos_lidos, args=(user['id'],)
+        )
+    
+    termo = st.text_input("Buscar nos meus avisos", key=f"busca_avisos_{user['id']}", placeholder="Palavras do título ou do conteúdo")
+    
+    try:
+        if termo.strip():
+            _mostrar_resultados_busca(user, termo.strip(), buffer, permitir_ocultar)
+            return
+        
+        # Paginação por chave: pilha de cursores das páginas já visitadas
+        chave_cursores = f"avisos_cursores_{user['id']}"
+        cursores = st.session_state.setdefault(chave_cursores, [None])
+        
+        avisos = st.session_state.users_db.get_avisos_usuario_pagina(
+            user['id'], AVISOS_POR_PAGINA + 1, cursores[-1]
+        )
+        
+        if not avisos:
+            st.info("Nenhum aviso disponível no momento.")
+            return
+        
+        tem_proxima = len(avisos) > AVISOS_POR_PAGINA
+        avisos = avisos[:AVISOS_POR_PAGINA]
+        
+        for aviso in avisos:
+            _mostrar_aviso(aviso, user, buffer, permitir_ocultar)
+        
+        # Navegação entre páginas
+        col_ant, col_prox = st.columns(2)
+        with col_ant:
+            if len(cursores) > 1 and st.button("← Mais recentes", key=f"avisos_anteriores_{user['id']}"):
+                cursores.pop()
+                st.rerun()
+        with col_prox:
+            if tem_proxima and st.button("Mais antigos →", key=f"avisos_proximos_{user['id']}"):
+                ultimo = avisos[-1]
+                cursores.append((ultimo['publicar_em'], ultimo['id']))
+                st.rerun()
+    
+    except Exception as e:
+        st.error("Erro ao carregar avisos")
+
+def _mostrar_resultados_busca(user, termo, buffer, permitir_ocultar):
+    """Resultados da busca textual, por relevância, restritos aos avisos do usuário"""
+    pagina = st.number_input("Página", min_value=1, value=1, step=1, key=f"pagina_busca_avisos_{user['id']}")
+    offset = (int(pagina) - 1) * AVISOS_POR_PAGINA
+    
+    resultados = st.session_state.users_db.buscar_avisos_usuario(user['id'], termo, AVISOS_POR_PAGINA, offset)
+    
+    if not resultados:
+        st.info("Nenhum aviso encontrado para a busca.")
+        return
+    
+    total = resultados[0]['total_resultados']
+    st.caption(f"{total} aviso(s) encontrado(s) • exibindo {offset + 1}–{offset + len(resultados)}")
+    
+    for aviso in resultados:
+        _mostrar_aviso(aviso, user, buffer, permitir_ocultar)
+
+def _mostrar_aviso(aviso, user, buffer, permitir_ocultar):
+    """Item da lista de avisos (conteúdo carregado sob demanda)"""
+    lido = aviso['lido'] or aviso['id'] in buffer
+    abertos = st.session_state.setdefault('avisos_abertos', set())
+    
+    with st.container():
+        col_aviso, col_status = st.columns([4, 1])
+        
+        with col_aviso:
+            # Título simples
+            if not lido:
+                st.markdown(f"**{aviso['titulo']}** (novo)")
+            else:
+                st.markdown(f"**{aviso['titulo']}**")
+            
+            # Informações de publicação
+            data_publicacao = aviso['publicar_em'].strftime("%d/%m/%Y")
+            st.caption(f"Por {aviso['autor_nome']} em {data_publicacao}")
+            
+            # Conteúdo carregado sob demanda (na busca, o trecho encontrado)
+            if aviso['id'] in abertos:
+                st.write(st.session_state.users_db.get_conteudo_aviso(aviso['id'], user['id']) or "")
+                if st.button("Recolher", key=f"recolher_{aviso['id']}"):
+                    abertos.discard(aviso['id'])
+                    st.rerun()
+            else:
+                if aviso.get('trecho'):
+                    st.markdown(f"…{aviso['trecho']}…")
+                if st.button("Ler aviso", key=f"abrir_{aviso['id']}"):
+                    abertos.add(aviso['id'])
+                    st.rerun()
+        
+        with col_status:
+            col_btn1, col_btn2 = st.columns(2)
+            
+            with col_btn1:
+                if not lido:
+                    st.button(
+                        "Marcar como Lido", key=f"lido_{aviso['id']}", type="secondary",
+                        on_click=buffer.adicionar, args=(aviso['id'],)
+                    )
+                else:
+                    st.success("Lido")
+                    if aviso['data_leitura']:
+                        data_leitura = aviso['data_leitura'].strftime("%d/%m/%Y")
+                        st.caption(f"em {data_leitura}")
+            
+            if permitir_ocultar:
+                with col_btn2:
+                    st.button(
+                        "Ocultar", key=f"remover_{aviso['id']}", help="Ocultar aviso", type="secondary",
+                        on_click=_ocultar_aviso, args=(aviso['id'], user['id'])
+                    )
+        
+        st.markdown("---")
\ No newline at end of file
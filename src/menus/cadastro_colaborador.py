@@ -10,9 +10,10 @@ from datetime import date
 from ..services.colaboradores_service import ColaboradoresService
 from ..utils.constants import SETORES, FUNCOES
 from ..utils.input_validation import safe_text_input, safe_selectbox, validate_form_data
-from ..utils.error_handler import safe_execute, log_operation
+from ..utils.error_handler import safe_execute, log_operation, CriticalOperationManager
 
 
+@CriticalOperationManager.monitor_resource_usage
 def menu_cadastro_colaborador():
     """
     Menu para cadastro de colaboradores - Interface pura.
@@ -138,6 +139,7 @@ def _exibir_erro_cadastro(resultado: dict):
         st.info("💡 O nome deve ter pelo menos 2 caracteres")
 
 
+@CriticalOperationManager.monitor_resource_usage
 def menu_listar_colaboradores():
     """
     Menu para listar colaboradores - Interface pura.
@@ -189,6 +191,7 @@ def menu_listar_colaboradores():
     st.caption(f"Total: {colaboradores_result['total']} colaborador(es)")
 
 
+@CriticalOperationManager.monitor_resource_usage
 def menu_editar_colaborador():
     """
     Menu para editar colaboradores - Interface pura.
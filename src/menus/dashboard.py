@@ -1,5 +1,9 @@
 import streamlit as st
 import pandas as pd
+from datetime import date
+from ..services.cobertura_service import CoberturaService, MESES_ABREVIADOS
+from ..utils.error_handler import CriticalOperationManager
+from ..utils.ui_components import create_paginated_table
 
 def mostrar_alertas_sistema():
     """Função vazia para manter compatibilidade"""
@@ -9,6 +13,7 @@ def mostrar_painel_alertas():
     """Função vazia para manter compatibilidade"""
     pass
 
+@CriticalOperationManager.monitor_resource_usage
 def menu_dashboard():
     """Relatórios principal com métricas e alertas"""
     st.markdown("#### Relatórios")
@@ -19,6 +24,10 @@ def menu_dashboard():
     # Métricas gerais
     _mostrar_metricas_gerais()
     
+    # Mapa de ausências por setor
+    st.markdown("---")
+    _mostrar_mapa_ausencias()
+    
     # Painel de alertas para RH
     user_nivel = st.session_state.get('user', {}).get('nivel_acesso', '')
     if user_nivel == 'master':
@@ -28,77 +37,84 @@ def menu_dashboard():
 def _mostrar_metricas_gerais():
     """Mostra métricas gerais do sistema"""
     try:
-        users_list = st.session_state.users_db.get_users()
-        
-        # Verificar se retornou None ou lista válida
-        if users_list is None:
-            st.error("Erro ao carregar dados dos colaboradores") 
-            return
+        # Resumo por setor mantido por triggers (tabela setor_stats)
+        estatisticas = st.session_state.users_db.get_setor_stats()
         
-        # Converter lista para DataFrame se necessário
-        if isinstance(users_list, list):
-            if not users_list:
-                st.info("Nenhum dado disponível")
-                return
-            users_df = pd.DataFrame(users_list)
+        if estatisticas:
+            por_setor = {linha['setor']: linha for linha in estatisticas}
+            colaboradores_total = sum(linha['colaboradores'] for linha in estatisticas)
+            saldo_geral = sum(linha['saldo_total'] for linha in estatisticas)
+            total_geral = {
+                'colaboradores': colaboradores_total,
+                'saldo_total': saldo_geral,
+                'saldo_medio': round(saldo_geral / colaboradores_total, 1) if colaboradores_total else 0,
+                'dias_pendentes': sum(linha['dias_pendentes'] for linha in estatisticas),
+                'dias_aprovados': sum(linha['dias_aprovados'] for linha in estatisticas)
+            }
         else:
-            users_df = users_list
-            if users_df.empty:
-                st.info("Nenhum dado disponível")
+            # Fallback: agregação direta (GROUP BY ROLLUP)
+            estatisticas = st.session_state.users_db.get_estatisticas_setores()
+            
+            # Verificar se retornou None ou lista válida
+            if estatisticas is None:
+                st.error("Erro ao carregar dados dos colaboradores") 
                 return
+            
+            por_setor = {linha['setor']: linha for linha in estatisticas if not linha['total_geral']}
+            total_geral = next((linha for linha in estatisticas if linha['total_geral']), None)
+        
+        if not total_geral or total_geral['colaboradores'] == 0:
+            st.info("Nenhum dado disponível")
+            return
         
         # Filtro por setor - usar constantes como base
         from ..utils.constants import SETORES
-        setores_banco = users_df['setor'].unique().tolist()
         setores_disponiveis = ['Todos'] + SETORES
         setor_selecionado = st.selectbox("Filtrar por Setor:", setores_disponiveis)
         
         # Aplicar filtro
         if setor_selecionado != 'Todos':
-            users_filtered = users_df[users_df['setor'] == setor_selecionado]
+            resumo = por_setor.get(setor_selecionado)
         else:
-            users_filtered = users_df
+            resumo = total_geral
+        
+        colaboradores = resumo['colaboradores'] if resumo else 0
+        saldo_medio = float(resumo['saldo_medio'] or 0) if resumo else 0.0
+        saldo_total = resumo['saldo_total'] if resumo else 0
+        dias_pendentes = resumo.get('dias_pendentes') if resumo else 0
         
         # Métricas principais
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            total_colaboradores = len(users_filtered)
-            st.metric("Total de Colaboradores", total_colaboradores)
+            st.metric("Total de Colaboradores", colaboradores)
         
         with col2:
-            saldo_medio = users_filtered['saldo_ferias'].mean()
             st.metric("Saldo Médio", f"{saldo_medio:.1f} dias")
     
         with col3:
-            saldo_total = users_filtered['saldo_ferias'].sum()
             st.metric("Saldo Total", f"{saldo_total} dias")
         
+        if dias_pendentes is not None:
+            with col4:
+                st.metric("Dias Pendentes", f"{dias_pendentes} dias")
+        
         # Gráficos por setor
         if setor_selecionado == 'Todos':
             st.markdown("----")
             st.markdown("##### Distribuição por Setor")
             
-            # Criar estatísticas para todos os setores das constantes
-            from ..utils.constants import SETORES
+            # Uma linha por setor das constantes, a partir do resultado agregado
             setor_data = []
-            
             for setor in SETORES:
-                setor_users = users_df[users_df['setor'] == setor]
-                if not setor_users.empty:
-                    colaboradores = len(setor_users)
-                    saldo_medio = setor_users['saldo_ferias'].mean()
-                    saldo_total = setor_users['saldo_ferias'].sum()
-                else:
-                    colaboradores = 0
-                    saldo_medio = 0.0
-                    saldo_total = 0
-                
+                linha = por_setor.get(setor)
                 setor_data.append({
                     'Setor': setor,
-                    'Colaboradores': colaboradores,
-                    'Saldo Médio': round(saldo_medio, 1),
-                    'Saldo Total': saldo_total
+                    'Colaboradores': linha['colaboradores'] if linha else 0,
+                    'Saldo Médio': float(linha['saldo_medio'] or 0) if linha else 0.0,
+                    'Saldo Total': linha['saldo_total'] if linha else 0,
+                    'Dias Pendentes': linha.get('dias_pendentes', 0) if linha else 0,
+                    'Dias Aprovados': linha.get('dias_aprovados', 0) if linha else 0
                 })
             
             setor_stats_df = pd.DataFrame(setor_data)
@@ -108,15 +124,75 @@ def _mostrar_metricas_gerais():
         else:
             st.markdown(f"##### Detalhes do Setor: {setor_selecionado}")
             
-            if users_filtered.empty:
+            if colaboradores == 0:
                 st.info(f"Nenhum colaborador cadastrado no setor {setor_selecionado}")
             else:
-                # Mostrar colaboradores do setor com data formatada
-                users_display = users_filtered[['nome', 'funcao', 'saldo_ferias', 'data_admissao']].copy()
-                users_display['data_admissao'] = users_display['data_admissao'].apply(
-                    lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else str(x)
+                # Lista detalhada carregada apenas no drill-down do setor, uma página por vez
+                create_paginated_table(
+                    "dashboard_setor",
+                    lambda limite, cursor, ordenar_por, decrescente: st.session_state.users_db.listar_usuarios(
+                        setor=setor_selecionado, ordenar_por=ordenar_por, decrescente=decrescente,
+                        limite=limite, cursor=cursor
+                    ),
+                    {'nome': 'Nome', 'funcao': 'Função', 'saldo_ferias': 'Saldo', 'data_admissao': 'Admissão'},
+                    {"Nome": ("nome", False), "Saldo (maior primeiro)": ("saldo_ferias", True), "Função": ("funcao", False)},
+                    descricao="colaboradores",
+                    filtros=setor_selecionado,
+                    formatar=_formatar_datas_admissao
                 )
-                st.dataframe(users_display, use_container_width=True, hide_index=True)
         
     except Exception as e:
-        st.error(f"Erro ao carregar métricas: {str(e)}")
\ No newline at end of file
+        st.error(f"Erro ao carregar métricas: {str(e)}")
+
+def _formatar_datas_admissao(df):
+    """Data de admissão no formato brasileiro"""
+    df['data_admissao'] = df['data_admissao'].apply(
+        lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else ''
+    )
+    return df
+
+def _mostrar_mapa_ausencias():
+    """Mapa de calor de férias aprovadas por setor (mapas mensais em cache)"""
+    st.markdown("##### Mapa de Ausências")
+    
+    hoje = date.today()
+    col_ano, col_visao, col_medida = st.columns(3)
+    with col_ano:
+        ano = st.number_input("Ano", min_value=2000, max_value=hoje.year + 5, value=hoje.year, step=1, key="mapa_ausencias_ano")
+    with col_visao:
+        visao = st.selectbox("Visão", ["Ano"] + list(MESES_ABREVIADOS), key="mapa_ausencias_visao")
+    with col_medida:
+        medida = st.selectbox(
+            "Medida", ["Pico de ausentes no mesmo dia", "Dias de ausência"],
+            key="mapa_ausencias_medida", disabled=(visao != "Ano")
+        )
+    
+    service = CoberturaService(st.session_state.ferias_db)
+    if visao == "Ano":
+        resultado = service.mapa_ausencias_ano(int(ano), "pico" if medida.startswith("Pico") else "dias")
+    else:
+        resultado = service.mapa_ausencias_mes(int(ano), MESES_ABREVIADOS.index(visao) + 1)
+    
+    if not resultado["sucesso"]:
+        st.error(resultado["erro"])
+        return
+    
+    mapa = resultado["mapa"]
+    if not mapa.values.any():
+        st.info("Nenhuma férias aprovada no período")
+        return
+    
+    st.dataframe(_colorir_mapa(mapa), use_container_width=True)
+    st.caption("Férias aprovadas, pelo setor atual de cada colaborador")
+
+def _colorir_mapa(mapa):
+    """Intensidade da cor proporcional ao valor da célula"""
+    maximo = mapa.values.max() or 1
+    
+    def cor(valor):
+        if not valor:
+            return ""
+        intensidade = 0.15 + 0.85 * valor / maximo
+        return f"background-color: rgba(220, 53, 69, {intensidade:.2f})"
+    
+    return mapa.style.map(cor)
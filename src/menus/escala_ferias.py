@@ -0,0 +1,112 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+from ..services.escala_service import EscalaService, ler_preferencias
+from ..utils.constants import SETORES
+from ..utils.error_handler import CriticalOperationManager
+
+@CriticalOperationManager.monitor_resource_usage
+def menu_escala_ferias():
+    """Menu para montar a escala anual de férias por setor"""
+    st.markdown("#### Escala Anual de Férias")
+    st.caption(
+        "Distribui as férias do ano respeitando o limite de ausentes de cada setor "
+        "e os períodos bloqueados, priorizando as janelas preferidas de cada colaborador."
+    )
+
+    hoje = date.today()
+    col_ano, col_duracao, col_setores = st.columns([1, 1, 2])
+    with col_ano:
+        ano = st.selectbox("Ano", [hoje.year, hoje.year + 1], index=1, key="escala_ano")
+    with col_duracao:
+        duracao = st.number_input("Dias úteis por colaborador", min_value=1, max_value=30, value=10, step=1, key="escala_duracao")
+    with col_setores:
+        setores = st.multiselect("Setores (vazio = todos)", SETORES, key="escala_setores")
+
+    arquivo = st.file_uploader(
+        "Preferências (CSV ou Excel com colunas email, inicio, fim e, opcionalmente, prioridade)",
+        type=["csv", "xlsx"], key="escala_preferencias"
+    )
+
+    st.markdown("##### Períodos bloqueados")
+    bloqueios = st.data_editor(
+        pd.DataFrame({"Início": pd.Series(dtype="object"), "Fim": pd.Series(dtype="object"), "Setor": pd.Series(dtype="object")}),
+        column_config={
+            "Início": st.column_config.DateColumn("Início", format="DD/MM/YYYY", required=True),
+            "Fim": st.column_config.DateColumn("Fim", format="DD/MM/YYYY", required=True),
+            "Setor": st.column_config.SelectboxColumn("Setor (vazio = todos)", options=SETORES),
+        },
+        num_rows="dynamic", use_container_width=True, hide_index=True, key="escala_bloqueios"
+    )
+
+    service = EscalaService(st.session_state.ferias_db, st.session_state.users_db)
+
+    if st.button("Gerar Escala", type="secondary"):
+        preferencias = {}
+        if arquivo is not None:
+            try:
+                preferencias, ignoradas = ler_preferencias(arquivo, st.session_state.users_db.get_users())
+            except Exception as e:
+                st.error(f"Erro ao ler preferências: {e}")
+                return
+            if ignoradas:
+                st.warning(f"{len(ignoradas)} linha(s) ignorada(s): " + "; ".join(ignoradas[:10]))
+
+        periodos_bloqueados = [
+            (linha["Início"], linha["Fim"], linha["Setor"] or None)
+            for _, linha in bloqueios.dropna(subset=["Início", "Fim"]).iterrows()
+        ]
+        with st.spinner("Montando escala..."):
+            st.session_state.escala_ferias = service.gerar_escala(
+                int(ano), preferencias, int(duracao), periodos_bloqueados, setores or None
+            )
+
+    resultado = st.session_state.get("escala_ferias")
+    if not resultado:
+        return
+
+    if not resultado["sucesso"]:
+        st.error(resultado["erro"])
+        return
+
+    _mostrar_previa(resultado)
+
+    if resultado["alocacoes"] and st.button("Gravar como Pendentes", type="primary"):
+        gravacao = service.gravar_escala(resultado["alocacoes"])
+        if gravacao["sucesso"]:
+            st.success(f"{gravacao['gravadas']} férias cadastradas como Pendente")
+            if gravacao["ignoradas"]:
+                st.warning(f"{gravacao['ignoradas']} alocação(ões) ignorada(s) por conflito com férias cadastradas após a prévia")
+            del st.session_state.escala_ferias
+        else:
+            st.error(gravacao["erro"])
+
+def _mostrar_previa(resultado):
+    """Prévia da escala com os indicadores de satisfação"""
+    alocacoes = resultado["alocacoes"]
+    na_preferencia = sum(1 for a in alocacoes if a["preferencia"] is not None)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Alocados", len(alocacoes))
+    col2.metric("Na preferência", na_preferencia)
+    col3.metric("Sem vaga", len(resultado["nao_alocados"]))
+    col4.metric("Satisfação", f"{resultado['satisfacao']:.0%}")
+
+    if alocacoes:
+        tabela = pd.DataFrame([
+            {
+                "Colaborador": a["nome"],
+                "Setor": a["setor"],
+                "Início": a["data_inicio"].strftime('%d/%m/%Y'),
+                "Fim": a["data_fim"].strftime('%d/%m/%Y'),
+                "Dias úteis": a["dias_cobrados"],
+                "Preferência": f"{a['preferencia'] + 1}ª" if a["preferencia"] is not None else "Fora",
+            }
+            for a in alocacoes
+        ])
+        st.dataframe(tabela, use_container_width=True, hide_index=True)
+
+    if resultado["nao_alocados"]:
+        st.warning("Sem vaga no ano: " + ", ".join(str(nome) for nome in resultado["nao_alocados"]))
+    if resultado["sem_saldo"]:
+        st.caption("Sem saldo: " + ", ".join(resultado["sem_saldo"]))
@@ -0,0 +1,185 @@
+import streamlit as st
+import pandas as pd
+from datetime import date
+from ..services.cobertura_service import CoberturaService
+from ..services.ferias_service import FeriasService
+from ..services.saldo_service import SaldoService
+from ..utils.ui_components import create_paginated_table
+
+ORDENACOES_FERIAS = {
+    "Mais recentes": ("data_inicio", True),
+    "Mais antigas": ("data_inicio", False),
+    "Mais dias": ("dias_utilizados", True),
+    "Status": ("status", False),
+}
+
+TIPOS_MOVIMENTO_LABEL = {
+    'abertura': 'Saldo inicial',
+    'ferias': 'Férias',
+    'estorno': 'Estorno de férias',
+    'renovacao': 'Renovação anual',
+    'renovacao_desfeita': 'Renovação desfeita',
+    'acumulo': 'Aniversário de admissão',
+    'ajuste': 'Ajuste',
+    'ajuste_direto': 'Ajuste direto',
+}
+
+def _formatar_datas(df):
+    """Datas no formato brasileiro"""
+    for coluna in ('data_inicio', 'data_fim'):
+        df[coluna] = df[coluna].apply(lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else str(x))
+    return df
+
+def mostrar_ferias_pessoais(user):
+    """
+    Seção "Minhas Férias" da área pessoal.
+    
+    O histórico é paginado no banco; o total de dias aprovados vem da mesma
+    consulta, sem carregar o histórico inteiro.
+    """
+    st.markdown("##### Minhas Férias")
+    
+    try:
+        ferias = create_paginated_table(
+            f"minhas_ferias_{user['id']}",
+            lambda limite, cursor, ordenar_por, decrescente: st.session_state.ferias_db.get_ferias_usuario_pagina(
+                user['id'], ordenar_por, decrescente, cursor, limite
+            ),
+            {
+                'data_inicio': 'Data Início',
+                'data_fim': 'Data Fim',
+                'dias_utilizados': 'Dias',
+                'status': 'Status'
+            },
+            ORDENACOES_FERIAS,
+            tamanhos_pagina=(10, 25, 50),
+            descricao="períodos",
+            formatar=_formatar_datas,
+            vazio="Nenhuma férias cadastrada"
+        )
+        
+        if not ferias:
+            return
+        
+        # Estatísticas das férias (todo o histórico)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Dias Aprovados", f"{ferias[0]['total_dias_aprovados']} dias")
+        with col2:
+            st.metric("Saldo Restante", f"{user['saldo_ferias']} dias")
+    
+    except Exception as e:
+        st.error(f"Erro ao carregar informações pessoais: {str(e)}")
+        st.info("Verifique se você possui férias cadastradas no sistema")
+
+def _formatar_extrato(df):
+    """Data/hora e tipo do movimento para exibição"""
+    df['data_movimento'] = pd.to_datetime(df['data_movimento']).dt.strftime('%d/%m/%Y %H:%M')
+    df['tipo'] = df['tipo'].map(lambda tipo: TIPOS_MOVIMENTO_LABEL.get(tipo, tipo))
+    return df
+
+def mostrar_extrato_saldo(user):
+    """Extrato de movimentos do saldo e saldo em uma data"""
+    with st.expander("Extrato do saldo"):
+        dia = st.date_input("Saldo em", value=date.today(), max_value=date.today(),
+                            format="DD/MM/YYYY", key=f"saldo_em_{user['id']}")
+        saldo = SaldoService(st.session_state.users_db).saldo_em(user['id'], dia)["saldo"]
+        if saldo is None:
+            st.info("Sem registro de saldo nesta data")
+        else:
+            st.metric(f"Saldo em {dia.strftime('%d/%m/%Y')}", f"{saldo} dias")
+
+        create_paginated_table(
+            f"extrato_saldo_{user['id']}",
+            lambda limite, cursor, ordenar_por, decrescente: st.session_state.users_db.get_extrato_pagina(
+                user['id'], cursor, limite
+            ),
+            {
+                'data_movimento': 'Data',
+                'tipo': 'Movimento',
+                'dias': 'Dias',
+                'saldo_apos': 'Saldo',
+                'motivo': 'Motivo',
+                'usuario_responsavel_nome': 'Responsável'
+            },
+            {"Mais recentes": ("data_movimento", True)},
+            tamanhos_pagina=(20, 50, 100),
+            descricao="movimentos",
+            formatar=_formatar_extrato,
+            vazio="Nenhum movimento registrado"
+        )
+
+def mostrar_ausencias_equipe(user):
+    """
+    Seção "Quem está de férias" da área pessoal.
+    
+    Lista compacta das férias aprovadas de hoje ou da semana, em cache no
+    servidor até a virada do dia ou a próxima alteração de férias.
+    """
+    st.markdown("##### Quem está de férias")
+    
+    col_janela, col_escopo = st.columns(2)
+    with col_janela:
+        janela = st.radio("Período", ["Hoje", "Esta semana"], horizontal=True, key=f"ausentes_janela_{user['id']}")
+    with col_escopo:
+        escopo = st.radio("Equipe", ["Meu setor", "Empresa"], horizontal=True, key=f"ausentes_escopo_{user['id']}")
+    
+    resultado = CoberturaService(st.session_state.ferias_db).quem_esta_fora(
+        "hoje" if janela == "Hoje" else "semana",
+        user['setor'] if escopo == "Meu setor" else None
+    )
+    
+    if not resultado["sucesso"]:
+        st.error(resultado["erro"])
+        return
+    
+    if not resultado["ausentes"]:
+        st.caption("Ninguém de férias no período")
+        return
+    
+    for ausente in resultado["ausentes"]:
+        setor = f" ({ausente['setor']})" if escopo == "Empresa" else ""
+        st.markdown(
+            f"- **{ausente['nome']}**{setor}: "
+            f"{ausente['data_inicio'].strftime('%d/%m')} a {ausente['data_fim'].strftime('%d/%m/%Y')}"
+        )
+
+def mostrar_sugestoes_periodo(user):
+    """
+    Planejador "Sugerir períodos": janelas que emendam fins de semana e
+    feriados, sem conflitar com as férias aprovadas da equipe.
+    """
+    with st.expander("Sugerir períodos de férias"):
+        hoje = date.today()
+        col_ano, col_duracao, col_flex = st.columns(3)
+        with col_ano:
+            ano = st.selectbox("Ano", [hoje.year, hoje.year + 1], key=f"sugestao_ano_{user['id']}")
+        with col_duracao:
+            duracao = st.number_input("Dias úteis", min_value=1, max_value=30, value=5, step=1, key=f"sugestao_duracao_{user['id']}")
+        with col_flex:
+            flexibilidade = st.number_input("Flexibilidade (± dias)", min_value=0, max_value=5, value=0, step=1, key=f"sugestao_flex_{user['id']}")
+        
+        if not st.button("Buscar sugestões", key=f"sugestao_buscar_{user['id']}"):
+            return
+        
+        service = FeriasService(st.session_state.ferias_db, st.session_state.users_db)
+        resultado = service.sugerir_periodos(user, int(ano), int(duracao), int(flexibilidade))
+        
+        if not resultado["sucesso"]:
+            st.error(resultado["erro"])
+            return
+        
+        if resultado["vazio"]:
+            st.info("Nenhum período disponível com esses critérios")
+            return
+        
+        tabela = pd.DataFrame([
+            {
+                "Férias": f"{s['data_inicio'].strftime('%d/%m/%Y')} a {s['data_fim'].strftime('%d/%m/%Y')}",
+                "Dias úteis": s['dias_cobrados'],
+                "Descanso": f"{s['dias_descanso']} dias ({s['descanso_inicio'].strftime('%d/%m')} a {s['descanso_fim'].strftime('%d/%m')})",
+                "Dias acima do limite da equipe": s['dias_conflito'],
+            }
+            for s in resultado["sugestoes"]
+        ])
+        st.dataframe(tabela, use_container_width=True, hide_index=True)
@@ -1,7 +1,36 @@
 import streamlit as st
-import pandas as pd
 from ..config import SETORES, FUNCOES
+from ..utils.error_handler import CriticalOperationManager
+from ..utils.ui_components import create_paginated_table
 
+# Faixas do filtro de saldo: rótulo -> (mínimo, máximo), inclusivos
+FAIXAS_SALDO = {
+    "Todos": (None, None),
+    "Baixo (menor que 3 dias)": (None, 2),
+    "Normal (3-8 dias)": (3, 8),
+    "Alto (maior que 8 dias)": (9, None),
+}
+
+# Ordenação da tabela: rótulo -> (coluna, decrescente); None = relevância na busca, nome fora dela
+ORDENACOES = {
+    "Nome (ou relevância na busca)": (None, False),
+    "Setor": ("setor", False),
+    "Função": ("funcao", False),
+    "Saldo (maior primeiro)": ("saldo_ferias", True),
+    "Saldo (menor primeiro)": ("saldo_ferias", False),
+}
+
+STATUS = {"Ativos": "ativos", "Inativos": "inativos", "Todos": "todos"}
+
+COLUNAS_TABELA = {
+    'nome': 'Nome',
+    'setor': 'Setor',
+    'funcao': 'Função',
+    'saldo_ferias': 'Saldo (dias)',
+    'situacao': 'Status',
+}
+
+@CriticalOperationManager.monitor_resource_usage
 def menu_gerenciar_colaboradores():
     """Menu para gerenciar colaboradores"""
     st.markdown("#### Gerenciar Colaboradores")
@@ -11,52 +40,38 @@ def menu_gerenciar_colaboradores():
     with col_status:
         status_filter = st.selectbox(
             "Filtrar por Status",
-            ["Ativos", "Inativos", "Todos"],
+            list(STATUS.keys()),
             help="Escolha quais colaboradores visualizar"
         )
     
-    # Buscar colaboradores baseado no filtro
-    if status_filter == "Ativos":
-        users_list = st.session_state.users_db.get_users(incluir_inativos=False)
-    elif status_filter == "Inativos":
-        # Buscar todos e filtrar apenas inativos
-        all_users = st.session_state.users_db.get_users(incluir_inativos=True)
-        users_list = [user for user in all_users if not user.get('ativo', True)]
-    else:  # "Todos"
-        users_list = st.session_state.users_db.get_users(incluir_inativos=True)
-    
-    # Verificar se retornou None ou lista válida
-    if users_list is None:
-        st.error("Erro ao carregar dados dos colaboradores")
-        return
-    
-    # Converter lista para DataFrame
-    if isinstance(users_list, list):
-        if not users_list:
-            st.warning("Nenhum colaborador cadastrado")
-            return
-        users_df = pd.DataFrame(users_list)
-    else:
-        users_df = users_list
-        if users_df.empty:
-            st.warning("Nenhum colaborador cadastrado")
-            return
-    
     # Filtros melhorados
-    filtro_nome, filtro_setor, filtro_funcao, filtro_saldo = _mostrar_filtros_avancados(users_df)
+    filtro_nome, filtro_setor, filtro_funcao, filtro_saldo = _mostrar_filtros_avancados()
+    saldo_min, saldo_max = FAIXAS_SALDO[filtro_saldo]
+    
+    filtros = {
+        'status': STATUS[status_filter],
+        'setor': None if filtro_setor == "Todos" else filtro_setor,
+        'funcao': None if filtro_funcao == "Todos" else filtro_funcao,
+        'saldo_min': saldo_min,
+        'saldo_max': saldo_max,
+        'termo': filtro_nome,
+    }
+    
+    # Filtros, ordenação e paginação aplicados no banco
+    def carregar(limite, cursor, ordenar_por, decrescente):
+        return st.session_state.users_db.listar_usuarios(
+            ordenar_por=ordenar_por, decrescente=decrescente, limite=limite, cursor=cursor, **filtros
+        )
     
-    # Aplicar filtros
-    df_filtrado = _aplicar_filtros(users_df, filtro_nome, filtro_setor, filtro_funcao, filtro_saldo)
-   
     # Tabela principal com ações
-    _mostrar_tabela_colaboradores(df_filtrado)
+    _mostrar_tabela_colaboradores(carregar, filtros)
 
-def _mostrar_filtros_avancados(users_df):
+def _mostrar_filtros_avancados():
     """Filtros avançados e busca"""
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        filtro_nome = st.text_input("Buscar Nome", key="busca_nome")
+        filtro_nome = st.text_input("Buscar Nome", key="busca_nome", help="Acentos e maiúsculas são ignorados")
     
     with col2:
         filtro_setor = st.selectbox("Setor", ["Todos"] + SETORES, key="filtro_setor")
@@ -65,68 +80,41 @@ def _mostrar_filtros_avancados(users_df):
         filtro_funcao = st.selectbox("Função", ["Todos"] + FUNCOES, key="filtro_funcao")
     
     with col4:
-        filtro_saldo = st.selectbox("Filtrar por Saldo", ["Todos", "Baixo (menor que 3 dias)", "Normal (3-8 dias)", "Alto (maior que 8 dias)"], key="filtro_saldo")
+        filtro_saldo = st.selectbox("Filtrar por Saldo", list(FAIXAS_SALDO.keys()), key="filtro_saldo")
     
     return filtro_nome, filtro_setor, filtro_funcao, filtro_saldo
 
-def _aplicar_filtros(users_df, filtro_nome, filtro_setor, filtro_funcao, filtro_saldo):
-    """Aplica filtros selecionados"""
-    df = users_df.copy()
-    
-    if filtro_nome:
-        df = df[df['nome'].str.contains(filtro_nome, case=False, na=False)]
-    
-    if filtro_setor != 'Todos':
-        df = df[df['setor'] == filtro_setor]
-    
-    if filtro_funcao != 'Todos':
-        df = df[df['funcao'] == filtro_funcao]
-    
-    if filtro_saldo != 'Todos':
-        if filtro_saldo == "Baixo (<3)":
-            df = df[df['saldo_ferias'] < 3]
-        elif filtro_saldo == "Normal (3-8)":
-            df = df[(df['saldo_ferias'] >= 3) & (df['saldo_ferias'] <= 8)]
-        elif filtro_saldo == "Alto (>8)":
-            df = df[df['saldo_ferias'] > 8]
-    
+def _formatar_tabela(df):
+    """Status legível na tabela"""
+    df['situacao'] = df['ativo'].map(lambda ativo: "Inativo" if ativo == False else "Ativo")
     return df
 
-def _mostrar_tabela_colaboradores(df_filtrado):
+def _mostrar_tabela_colaboradores(carregar, filtros):
     """Tabela principal com ações claras"""
-    # Contar ativos e inativos
-    if not df_filtrado.empty:
-        ativos = len(df_filtrado[df_filtrado.get('ativo', True) == True])
-        inativos = len(df_filtrado[df_filtrado.get('ativo', True) == False])
-        status_info = f" ({ativos} ativos, {inativos} inativos)" if inativos > 0 else f" ({ativos} ativos)"
-    else:
-        status_info = ""
-    
-    st.markdown(f"##### Colaboradores ({len(df_filtrado)} encontrados){status_info}")
-    
-    if df_filtrado.empty:
-        st.info("Nenhum colaborador encontrado com os filtros aplicados")
+    usuarios = create_paginated_table(
+        "colaboradores", carregar, COLUNAS_TABELA, ORDENACOES,
+        descricao="colaboradores", filtros=filtros, formatar=_formatar_tabela,
+        vazio="Nenhum colaborador encontrado com os filtros aplicados"
+    )
+    if not usuarios:
         return
     
-    # Ordenar por nome
-    df_sorted = df_filtrado.sort_values('nome').reset_index(drop=True)
-    
-    if len(df_sorted) > 0:
-        nomes_ordenados = []
-        for _, row in df_sorted.iterrows():
-            nomes_ordenados.append(f"{row['nome']} - {row['setor']} ({row['saldo_ferias']} dias)")
-        selected_index = st.selectbox(
-            "Selecionar colaborador",
-            options=range(len(nomes_ordenados)),
-            format_func=lambda x: nomes_ordenados[x],
-            key="selected_user"
-        )
-    else:
-        selected_index = None
-    
-    if selected_index is not None and len(df_sorted) > 0:
-        user_data = df_sorted.iloc[selected_index]
-        _mostrar_acoes_colaborador(user_data)
+    # Contagens do resultado completo (calculadas no banco)
+    ativos = usuarios[0]['total_ativos']
+    inativos = usuarios[0]['total_inativos']
+    status_info = f"{ativos} ativos, {inativos} inativos" if inativos > 0 else f"{ativos} ativos"
+    st.caption(f"Resultado: {status_info}")
+    
+    nomes = [f"{user['nome']} - {user['setor']} ({user['saldo_ferias']} dias)" for user in usuarios]
+    selected_index = st.selectbox(
+        "Selecionar colaborador",
+        options=range(len(nomes)),
+        format_func=lambda x: nomes[x],
+        key="selected_user"
+    )
+    
+    if selected_index is not None and selected_index < len(usuarios):
+        _mostrar_acoes_colaborador(usuarios[selected_index])
 
 def _mostrar_acoes_colaborador(user_data):
     """Ações claras para o colaborador selecionado"""
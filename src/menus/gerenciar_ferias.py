@@ -9,9 +9,14 @@ import streamlit as st
 import pandas as pd
 from datetime import date
 from ..services.ferias_service import FeriasService
+from ..services.cobertura_service import CoberturaService
 from ..utils.feedback_usuario import mostrar_saldo_atual_vs_pendente
+from ..utils.error_handler import CriticalOperationManager
 
+LIMITE_OPCOES_COLABORADOR = 20
 
+
+@CriticalOperationManager.monitor_resource_usage
 def menu_gerenciar_ferias():
     """
     Menu principal para gerenciar férias - Interface pura.
@@ -27,16 +32,20 @@ def menu_gerenciar_ferias():
     # Inicializar serviço
     service = FeriasService(st.session_state.ferias_db, st.session_state.users_db)
     
-    # Obter usuários para seleção
-    usuarios_result = service.obter_usuarios_para_selecao()
+    # Busca por nome: apenas os melhores resultados vão para a seleção
+    termo = st.text_input("Buscar Colaborador", key="busca_colaborador_ferias",
+                          placeholder="Digite parte do nome (acentos são ignorados)")
+    usuarios_result = service.obter_usuarios_para_selecao(termo, LIMITE_OPCOES_COLABORADOR)
     
     if not usuarios_result["sucesso"]:
         st.warning(usuarios_result["erro"])
         return
     
-    # Interface de seleção de colaborador (forçar ordem alfabética)
-    usuarios_ordenados = sorted(usuarios_result["opcoes"].keys())
-    selected_user = st.selectbox("Selecionar Colaborador", usuarios_ordenados)
+    if len(usuarios_result["opcoes"]) == LIMITE_OPCOES_COLABORADOR:
+        st.caption(f"Exibindo os {LIMITE_OPCOES_COLABORADOR} primeiros resultados. Refine a busca para encontrar outros colaboradores.")
+    
+    # Interface de seleção de colaborador (ordem de relevância da busca)
+    selected_user = st.selectbox("Selecionar Colaborador", list(usuarios_result["opcoes"].keys()))
     
     if selected_user:
         user_id = usuarios_result["opcoes"][selected_user]
@@ -55,7 +64,7 @@ def menu_gerenciar_ferias():
             _interface_historico_ferias(service, user_id)
         
         with tab3:
-            _interface_gerenciar_status(service, user_id)
+            _interface_gerenciar_status(service, user_id, user_data['setor'])
 
 
 def _exibir_informacoes_saldo(service: FeriasService, user_id: int):
@@ -119,11 +128,6 @@ def _interface_cadastrar_ferias(service: FeriasService, user_id: int, user_data)
         user_id: ID do usuário
         user_data: Dados do usuário
     """
-    # Obter datas já ocupadas (apenas para validação)
-    datas_ocupadas = _obter_datas_ocupadas(user_id)
-    
-
-    
     with st.form("form_ferias", clear_on_submit=True):
         col1, col2 = st.columns(2)
         
@@ -133,11 +137,11 @@ def _interface_cadastrar_ferias(service: FeriasService, user_id: int, user_data)
         with col2:
             data_fim = st.date_input("Data de Fim", format="DD/MM/YYYY")
         
-        # Verificar conflito de datas
+        # Verificar conflito de datas (consulta indexada por período no banco)
         if data_inicio and data_fim and data_inicio <= data_fim:
-            conflito = _verificar_conflito_datas(data_inicio, data_fim, datas_ocupadas)
+            conflito = service.verificar_conflito_periodo(user_id, data_inicio, data_fim)
             if conflito:
-                st.error(f"❌ {conflito}")
+                st.error(f"❌ {conflito['mensagem']}")
         
         status = "Pendente"  # Sempre cadastrar como pendente
         st.info(" Férias serão cadastradas como 'Pendente' e podem ser aprovadas posteriormente")
@@ -150,12 +154,6 @@ def _interface_cadastrar_ferias(service: FeriasService, user_id: int, user_data)
                 st.error("❌ Data de início deve ser anterior à data de fim")
                 return
             
-            # Verificar conflito antes de cadastrar
-            conflito = _verificar_conflito_datas(data_inicio, data_fim, datas_ocupadas)
-            if conflito:
-                st.error(f"❌ {conflito}")
-                return
-            
             # Obter nível do usuário logado
             user_nivel = st.session_state.get('user', {}).get('nivel_acesso', 'colaborador')
             
@@ -247,13 +245,14 @@ def _interface_historico_ferias(service: FeriasService, user_id: int):
     st.caption(f"Total: {historico['total']} registro(s)")
 
 
-def _interface_gerenciar_status(service: FeriasService, user_id: int):
+def _interface_gerenciar_status(service: FeriasService, user_id: int, setor: str):
     """
     Interface para gerenciar status - Apenas UI.
     
     Args:
         service: Instância do FeriasService
         user_id: ID do usuário
+        setor: Setor do colaborador (cobertura da equipe)
     """
     historico = service.obter_historico_ferias(user_id)
     
@@ -268,6 +267,10 @@ def _interface_gerenciar_status(service: FeriasService, user_id: int):
     
     ferias_df = historico["ferias"]
     
+    # Cobertura do setor: uma consulta para todas as férias pendentes
+    pendentes = [f for f in historico["registros"] if str(f['status']).lower() == 'pendente']
+    alertas = CoberturaService(st.session_state.ferias_db).alertas_aprovacao(setor, pendentes)
+    
     for _, ferias in ferias_df.iterrows():
         # Definir cor do status
         status_color = {
@@ -282,6 +285,12 @@ def _interface_gerenciar_status(service: FeriasService, user_id: int):
             # Mostrar informações detalhadas
             st.write(f"**Dias:** {ferias['dias_utilizados']} | **Status atual:** {ferias['status']}")
             
+            alerta = alertas.get(ferias['id'])
+            if alerta:
+                st.warning(f"⚠️ {alerta['mensagem']}")
+                if alerta['ausentes']:
+                    st.caption(f"Já ausentes no período: {', '.join(alerta['ausentes'])}")
+            
             with col1:
                 if st.button("Aprovar", key=f"aprovar_{ferias['id']}", disabled=(ferias['status'] == 'Aprovado')):
                     resultado = service.aprovar_ferias(ferias['id'])
@@ -321,61 +330,3 @@ def _interface_gerenciar_status(service: FeriasService, user_id: int):
         st.markdown("🟢 **Aprovado** - Férias confirmadas")
     with col3:
         st.markdown("🔴 **Rejeitado** - Férias canceladas")
-
-
-def _obter_datas_ocupadas(user_id):
-    """Obtém todas as datas já ocupadas por férias aprovadas"""
-    try:
-        # Usar o método da nova database
-        ferias_list = st.session_state.ferias_db.get_ferias_usuario(user_id)
-        
-        # Converter lista para DataFrame se necessário
-        if isinstance(ferias_list, list):
-            if not ferias_list:
-                return []
-            ferias_df = pd.DataFrame(ferias_list)
-        else:
-            ferias_df = ferias_list
-            if ferias_df.empty:
-                return []
-        
-        # Filtrar apenas férias aprovadas
-        ferias_aprovadas = ferias_df[ferias_df['status'] == 'Aprovado']
-        
-        datas_ocupadas = []
-        for _, row in ferias_aprovadas.iterrows():
-            inicio = row['data_inicio']
-            fim = row['data_fim']
-            
-            # Converter para date se necessário
-            if isinstance(inicio, str):
-                inicio = pd.to_datetime(inicio).date()
-            elif hasattr(inicio, 'date'):
-                inicio = inicio.date()
-                
-            if isinstance(fim, str):
-                fim = pd.to_datetime(fim).date()
-            elif hasattr(fim, 'date'):
-                fim = fim.date()
-                
-            datas_ocupadas.append((inicio, fim))
-        
-        return datas_ocupadas
-    except Exception as e:
-        st.error(f"Erro ao obter datas ocupadas: {e}")
-        return []
-
-
-def _verificar_conflito_datas(nova_inicio, nova_fim, datas_ocupadas):
-    """Verifica se as novas datas conflitam com datas já ocupadas"""
-    if not datas_ocupadas:
-        return None
-    
-    for inicio_ocupada, fim_ocupada in datas_ocupadas:
-        # Verificar sobreposição
-        if (nova_inicio <= fim_ocupada and nova_fim >= inicio_ocupada):
-            inicio_br = inicio_ocupada.strftime('%d/%m/%Y') if hasattr(inicio_ocupada, 'strftime') else str(inicio_ocupada)
-            fim_br = fim_ocupada.strftime('%d/%m/%Y') if hasattr(fim_ocupada, 'strftime') else str(fim_ocupada)
-            return f"Período conflita com férias já aprovadas de {inicio_br} a {fim_br}"
-    
-    return None
\ No newline at end of file
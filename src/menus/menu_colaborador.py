@@ -1,6 +1,10 @@
 import streamlit as st
 from ..utils.constants import SETORES, FUNCOES
+from ..utils.error_handler import CriticalOperationManager
+from .avisos_pessoais import mostrar_avisos_pessoais
+from .ferias_pessoais import mostrar_ferias_pessoais, mostrar_extrato_saldo, mostrar_ausencias_equipe, mostrar_sugestoes_periodo
 
+@CriticalOperationManager.monitor_resource_usage
 def menu_colaborador():
     """Menu para colaboradores - área pessoal com edição"""
     user = st.session_state.user
@@ -34,110 +38,20 @@ def _mostrar_area_pessoal(user):
     
     st.markdown("---")
     
-    # Informações pessoais de férias
-    user_id = user["id"]
-    
-    try:
-        ferias_list = st.session_state.ferias_db.get_ferias_usuario(user_id)
-        
-        # Converter lista para DataFrame se necessário
-        if isinstance(ferias_list, list):
-            if not ferias_list:
-                st.info("Nenhuma férias cadastrada")
-                return
-            import pandas as pd
-            ferias_df = pd.DataFrame(ferias_list)
-        else:
-            ferias_df = ferias_list
-            if ferias_df is None or ferias_df.empty:
-                st.info("Nenhuma férias cadastrada")
-                return
-        
-        st.markdown("##### Minhas Férias")
-        
-        # Formatar datas
-        ferias_display = ferias_df.copy()
-        ferias_display['data_inicio'] = ferias_df['data_inicio'].apply(
-            lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else str(x)
-        )
-        ferias_display['data_fim'] = ferias_df['data_fim'].apply(
-            lambda x: x.strftime('%d/%m/%Y') if hasattr(x, 'strftime') else str(x)
-        )
-        
-        st.dataframe(
-            ferias_display[['data_inicio', 'data_fim', 'dias_utilizados', 'status']],
-            column_config={
-                'data_inicio': 'Data Início',
-                'data_fim': 'Data Fim', 
-                'dias_utilizados': 'Dias',
-                'status': 'Status'
-            },
-            use_container_width=True,
-            hide_index=True
-        )
-        
-        # Estatísticas das férias
-        dias_aprovados = ferias_df[ferias_df['status'] == 'Aprovado']['dias_utilizados'].sum()
-        st.info(f"Total de dias utilizados: {dias_aprovados} dias")
-                
-    except Exception as e:
-        st.error(f"Erro ao carregar informações pessoais: {str(e)}")
-        st.info("Verifique se você possui férias cadastradas no sistema")
+    # Informações pessoais de férias (histórico paginado)
+    mostrar_ferias_pessoais(user)
+    mostrar_extrato_saldo(user)
+    mostrar_sugestoes_periodo(user)
     
     st.markdown("---")
     
-    # Seção de Avisos
-    st.markdown("##### Avisos")
+    # Colegas de férias hoje/na semana
+    mostrar_ausencias_equipe(user)
     
-    try:
-        avisos = st.session_state.users_db.get_avisos_usuario(user['id'])
-        
-        if not avisos:
-            st.info("Nenhum aviso disponível no momento.")
-        else:
-            for aviso in avisos:
-                with st.container():
-                    col_aviso, col_status = st.columns([4, 1])
-                    
-                    with col_aviso:
-                        # Título simples
-                        if not aviso['lido']:
-                            st.markdown(f"**{aviso['titulo']}** (novo)")
-                        else:
-                            st.markdown(f"**{aviso['titulo']}**")
-                        
-                        # Conteúdo
-                        st.write(aviso['conteudo'])
-                        
-                        # Informações de publicação
-                        data_criacao = aviso['data_criacao'].strftime("%d/%m/%Y")
-                        st.caption(f"Por {aviso['autor_nome']} em {data_criacao}")
-                    
-                    with col_status:
-                        col_btn1, col_btn2 = st.columns(2)
-                        
-                        with col_btn1:
-                            if not aviso['lido']:
-                                if st.button("Marcar como Lido", key=f"lido_{aviso['id']}", type="secondary"):
-                                    sucesso = st.session_state.users_db.marcar_aviso_lido(aviso['id'], user['id'])
-                                    if sucesso:
-                                        st.rerun()
-                            else:
-                                st.success("Lido")
-                                if aviso['data_leitura']:
-                                    data_leitura = aviso['data_leitura'].strftime("%d/%m/%Y")
-                                    st.caption(f"em {data_leitura}")
-                        
-                        with col_btn2:
-                            if st.button("Ocultar", key=f"remover_{aviso['id']}", help="Ocultar aviso", type="secondary"):
-                                sucesso = st.session_state.users_db.remover_aviso_usuario(aviso['id'], user['id'])
-                                if sucesso:
-                                    st.rerun()
-                    
-                    st.markdown("---")
+    st.markdown("---")
     
-    except Exception as e:
-        st.error("Erro ao carregar avisos")
+    # Seção de Avisos
+    mostrar_avisos_pessoais(user)
 def _mostrar_edicao_dados(user):
     """Mostra formulário de edição de dados pessoais"""
     st.markdown("### Editar Meus Dados")
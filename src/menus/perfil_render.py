@@ -0,0 +1,56 @@
+import streamlit as st
+import pandas as pd
+from ..utils.profiler import obter_registros, resumo_por_painel, carregar_arquivo, ARQUIVO_PERFIL
+
+def menu_perfil_render():
+    """Comparação do custo de renderização entre painéis"""
+    st.markdown("#### Desempenho por Painel")
+
+    fonte = st.radio(
+        "Fonte dos dados",
+        ["Memória (sessão atual do servidor)", "Arquivo JSONL"],
+        horizontal=True,
+        key="perfil_fonte"
+    )
+
+    if fonte.startswith("Memória"):
+        registros = obter_registros()
+    else:
+        registros = carregar_arquivo()
+        st.caption(f"Arquivo: {ARQUIVO_PERFIL}")
+
+    if not registros:
+        st.info("Nenhuma medição registrada ainda. Navegue pelos painéis para coletar dados.")
+        return
+
+    # Comparação entre painéis
+    resumo = pd.DataFrame(resumo_por_painel(registros))
+    st.dataframe(
+        resumo,
+        column_config={
+            'painel': 'Painel',
+            'execucoes': 'Execuções',
+            'tempo_medio_ms': 'Tempo Médio (ms)',
+            'tempo_p95_ms': 'Tempo p95 (ms)',
+            'tempo_max_ms': 'Tempo Máx (ms)',
+            'db_medio_ms': 'Banco Médio (ms)',
+            'queries_media': 'Queries (média)',
+            'alocado_medio_kb': 'Alocado Médio (KB)',
+            'pico_max_kb': 'Pico Máx (KB)'
+        },
+        use_container_width=True,
+        hide_index=True
+    )
+
+    st.bar_chart(resumo.set_index('painel')[['tempo_medio_ms', 'db_medio_ms']])
+
+    # Último rerun detalhado
+    st.markdown("##### Último Rerun")
+    ultimo_rerun = next((r['rerun_id'] for r in reversed(registros) if r.get('rerun_id')), None)
+    if ultimo_rerun:
+        df_rerun = pd.DataFrame([r for r in registros if r.get('rerun_id') == ultimo_rerun])
+        st.dataframe(
+            df_rerun[['painel', 'profundidade', 'tempo_ms', 'db_ms', 'queries', 'alocado_kb', 'pico_kb']],
+            use_container_width=True,
+            hide_index=True
+        )
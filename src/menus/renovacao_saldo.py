@@ -1,9 +1,18 @@
 import streamlit as st
 import pandas as pd
 from datetime import date
+from ..utils.error_handler import CriticalOperationManager
+from ..utils.ui_components import create_paginated_table
+from ..services.saldo_service import SaldoService
 
+@CriticalOperationManager.monitor_resource_usage
 def menu_renovacao_saldo():
     """Menu para renovação anual de saldo de férias"""
+    # Com renovação por aniversário, o crédito é diário e individual
+    if SaldoService.modo_aniversario():
+        _menu_acumulo_aniversario()
+        return
+    
     st.markdown("#### Renovação Anual de Saldo")
     
     # Verificar se há renovação anterior
@@ -81,32 +90,76 @@ def _mostrar_previa(ano, saldo_padrao):
     """Mostra prévia da renovação"""
     st.markdown("##### Prévia da Renovação")
     
-    usuarios = st.session_state.users_db.get_users()
+    def formatar(df):
+        df['saldo_atual'] = df['saldo_ferias'].map(lambda saldo: f"{saldo} dias")
+        df['novo_saldo'] = df['saldo_ferias'].map(lambda saldo: f"{saldo + saldo_padrao} dias")
+        df['acrescimo'] = f"+{saldo_padrao} dias"
+        return df
+    
+    # Prévia paginada no banco: o total vem da contagem, não da lista completa
+    def carregar(limite, cursor, ordenar_por, decrescente):
+        return st.session_state.users_db.listar_usuarios(
+            ordenar_por=ordenar_por, decrescente=decrescente, limite=limite, cursor=cursor
+        )
+    
+    usuarios = create_paginated_table(
+        "previa_renovacao", carregar,
+        {'nome': 'Nome', 'setor': 'Setor', 'saldo_atual': 'Saldo Atual', 'novo_saldo': 'Novo Saldo', 'acrescimo': 'Acréscimo'},
+        {"Nome": ("nome", False), "Setor": ("setor", False)},
+        descricao="colaboradores", formatar=formatar, vazio="Nenhum colaborador encontrado"
+    )
     
     if not usuarios:
-        st.info("Nenhum colaborador encontrado")
         return
     
-    previa_data = []
-    for user in usuarios:
-        saldo_atual = user['saldo_ferias']
-        novo_saldo = saldo_atual + saldo_padrao
-        
-        previa_data.append({
-            'Nome': user['nome'],
-            'Setor': user['setor'],
-            'Saldo Atual': f"{saldo_atual} dias",
-            'Novo Saldo': f"{novo_saldo} dias",
-            'Acréscimo': f"+{saldo_padrao} dias"
-        })
+    st.info(f"📊 Total de colaboradores afetados: {usuarios[0]['total_registros']}")
+    st.success(f"✅ Cada colaborador receberá +{saldo_padrao} dias somados ao saldo atual")
+
+def _menu_acumulo_aniversario():
+    """Acúmulo por aniversário de admissão: execução manual e histórico"""
+    st.markdown("#### Renovação por Aniversário de Admissão")
     
-    df_previa = pd.DataFrame(previa_data)
+    service = SaldoService(st.session_state.users_db)
+    st.info(
+        f"Cada colaborador recebe {service.dias_anuais} dias no aniversário de admissão, "
+        f"proporcionais ao período desde o último crédito, até o teto de {service.saldo_maximo} dias. "
+        "O crédito é processado diariamente; dias sem execução são recuperados na próxima."
+    )
+    
+    if st.button("Processar aniversários até hoje", type="primary"):
+        resultado = service.acumular_aniversarios()
+        if resultado["sucesso"]:
+            st.success(
+                f"{resultado['aniversarios']} aniversário(s) processado(s): "
+                f"+{resultado['dias']} dias para {resultado['colaboradores']} colaborador(es)"
+            )
+        else:
+            st.error(resultado["erro"])
+    
+    st.markdown("---")
+    st.markdown("##### Últimos Créditos")
+    
+    historico = st.session_state.users_db.get_historico_acumulos()
+    if not historico:
+        st.info("Nenhum crédito por aniversário realizado ainda")
+        return
     
+    df_historico = pd.DataFrame(historico)
+    df_historico['data_aniversario'] = pd.to_datetime(df_historico['data_aniversario']).dt.strftime('%d/%m/%Y')
+    df_historico['inicio_periodo'] = pd.to_datetime(df_historico['inicio_periodo']).dt.strftime('%d/%m/%Y')
     st.dataframe(
-        df_previa,
+        df_historico[['nome', 'setor', 'data_aniversario', 'inicio_periodo', 'dias_calculados',
+                      'dias_creditados', 'saldo_anterior', 'saldo_posterior']],
+        column_config={
+            'nome': 'Nome',
+            'setor': 'Setor',
+            'data_aniversario': 'Aniversário',
+            'inicio_periodo': 'Período desde',
+            'dias_calculados': 'Dias Calculados',
+            'dias_creditados': 'Dias Creditados',
+            'saldo_anterior': 'Saldo Anterior',
+            'saldo_posterior': 'Saldo Posterior'
+        },
         use_container_width=True,
         hide_index=True
     )
-    
-    st.info(f"📊 Total de colaboradores afetados: {len(usuarios)}")
-    st.success(f"✅ Cada colaborador receberá +{saldo_padrao} dias somados ao saldo atual")
\ No newline at end of file
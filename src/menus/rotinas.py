@@ -0,0 +1,81 @@
+import streamlit as st
+import pandas as pd
+from ..database.jobs_repository import JobsRepository
+from ..services.agendador import Agendador, agendador_ativo, jobs_registrados, obter_agendador
+from ..services.jobs_padrao import registrar_jobs_padrao
+from ..utils.error_handler import CriticalOperationManager
+
+@CriticalOperationManager.monitor_resource_usage
+def menu_rotinas():
+    """Rotinas de manutenção: situação do agendador, métricas e execução manual"""
+    st.markdown("#### Rotinas de Manutenção")
+
+    registrar_jobs_padrao()
+    agendador = obter_agendador()
+    repositorio = agendador.repositorio if agendador else JobsRepository()
+
+    if not agendador_ativo():
+        st.info("Agendador desligado (AGENDADOR_ATIVO=False): as rotinas rodam apenas manualmente ou pelo script de manutenção.")
+    elif agendador and agendador.lider:
+        st.success(f"Agendador ativo; este processo ({agendador.executor}) é o líder.")
+    else:
+        st.info("Agendador ativo; outro processo é o líder das rotinas globais.")
+
+    # Rotinas e métricas dos últimos 30 dias
+    metricas = {linha['job']: linha for linha in repositorio.get_metricas_jobs(30)}
+    tabela = pd.DataFrame([
+        {
+            "Rotina": job.nome,
+            "Descrição": job.descricao,
+            "Escopo": "Por processo" if job.por_processo else "Global",
+            "Intervalo (min)": round(job.intervalo / 60),
+            "Execuções (30d)": metricas.get(job.nome, {}).get('execucoes', 0),
+            "Falhas (30d)": metricas.get(job.nome, {}).get('falhas', 0),
+            "Tempo Médio (ms)": metricas.get(job.nome, {}).get('duracao_media_ms'),
+            "Tempo p95 (ms)": metricas.get(job.nome, {}).get('duracao_p95_ms'),
+            "Última Execução": metricas.get(job.nome, {}).get('ultima_execucao'),
+        }
+        for job in jobs_registrados()
+    ])
+    st.dataframe(tabela, use_container_width=True, hide_index=True)
+
+    col_job, col_botao = st.columns([3, 1])
+    with col_job:
+        nome = st.selectbox("Rotina", [job.nome for job in jobs_registrados()], key="rotina_executar")
+    with col_botao:
+        st.write("")
+        executar = st.button("Executar agora", type="primary")
+
+    if executar:
+        with st.spinner(f"Executando {nome}..."):
+            resultado = (agendador or Agendador(repositorio)).executar_job(nome)
+        if resultado["sucesso"]:
+            st.success(f"{nome} concluída em {resultado['duracao_ms']} ms: {resultado['resultado']}")
+        elif resultado.get("ignorado"):
+            st.warning(resultado["erro"])
+        else:
+            st.error(resultado["erro"])
+
+    st.markdown("---")
+    st.markdown("##### Últimas Execuções")
+    execucoes = repositorio.get_execucoes(limite=50)
+    if not execucoes:
+        st.info("Nenhuma execução registrada ainda")
+        return
+
+    df_execucoes = pd.DataFrame(execucoes)
+    df_execucoes['inicio'] = pd.to_datetime(df_execucoes['inicio']).dt.strftime('%d/%m/%Y %H:%M:%S')
+    st.dataframe(
+        df_execucoes[['job', 'inicio', 'duracao_ms', 'sucesso', 'resultado', 'erro', 'executor']],
+        column_config={
+            'job': 'Rotina',
+            'inicio': 'Início',
+            'duracao_ms': 'Duração (ms)',
+            'sucesso': 'Sucesso',
+            'resultado': 'Resultado',
+            'erro': 'Erro',
+            'executor': 'Processo'
+        },
+        use_container_width=True,
+        hide_index=True
+    )
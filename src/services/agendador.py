@@ -0,0 +1,252 @@
+"""
+Agendador de Rotinas - Manutenção periódica dentro do processo do app
+
+Uma thread por processo verifica as rotinas registradas a cada
+INTERVALO_VERIFICACAO segundos:
+
+- Rotinas globais (acúmulo de saldo, arquivamento, reconciliação) rodam só
+  no líder, o processo que detém o advisory lock do agendamento. Com várias
+  réplicas do app, as demais ficam em espera e assumem se o líder cair.
+  O vencimento vem do histórico no banco, então a troca de líder não
+  repete execuções.
+- Rotinas por processo (aquecimento de caches em memória) rodam em todas
+  as réplicas.
+
+Cada execução é gravada em jobs_execucoes (duração, sucesso, resultado) e
+protegida por um lock da própria rotina, o que permite rodar as mesmas
+rotinas pelo script de manutenção sem duplicar trabalho.
+
+Ativado pela variável de ambiente AGENDADOR_ATIVO=True.
+"""
+
+import os
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from ..database.jobs_repository import JobsRepository
+
+AGENDADOR_ATIVO = os.getenv("AGENDADOR_ATIVO", "False").lower() == "true"
+INTERVALO_VERIFICACAO = 30  # segundos
+
+
+@dataclass
+class Job:
+    """Rotina registrada"""
+    nome: str
+    funcao: Callable[[], Any]
+    intervalo: int  # segundos entre execuções
+    descricao: str = ""
+    por_processo: bool = False
+
+
+_jobs: Dict[str, Job] = {}
+_agendador = None
+_lock_agendador = threading.Lock()
+
+
+def agendador_ativo() -> bool:
+    """Indica se o agendador deve rodar dentro do app"""
+    return AGENDADOR_ATIVO
+
+
+def registrar_job(nome: str, funcao: Callable[[], Any], intervalo: int, descricao: str = "",
+                  por_processo: bool = False) -> Job:
+    """
+    Registra (ou substitui) uma rotina.
+
+    Args:
+        nome: Identificador único (também usado no lock e no histórico)
+        funcao: Callable sem argumentos; o retorno é gravado no histórico e
+                uma exceção marca a execução como falha
+        intervalo: Segundos entre execuções
+        descricao: Texto exibido na interface e no script de manutenção
+        por_processo: Roda em todas as réplicas, sem depender do líder
+    """
+    job = Job(nome, funcao, int(intervalo), descricao, por_processo)
+    _jobs[nome] = job
+    return job
+
+
+def jobs_registrados() -> List[Job]:
+    """Rotinas registradas, em ordem de nome"""
+    return [_jobs[nome] for nome in sorted(_jobs)]
+
+
+def jobs_vencidos(jobs: Iterable[Job], ultimas: Dict[str, datetime], agora: datetime) -> List[Job]:
+    """Rotinas que nunca rodaram ou cujo intervalo já passou desde o último início"""
+    return [
+        job for job in jobs
+        if job.nome not in ultimas or (agora - ultimas[job.nome]).total_seconds() >= job.intervalo
+    ]
+
+
+class Agendador:
+    """Executa as rotinas registradas, no líder ou sob demanda"""
+
+    def __init__(self, repositorio: JobsRepository = None, intervalo_verificacao: float = INTERVALO_VERIFICACAO):
+        self.repositorio = repositorio or JobsRepository()
+        self.intervalo_verificacao = intervalo_verificacao
+        self.executor = f"{socket.gethostname()}:{os.getpid()}"
+        self.metricas: Dict[str, Dict[str, Any]] = {}
+        self._conexao_lider = None
+        self._ultimas_locais: Dict[str, datetime] = {}
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_metricas = threading.Lock()
+
+    @property
+    def lider(self) -> bool:
+        return self._conexao_lider is not None
+
+    def executar_job(self, nome: str, vencida_em: datetime = None) -> Dict[str, Any]:
+        """
+        Executa uma rotina agora e grava a execução no histórico.
+
+        Args:
+            vencida_em: Executa só se a rotina global ainda estiver vencida neste
+                        instante, conferido no histórico já com o lock obtido
+                        (outro processo pode tê-la executado entre a seleção e o lock)
+
+        Returns:
+            Dict com sucesso, duracao_ms e resultado ou erro; ignorado=True se a
+            rotina já estava rodando ou já rodou em outro processo
+        """
+        job = _jobs.get(nome)
+        if job is None:
+            return {"sucesso": False, "erro": f"Rotina desconhecida: {nome}"}
+
+        with self.repositorio.lock_job(nome) as obtido:
+            # Rotinas por processo cuidam de estado local: não disputam o lock
+            if not obtido and not job.por_processo:
+                return {"sucesso": False, "ignorado": True, "erro": "Rotina em execução em outro processo"}
+
+            if vencida_em is not None and not job.por_processo:
+                ultimas = self.repositorio.get_ultimas_execucoes(nome)
+                if ultimas is None:
+                    return {"sucesso": False, "ignorado": True, "erro": "Histórico de execuções indisponível"}
+                if not jobs_vencidos([job], {linha['job']: linha['inicio'] for linha in ultimas}, vencida_em):
+                    return {"sucesso": False, "ignorado": True, "erro": "Rotina já executada por outro processo"}
+
+            inicio = datetime.now()
+            inicio_contagem = time.perf_counter()
+            try:
+                resultado, erro = job.funcao(), None
+            except Exception as e:
+                resultado, erro = None, f"{type(e).__name__}: {e}"
+            duracao_ms = int((time.perf_counter() - inicio_contagem) * 1000)
+
+            self.repositorio.registrar_execucao(
+                nome, inicio, datetime.now(), duracao_ms, erro is None, resultado, erro, self.executor
+            )
+        self._registrar_metrica(nome, duracao_ms, erro is None)
+
+        if job.por_processo:
+            self._ultimas_locais[nome] = inicio
+        if erro:
+            return {"sucesso": False, "duracao_ms": duracao_ms, "erro": erro}
+        return {"sucesso": True, "duracao_ms": duracao_ms, "resultado": resultado}
+
+    def executar_vencidos(self, agora: datetime = None, globais: bool = True,
+                          locais: bool = True) -> Dict[str, Dict[str, Any]]:
+        """
+        Executa as rotinas vencidas.
+
+        Args:
+            agora: Referência de tempo (padrão: agora)
+            globais: Inclui as rotinas globais (False no processo que não é líder)
+            locais: Inclui as rotinas por processo (False no script de manutenção)
+
+        Returns:
+            Resultado de cada rotina executada, por nome
+        """
+        agora = agora or datetime.now()
+        jobs = jobs_registrados()
+
+        vencidos = []
+        if locais:
+            vencidos += jobs_vencidos([j for j in jobs if j.por_processo], self._ultimas_locais, agora)
+        if globais:
+            ultimas = self.repositorio.get_ultimas_execucoes()
+            # Sem histórico tudo pareceria vencido: as globais ficam para o próximo ciclo
+            if ultimas is not None:
+                ultimas = {linha['job']: linha['inicio'] for linha in ultimas}
+                vencidos += jobs_vencidos([j for j in jobs if not j.por_processo], ultimas, agora)
+
+        return {job.nome: self.executar_job(job.nome, vencida_em=agora) for job in vencidos}
+
+    def _registrar_metrica(self, nome: str, duracao_ms: int, sucesso: bool):
+        """Tempos em memória do processo (o histórico completo fica no banco)"""
+        with self._lock_metricas:
+            metrica = self.metricas.setdefault(nome, {
+                "execucoes": 0, "falhas": 0, "total_ms": 0, "ultima_ms": 0, "max_ms": 0, "ultima_execucao": None
+            })
+            metrica["execucoes"] += 1
+            metrica["falhas"] += 0 if sucesso else 1
+            metrica["total_ms"] += duracao_ms
+            metrica["ultima_ms"] = duracao_ms
+            metrica["max_ms"] = max(metrica["max_ms"], duracao_ms)
+            metrica["ultima_execucao"] = datetime.now()
+
+    def _garantir_lider(self) -> bool:
+        """Mantém ou tenta obter a liderança do agendamento"""
+        if self._conexao_lider is not None and not self.repositorio.lider_ativo(self._conexao_lider):
+            self._liberar_lider()
+        if self._conexao_lider is None:
+            self._conexao_lider = self.repositorio.adquirir_lider()
+        return self.lider
+
+    def _liberar_lider(self):
+        if self._conexao_lider is not None:
+            try:
+                self._conexao_lider.close()
+            except Exception:
+                pass
+            self._conexao_lider = None
+
+    def _ciclo(self):
+        """Uma verificação: rotinas locais sempre, globais só no líder"""
+        self.executar_vencidos(globais=self._garantir_lider())
+
+    def _loop(self):
+        while not self._parar.is_set():
+            try:
+                self._ciclo()
+            except Exception:
+                # Falha de conexão etc.: perde a liderança e tenta no próximo ciclo
+                self._liberar_lider()
+            self._parar.wait(self.intervalo_verificacao)
+        self._liberar_lider()
+
+    def iniciar(self):
+        """Inicia a thread do agendador (idempotente)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._loop, name="agendador-rotinas", daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout: float = None):
+        """Sinaliza a thread para parar e libera a liderança"""
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def iniciar_agendador() -> Agendador:
+    """Inicia o agendador do processo (um por processo, compartilhado pelas sessões)"""
+    global _agendador
+    with _lock_agendador:
+        if _agendador is None:
+            repositorio = JobsRepository()
+            repositorio.criar_estrutura()
+            _agendador = Agendador(repositorio)
+        _agendador.iniciar()
+        return _agendador
+
+
+def obter_agendador() -> Optional[Agendador]:
+    """Agendador em execução no processo, se houver"""
+    return _agendador
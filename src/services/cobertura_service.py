@@ -0,0 +1,364 @@
+"""
+Serviço de Cobertura - Ausências simultâneas por setor
+
+Busca as férias que tocam uma janela em uma única consulta e delega a
+contagem diária, os picos e as violações de limite para RegrasCobertura.
+Os mapas mensais por setor ficam em cache por (ano, mês) e são descartados
+quando uma férias daquele mês é incluída, alterada ou excluída.
+"""
+
+import calendar
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Tuple
+from datetime import date, timedelta
+import pandas as pd
+from ..core.regras_cobertura import RegrasCobertura
+from ..database.ferias_repository import registrar_observador_ferias
+from ..utils.constants import SETORES
+
+MESES_ABREVIADOS = ('Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez')
+
+# Mapas de ausência por mês (compartilhados pelas sessões do processo).
+# Invalidados pelos meses tocados em cada alteração de férias ou por tempo
+# (alterações feitas por outros processos).
+TTL_CACHE_MAPAS = 600  # segundos
+_cache_mapas = {}
+_versao_mapas = 0
+_lock_mapas = threading.Lock()
+
+def _meses_periodo(data_inicio: date, data_fim: date) -> List[Tuple[int, int]]:
+    """Pares (ano, mês) do período, em ordem"""
+    primeiro = data_inicio.year * 12 + data_inicio.month - 1
+    ultimo = data_fim.year * 12 + data_fim.month - 1
+    return [(indice // 12, indice % 12 + 1) for indice in range(primeiro, ultimo + 1)]
+
+# "Quem está fora" por (dia, janela, setor): válido até a virada do dia, até
+# qualquer alteração de férias ou por tempo (alterações de outros processos)
+JANELAS_AUSENCIA = ('hoje', 'semana')
+TTL_CACHE_FORA = 300  # segundos
+_cache_fora = {}
+
+def _invalidar_caches(data_inicio, data_fim):
+    """Descarta os mapas dos meses tocados pela férias alterada e as listas de ausentes"""
+    global _versao_mapas
+    with _lock_mapas:
+        _versao_mapas += 1
+        for chave in _meses_periodo(data_inicio, data_fim):
+            _cache_mapas.pop(chave, None)
+        _cache_fora.clear()
+
+registrar_observador_ferias(_invalidar_caches)
+
+def descartar_caches_expirando(margem: float):
+    """Descarta entradas que vencem nos próximos `margem` segundos (aquecimento)"""
+    agora = time.monotonic()
+    with _lock_mapas:
+        for chave in [c for c, m in _cache_mapas.items() if agora - m["instante"] >= TTL_CACHE_MAPAS - margem]:
+            del _cache_mapas[chave]
+        for chave in [c for c, e in _cache_fora.items() if agora - e[1] >= TTL_CACHE_FORA - margem]:
+            del _cache_fora[chave]
+
+
+class CoberturaService:
+    """
+    Serviço que calcula a cobertura das equipes.
+
+    Responsabilidades:
+    - Carregar as ausências do período (setor ou empresa)
+    - Aplicar o limite de ausentes de cada setor
+    - Alertar quando uma aprovação deixaria o setor descoberto
+    - Não contém lógica de interface (sem Streamlit)
+    """
+
+    def __init__(self, ferias_db, limites: Dict[str, int] = None):
+        """
+        Inicializa o serviço.
+
+        Args:
+            ferias_db: Instância do FeriasManager
+            limites: Máximo de ausentes por setor (padrão: constantes do sistema)
+        """
+        self.ferias_db = ferias_db
+        self.limites = limites
+
+    def obter_cobertura(self, data_inicio: date, data_fim: date, setor: str = None,
+                        incluir_pendentes: bool = False) -> Dict[str, Any]:
+        """
+        Ausências por dia de cada setor na janela.
+
+        Args:
+            data_inicio: Primeiro dia da janela
+            data_fim: Último dia da janela
+            setor: Restringe a um setor (None = empresa toda)
+            incluir_pendentes: Considera também férias ainda não aprovadas
+
+        Returns:
+            Dict com o resumo de cada setor (com limite e violações) e da empresa
+        """
+        if data_fim < data_inicio:
+            return {"sucesso": False, "erro": "Data final deve ser posterior à inicial"}
+
+        try:
+            ausencias = self.ferias_db.get_ausencias_periodo(data_inicio, data_fim, setor, incluir_pendentes)
+
+            periodos_setor = {setor: []} if setor else {}
+            for ausencia in ausencias:
+                periodos_setor.setdefault(ausencia['setor'], []).append(
+                    (ausencia['data_inicio'], ausencia['data_fim'])
+                )
+
+            setores = {
+                nome: RegrasCobertura.resumir(
+                    periodos, data_inicio, data_fim, RegrasCobertura.limite_setor(nome, self.limites)
+                )
+                for nome, periodos in periodos_setor.items()
+            }
+            empresa = RegrasCobertura.resumir(
+                [periodo for periodos in periodos_setor.values() for periodo in periodos],
+                data_inicio, data_fim
+            )
+
+            return {
+                "sucesso": True,
+                "setores": setores,
+                "empresa": empresa,
+                "total_violacoes": sum(len(resumo["violacoes"]) for resumo in setores.values())
+            }
+
+        except Exception as e:
+            return {
+                "sucesso": False,
+                "erro": f"Erro ao calcular cobertura: {e}"
+            }
+
+    def alertas_aprovacao(self, setor: str, ferias_pendentes: Iterable[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
+        """
+        Verifica, para cada férias pendente, se aprová-la excederia o limite do setor.
+
+        As férias aprovadas do setor são carregadas uma única vez para a janela
+        que cobre todas as pendentes.
+
+        Args:
+            setor: Setor do colaborador
+            ferias_pendentes: Dicts com id, data_inicio e data_fim
+
+        Returns:
+            Dict ferias_id -> alerta (limite, pico, violacoes, ausentes, mensagem);
+            férias sem alerta não aparecem
+        """
+        pendentes = list(ferias_pendentes)
+        if not pendentes:
+            return {}
+
+        inicio = min(ferias['data_inicio'] for ferias in pendentes)
+        fim = max(ferias['data_fim'] for ferias in pendentes)
+        aprovadas = self.ferias_db.get_ausencias_periodo(inicio, fim, setor)
+
+        dias, contagem = RegrasCobertura.ausencias_por_dia(
+            [(ferias['data_inicio'], ferias['data_fim']) for ferias in aprovadas], inicio, fim
+        )
+        limite = RegrasCobertura.limite_setor(setor, self.limites)
+
+        alertas = {}
+        for ferias in pendentes:
+            entrada = (ferias['data_inicio'] - inicio).days
+            saida = (ferias['data_fim'] - inicio).days + 1
+
+            # A própria férias soma um ausente em cada dia do período
+            violacoes = RegrasCobertura.violacoes(dias[entrada:saida], contagem[entrada:saida] + 1, limite)
+            if not violacoes:
+                continue
+
+            ausentes = sorted({
+                outra['nome'] for outra in aprovadas
+                if outra['data_inicio'] <= ferias['data_fim'] and outra['data_fim'] >= ferias['data_inicio']
+            })
+            pico = max(violacao["pico"] for violacao in violacoes)
+            primeira = violacoes[0]
+            alertas[ferias['id']] = {
+                "limite": limite,
+                "pico": pico,
+                "violacoes": violacoes,
+                "ausentes": ausentes,
+                "mensagem": (
+                    f"Aprovar deixaria {pico} ausente(s) no setor {setor} (limite {limite}), "
+                    f"a partir de {primeira['inicio'].strftime('%d/%m/%Y')}"
+                )
+            }
+
+        return alertas
+
+    def quem_esta_fora(self, janela: str = "hoje", setor: str = None, hoje: date = None) -> Dict[str, Any]:
+        """
+        Colaboradores com férias aprovadas hoje ou na semana corrente.
+
+        Args:
+            janela: "hoje" ou "semana" (segunda a domingo)
+            setor: Restringe a um setor (None = empresa toda)
+            hoje: Data de referência (padrão: data atual)
+
+        Returns:
+            Dict com inicio, fim e ausentes (nome, setor, data_inicio, data_fim)
+        """
+        if janela not in JANELAS_AUSENCIA:
+            return {"sucesso": False, "erro": f"Janela inválida: {janela}"}
+
+        hoje = hoje or date.today()
+        inicio = hoje if janela == "hoje" else hoje - timedelta(days=hoje.weekday())
+        fim = hoje if janela == "hoje" else inicio + timedelta(days=6)
+        chave = (hoje, janela, setor)
+
+        agora = time.monotonic()
+        with _lock_mapas:
+            entrada = _cache_fora.get(chave)
+            versao = _versao_mapas
+        if entrada and agora - entrada[1] < TTL_CACHE_FORA:
+            return entrada[0]
+
+        ausencias = self.ferias_db.get_ausencias_periodo(inicio, fim, setor)
+        resultado = {
+            "sucesso": True,
+            "inicio": inicio,
+            "fim": fim,
+            "ausentes": [
+                {
+                    "nome": ausencia['nome'],
+                    "setor": ausencia['setor'],
+                    "data_inicio": ausencia['data_inicio'],
+                    "data_fim": ausencia['data_fim'],
+                }
+                for ausencia in sorted(ausencias, key=lambda a: (a['data_inicio'], a['nome']))
+            ]
+        }
+
+        with _lock_mapas:
+            if _versao_mapas == versao:
+                # Entradas de dias anteriores não serão mais lidas
+                for antiga in [c for c in _cache_fora if c[0] != hoje]:
+                    del _cache_fora[antiga]
+                _cache_fora[chave] = (resultado, agora)
+        return resultado
+
+    def mapas_mensais(self, meses: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """
+        Ausências por setor e dia de cada mês, com cache por (ano, mês).
+
+        Os meses fora do cache são calculados juntos: uma consulta para a janela
+        que os cobre e uma única contagem vetorizada setor x dia.
+
+        Args:
+            meses: Pares (ano, mês)
+
+        Returns:
+            Dict (ano, mês) -> {"setores", "dias", "matriz"} (matriz setores x dias)
+        """
+        meses = sorted(set(meses))
+        agora = time.monotonic()
+        with _lock_mapas:
+            versao = _versao_mapas
+            mapas = {
+                chave: _cache_mapas[chave] for chave in meses
+                if chave in _cache_mapas and agora - _cache_mapas[chave]["instante"] < TTL_CACHE_MAPAS
+            }
+
+        faltantes = [chave for chave in meses if chave not in mapas]
+        if not faltantes:
+            return mapas
+
+        inicio = date(faltantes[0][0], faltantes[0][1], 1)
+        ano_fim, mes_fim = faltantes[-1]
+        fim = date(ano_fim, mes_fim, calendar.monthrange(ano_fim, mes_fim)[1])
+
+        # Histórico: inclui colaboradores hoje inativos
+        ausencias = self.ferias_db.get_ausencias_periodo(inicio, fim, apenas_ativos=False)
+        setores_ausencias = [ausencia['setor'] or 'SEM SETOR' for ausencia in ausencias]
+        setores = list(SETORES) + sorted(set(setores_ausencias) - set(SETORES))
+        indice = {setor: posicao for posicao, setor in enumerate(setores)}
+
+        dias, matriz = RegrasCobertura.ausencias_por_dia_grupo(
+            [(ausencia['data_inicio'], ausencia['data_fim']) for ausencia in ausencias],
+            [indice[setor] for setor in setores_ausencias],
+            len(setores), inicio, fim
+        )
+
+        novos = {}
+        for ano, mes in faltantes:
+            entrada = (date(ano, mes, 1) - inicio).days
+            saida = entrada + calendar.monthrange(ano, mes)[1]
+            novos[(ano, mes)] = {
+                "setores": setores,
+                "dias": dias[entrada:saida].copy(),
+                "matriz": matriz[:, entrada:saida].copy(),
+                "instante": agora,
+            }
+
+        with _lock_mapas:
+            # Alteração durante o cálculo: devolve o resultado sem guardá-lo
+            if _versao_mapas == versao:
+                _cache_mapas.update(novos)
+
+        mapas.update(novos)
+        return mapas
+
+    def mapa_ausencias_ano(self, ano: int, medida: str = "pico") -> Dict[str, Any]:
+        """
+        Mapa de calor setor x mês do ano.
+
+        Args:
+            ano: Ano do mapa
+            medida: "pico" (máximo de ausentes no mesmo dia) ou "dias"
+                    (soma de dias de ausência do setor no mês)
+
+        Returns:
+            Dict com sucesso e o DataFrame (setores nas linhas, meses nas colunas)
+        """
+        if medida not in ("pico", "dias"):
+            return {"sucesso": False, "erro": f"Medida inválida: {medida}"}
+
+        try:
+            mapas = self.mapas_mensais((ano, mes) for mes in range(1, 13))
+
+            # Meses calculados em momentos diferentes podem ter setores extras diferentes
+            extras = {setor for mapa in mapas.values() for setor in mapa["setores"]} - set(SETORES)
+            setores = list(SETORES) + sorted(extras)
+
+            colunas = {}
+            for mes in range(1, 13):
+                matriz = mapas[(ano, mes)]["matriz"]
+                valores = matriz.max(axis=1) if medida == "pico" else matriz.sum(axis=1)
+                colunas[MESES_ABREVIADOS[mes - 1]] = pd.Series(
+                    valores, index=mapas[(ano, mes)]["setores"]
+                ).reindex(setores, fill_value=0)
+
+            mapa = pd.DataFrame(colunas, index=setores)
+            return {"sucesso": True, "mapa": mapa}
+
+        except Exception as e:
+            return {
+                "sucesso": False,
+                "erro": f"Erro ao montar mapa de ausências: {e}"
+            }
+
+    def mapa_ausencias_mes(self, ano: int, mes: int) -> Dict[str, Any]:
+        """
+        Mapa de calor setor x dia de um mês.
+
+        Returns:
+            Dict com sucesso e o DataFrame (setores nas linhas, dias do mês nas colunas)
+        """
+        try:
+            mapa = self.mapas_mensais([(ano, mes)])[(ano, mes)]
+            return {
+                "sucesso": True,
+                "mapa": pd.DataFrame(
+                    mapa["matriz"], index=mapa["setores"],
+                    columns=[str(dia) for dia in range(1, mapa["matriz"].shape[1] + 1)]
+                )
+            }
+
+        except Exception as e:
+            return {
+                "sucesso": False,
+                "erro": f"Erro ao montar mapa de ausências: {e}"
+            }
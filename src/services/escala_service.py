@@ -0,0 +1,184 @@
+"""
+Serviço de Escala - Plano anual de férias por setor
+
+Reúne saldos, preferências, limites de cobertura e períodos bloqueados,
+delega a montagem do plano para RegrasEscala e grava o resultado como
+férias pendentes em um único lote.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+from datetime import date, timedelta
+import pandas as pd
+from ..core.regras_cobertura import RegrasCobertura
+from ..core.regras_escala import RegrasEscala
+from ..core.regras_planejamento import RegrasPlanejamento
+
+# Colunas da planilha de preferências (prioridade opcional: 1 = primeira opção)
+COLUNAS_PREFERENCIAS = ('email', 'inicio', 'fim')
+
+
+def ler_preferencias(arquivo, users: Iterable[Dict[str, Any]]) -> Tuple[Dict[int, List[Tuple[date, date]]], List[str]]:
+    """
+    Lê a planilha de preferências (CSV ou Excel).
+
+    Args:
+        arquivo: Arquivo com colunas email, inicio, fim e, opcionalmente, prioridade
+        users: Colaboradores para associar os emails aos ids
+
+    Returns:
+        Tupla (preferências por usuario_id em ordem de prioridade, linhas ignoradas)
+    """
+    nome = getattr(arquivo, 'name', str(arquivo)).lower()
+    planilha = pd.read_csv(arquivo) if nome.endswith('.csv') else pd.read_excel(arquivo)
+    planilha.columns = [str(coluna).strip().lower() for coluna in planilha.columns]
+
+    faltando = [coluna for coluna in COLUNAS_PREFERENCIAS if coluna not in planilha.columns]
+    if faltando:
+        raise ValueError(f"Colunas obrigatórias ausentes: {', '.join(faltando)}")
+
+    ids_por_email = {str(u['email']).strip().lower(): u['id'] for u in users}
+    planilha['usuario_id'] = planilha['email'].astype(str).str.strip().str.lower().map(ids_por_email)
+    planilha['inicio'] = pd.to_datetime(planilha['inicio'], dayfirst=True, errors='coerce').dt.date
+    planilha['fim'] = pd.to_datetime(planilha['fim'], dayfirst=True, errors='coerce').dt.date
+    if 'prioridade' not in planilha.columns:
+        planilha['prioridade'] = range(len(planilha))
+
+    validas = planilha['usuario_id'].notna() & planilha['inicio'].notna() & planilha['fim'].notna()
+    validas &= planilha['inicio'] <= planilha['fim']
+    ignoradas = [
+        f"Linha {indice + 2}: {linha['email']}" for indice, linha in planilha[~validas].iterrows()
+    ]
+
+    preferencias: Dict[int, List[Tuple[date, date]]] = {}
+    for _, linha in planilha[validas].sort_values('prioridade', kind='stable').iterrows():
+        preferencias.setdefault(int(linha['usuario_id']), []).append((linha['inicio'], linha['fim']))
+    return preferencias, ignoradas
+
+
+class EscalaService:
+    """
+    Serviço que monta a escala anual de férias.
+
+    Responsabilidades:
+    - Carregar colaboradores, saldos e férias já cadastradas
+    - Aplicar o limite de ausentes de cada setor e os períodos bloqueados
+    - Gravar a escala como férias pendentes
+    - Não contém lógica de interface (sem Streamlit)
+    """
+
+    def __init__(self, ferias_db, users_db, limites: Dict[str, int] = None):
+        """
+        Inicializa o serviço.
+
+        Args:
+            ferias_db: Instância do FeriasManager
+            users_db: Instância do UserManager
+            limites: Máximo de ausentes por setor (padrão: constantes do sistema)
+        """
+        self.ferias_db = ferias_db
+        self.users_db = users_db
+        self.limites = limites
+
+    def gerar_escala(self, ano: int, preferencias: Dict[int, List[Tuple[date, date]]] = None,
+                     duracao_padrao: int = 10, bloqueios: Iterable[Tuple[date, date, str]] = (),
+                     setores: Iterable[str] = None) -> Dict[str, Any]:
+        """
+        Monta a escala do ano sem gravar nada.
+
+        Cada colaborador recebe uma janela de duracao_padrao dias úteis (ou o
+        saldo, se menor); colaboradores sem saldo ficam de fora. Férias já
+        cadastradas (aprovadas ou pendentes) ocupam vagas do setor e não podem
+        ser sobrepostas pela escala. No ano corrente, só entram inícios a
+        partir de amanhã.
+
+        Args:
+            ano: Ano de início das férias
+            preferencias: Janelas preferidas por usuario_id, em ordem de prioridade
+            duracao_padrao: Dias úteis por colaborador
+            bloqueios: Períodos sem férias (inicio, fim, setor); setor None = todos
+            setores: Restringe a escala a esses setores (None = todos)
+
+        Returns:
+            Dict com sucesso, alocacoes (com nome), nao_alocados (nomes), sem_saldo e satisfacao
+        """
+        preferencias = preferencias or {}
+        try:
+            users = self.users_db.get_users()
+            if setores:
+                setores = set(setores)
+                users = [u for u in users if u.get('setor') in setores]
+
+            janela_inicio = date(ano, 1, 1)
+            janela_fim = date(ano, 12, 31) + timedelta(days=RegrasPlanejamento.MARGEM_DIAS)
+            existentes = self.ferias_db.get_ausencias_periodo(janela_inicio, janela_fim, incluir_pendentes=True)
+
+            proprias: Dict[int, List[Tuple[date, date]]] = {}
+            for ferias in existentes:
+                proprias.setdefault(ferias['usuario_id'], []).append((ferias['data_inicio'], ferias['data_fim']))
+
+            colaboradores, sem_saldo = [], []
+            for user in users:
+                duracao = min(int(duracao_padrao), int(user.get('saldo_ferias') or 0))
+                if duracao <= 0:
+                    sem_saldo.append(user['nome'])
+                    continue
+                colaboradores.append({
+                    "id": user['id'],
+                    "setor": user.get('setor'),
+                    "duracao": duracao,
+                    "preferencias": preferencias.get(user['id'], []),
+                    "bloqueados": proprias.get(user['id'], []),
+                })
+
+            limites = {
+                setor: RegrasCobertura.limite_setor(setor, self.limites)
+                for setor in {c['setor'] for c in colaboradores}
+            }
+            escala = RegrasEscala.montar_escala(
+                ano, colaboradores, limites, bloqueios=bloqueios,
+                ocupacao=[(f['setor'], f['data_inicio'], f['data_fim']) for f in existentes],
+                inicio_minimo=date.today() + timedelta(days=1)
+            )
+
+            nomes = {u['id']: u['nome'] for u in users}
+            for alocacao in escala["alocacoes"]:
+                alocacao["nome"] = nomes.get(alocacao["id"])
+
+            return {
+                "sucesso": True,
+                "alocacoes": escala["alocacoes"],
+                "nao_alocados": [nomes.get(usuario_id) for usuario_id in escala["nao_alocados"]],
+                "sem_saldo": sem_saldo,
+                "satisfacao": escala["satisfacao"],
+            }
+
+        except Exception as e:
+            return {
+                "sucesso": False,
+                "erro": f"Erro ao montar escala: {e}"
+            }
+
+    def gravar_escala(self, alocacoes: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Grava a escala como férias pendentes (rascunho para aprovação).
+
+        Alocações que passaram a conflitar com férias cadastradas depois da
+        prévia são ignoradas.
+
+        Returns:
+            Dict com sucesso, gravadas e ignoradas
+        """
+        if not alocacoes:
+            return {"sucesso": False, "erro": "Nenhuma alocação para gravar"}
+
+        cadastradas = self.ferias_db.add_ferias_lote([
+            (a['id'], a['data_inicio'], a['data_fim'], a['dias_cobrados']) for a in alocacoes
+        ])
+        if cadastradas is False:
+            return {"sucesso": False, "erro": "Erro ao gravar escala"}
+
+        return {
+            "sucesso": True,
+            "gravadas": len(cadastradas),
+            "ignoradas": len(alocacoes) - len(cadastradas),
+        }
@@ -5,10 +5,14 @@ Esta camada separa a lógica de negócio da interface,
 coordenando entre as regras de negócio (core) e acesso a dados (database).
 """
 
-from typing import Dict, Any, Tuple
-from datetime import date
+from typing import Dict, Any, Optional, Tuple
+from datetime import date, timedelta
 from ..core.regras_ferias import RegrasFerias
 from ..core.regras_saldo import RegrasSaldo
+from ..core.regras_cobertura import RegrasCobertura
+from ..core.regras_planejamento import RegrasPlanejamento
+from ..database.ferias_repository import status_ocupa_periodo
+from ..utils.constants import DIAS_ANTECEDENCIA_MINIMA
 from ..utils.calculos import calcular_dias_uteis
 from ..utils.error_handler import handle_critical_operation, DatabaseError, ValidationError, log_operation
 
@@ -72,7 +76,17 @@ class FeriasService:
         else:
             validacao_antecedencia = {"valida": True, "mensagem": "RH pode cadastrar sem antecedência"}
         
-        # 3. Calcular dias úteis
+        # 3. Sobreposição com férias já cadastradas (consulta indexada no banco)
+        conflito = self.verificar_conflito_periodo(usuario_id, data_inicio, data_fim)
+        if conflito:
+            return {
+                "valido": False,
+                "erro": conflito["mensagem"],
+                "tipo": "conflito",
+                "detalhes": conflito["ferias"]
+            }
+        
+        # 4. Calcular dias úteis
         try:
             dias_uteis = calcular_dias_uteis(data_inicio, data_fim)
             if dias_uteis <= 0:
@@ -82,7 +96,7 @@ class FeriasService:
         except Exception as e:
             raise DatabaseError(f"Erro ao calcular dias úteis: {e}")
         
-        # 4. Validar saldo (se necessário)
+        # 5. Validar saldo (se necessário)
         if status == "Aprovada":
             try:
                 users_list = self.users_db.get_users()
@@ -122,6 +136,90 @@ class FeriasService:
             "validacao_periodo": validacao_periodo
         }
     
+    def verificar_conflito_periodo(self, usuario_id: int, data_inicio: date, data_fim: date,
+                                   ignorar_id: int = None) -> Dict[str, Any]:
+        """
+        Verifica se o período se sobrepõe a férias ativas do colaborador.
+        
+        Args:
+            usuario_id: ID do usuário
+            data_inicio: Data de início
+            data_fim: Data de fim
+            ignorar_id: Férias a desconsiderar na verificação
+            
+        Returns:
+            Dict com mensagem e férias conflitantes, ou None se não há conflito
+        """
+        conflitos = self.ferias_db.get_conflitos_periodo(usuario_id, data_inicio, data_fim, ignorar_id)
+        if not conflitos:
+            return None
+        
+        primeiro = conflitos[0]
+        return {
+            "mensagem": (
+                f"Período conflita com férias ({primeiro['status']}) de "
+                f"{primeiro['data_inicio'].strftime('%d/%m/%Y')} a {primeiro['data_fim'].strftime('%d/%m/%Y')}"
+            ),
+            "ferias": conflitos
+        }
+    
+    def sugerir_periodos(self, usuario: Dict[str, Any], ano: int, duracao: int,
+                         flexibilidade: int = 0, quantidade: int = 5) -> Dict[str, Any]:
+        """
+        Sugere períodos de férias que emendam fins de semana e feriados.
+        
+        Considera o saldo, a antecedência mínima (exceto RH), as férias já
+        cadastradas do colaborador e as férias aprovadas dos colegas do setor.
+        
+        Args:
+            usuario: Dict com id, setor, saldo_ferias e nivel_acesso
+            ano: Ano de início das férias
+            duracao: Dias úteis desejados
+            flexibilidade: Aceita durações até esse número de dias a mais ou a menos
+            quantidade: Quantidade de sugestões
+            
+        Returns:
+            Dict com sucesso e a lista de sugestões
+        """
+        saldo = int(usuario.get('saldo_ferias') or 0)
+        duracoes = [d for d in range(duracao - flexibilidade, duracao + flexibilidade + 1) if 1 <= d <= saldo]
+        if not duracoes:
+            return {
+                "sucesso": False,
+                "erro": f"Saldo insuficiente. Disponível: {saldo}, Solicitado: {duracao}"
+            }
+        
+        try:
+            inicio_minimo = date.today()
+            if usuario.get('nivel_acesso') != "master":
+                inicio_minimo += timedelta(days=DIAS_ANTECEDENCIA_MINIMA)
+            
+            janela_inicio = date(ano, 1, 1)
+            janela_fim = date(ano, 12, 31) + timedelta(days=RegrasPlanejamento.MARGEM_DIAS)
+            
+            proprias = self.ferias_db.get_conflitos_periodo(usuario['id'], janela_inicio, janela_fim)
+            equipe = self.ferias_db.get_ausencias_periodo(janela_inicio, janela_fim, usuario.get('setor'))
+            
+            sugestoes = RegrasPlanejamento.sugerir(
+                ano, duracoes, inicio_minimo,
+                periodos_bloqueados=[(f['data_inicio'], f['data_fim']) for f in proprias],
+                periodos_equipe=[(f['data_inicio'], f['data_fim']) for f in equipe if f['usuario_id'] != usuario['id']],
+                limite_equipe=RegrasCobertura.limite_setor(usuario.get('setor')),
+                quantidade=quantidade
+            )
+            
+            return {
+                "sucesso": True,
+                "sugestoes": sugestoes,
+                "vazio": not sugestoes
+            }
+            
+        except Exception as e:
+            return {
+                "sucesso": False,
+                "erro": f"Erro ao sugerir períodos: {e}"
+            }
+    
     def cadastrar_ferias(self, usuario_id: int, data_inicio: date, data_fim: date,
                         status: str, usuario_nivel: str) -> Dict[str, Any]:
         """
@@ -167,12 +265,21 @@ class FeriasService:
                     "mensagem": "Férias cadastradas com sucesso",
                     "dias_uteis": validacao["dias_uteis"]
                 }
-            else:
+            # Cadastro concorrente pode ter ocupado o período após a validação
+            conflito = self.verificar_conflito_periodo(usuario_id, data_inicio, data_fim)
+            if conflito:
                 return {
                     "sucesso": False,
-                    "erro": "Erro interno ao cadastrar férias",
-                    "tipo": "database"
+                    "erro": conflito["mensagem"],
+                    "tipo": "conflito",
+                    "detalhes": conflito["ferias"]
                 }
+            
+            return {
+                "sucesso": False,
+                "erro": "Erro interno ao cadastrar férias",
+                "tipo": "database"
+            }
                 
         except Exception as e:
             return {
@@ -181,22 +288,26 @@ class FeriasService:
                 "tipo": "exception"
             }
     
-    def obter_usuarios_para_selecao(self) -> Dict[str, Any]:
+    def obter_usuarios_para_selecao(self, termo: str = "", limite: int = 20) -> Dict[str, Any]:
         """
         Obtém usuários formatados para seleção na interface.
         
+        Args:
+            termo: Parte do nome (sem acento/maiúsculas); vazio lista os primeiros por nome
+            limite: Máximo de opções retornadas
+        
         Returns:
-            Dict com usuários e opções para selectbox
+            Dict com usuários e opções para selectbox (na ordem de relevância)
         """
         try:
-            users_list = self.users_db.get_users()
+            users_list = self.users_db.buscar_usuarios(termo, limite)
             
             # Converter lista para DataFrame se necessário
             if isinstance(users_list, list):
                 if not users_list:
                     return {
                         "sucesso": False,
-                        "erro": "Nenhum colaborador cadastrado",
+                        "erro": "Nenhum colaborador encontrado" if termo else "Nenhum colaborador cadastrado",
                         "usuarios": [],
                         "opcoes": {}
                     }
@@ -212,16 +323,15 @@ class FeriasService:
                         "opcoes": {}
                     }
             
-            # Ordenar por nome e formatar opções para selectbox
+            # Formatar opções para selectbox mantendo a ordem da busca
             from collections import OrderedDict
-            users_df_sorted = users_df.sort_values('nome')
             opcoes = OrderedDict()
-            for _, row in users_df_sorted.iterrows():
+            for _, row in users_df.iterrows():
                 opcoes[f"{row['nome']} ({row['email']})"] = row['id']
             
             return {
                 "sucesso": True,
-                "usuarios": users_df_sorted,
+                "usuarios": users_df,
                 "opcoes": opcoes
             }
             
@@ -278,6 +388,7 @@ class FeriasService:
                 "sucesso": True,
                 "vazio": False,
                 "ferias": ferias_formatado,
+                "registros": ferias_df.to_dict('records'),
                 "total": len(ferias_df)
             }
             
@@ -307,7 +418,12 @@ class FeriasService:
                     "erro": "Período de férias não encontrado"
                 }
             
-            # Tentar alterar status
+            # Reativar (ex.: Rejeitada -> Pendente) não pode sobrepor outras férias
+            conflito = self._conflito_reativacao(ferias_info, novo_status)
+            if conflito:
+                return conflito
+            
+            # Tentar alterar status (o repositório repete a verificação com o colaborador bloqueado)
             resultado = self.ferias_db.update_ferias_status(ferias_id, novo_status)
             
             if resultado:
@@ -316,6 +432,10 @@ class FeriasService:
                     "mensagem": f"Status alterado para '{novo_status}' com sucesso"
                 }
             else:
+                # Conflito criado por outro cadastro entre a verificação e a transação
+                conflito = self._conflito_reativacao(ferias_info, novo_status)
+                if conflito:
+                    return conflito
                 return {
                     "sucesso": False,
                     "erro": "Não foi possível alterar o status. Verifique os logs para mais detalhes."
@@ -327,6 +447,22 @@ class FeriasService:
                 "erro": f"Erro interno: {str(e)}"
             }
     
+    def _conflito_reativacao(self, ferias_info: dict, novo_status: str) -> Optional[Dict[str, Any]]:
+        """Erro de conflito se o novo status ocupa um período já ocupado por outras férias"""
+        if not status_ocupa_periodo(novo_status):
+            return None
+        conflito = self.verificar_conflito_periodo(
+            ferias_info['usuario_id'], ferias_info['data_inicio'], ferias_info['data_fim'], ferias_info['id']
+        )
+        if not conflito:
+            return None
+        return {
+            "sucesso": False,
+            "erro": conflito["mensagem"],
+            "tipo": "conflito",
+            "detalhes": conflito["ferias"]
+        }
+    
     def _get_ferias_info(self, ferias_id: int) -> dict:
         """Obtém informações das férias"""
         try:
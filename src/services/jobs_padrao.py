@@ -0,0 +1,114 @@
+"""
+Rotinas padrão do agendador
+
+Manutenções que antes dependiam de alguém clicar na interface ou rodar o
+script de manutenção: acúmulo de saldo por aniversário, arquivamento de
+avisos expirados, reconciliação dos resumos e dos saldos e aquecimento
+dos caches de ausências.
+"""
+
+from datetime import date
+from typing import Any, Dict
+from ..database.avisos_repository import AvisosRepository
+from ..database.ferias_repository import FeriasRepository
+from ..database.jobs_repository import JobsRepository
+from ..database.renovacao_repository import RenovacaoRepository
+from ..database.saldo_repository import SaldoRepository
+from ..database.setor_stats_repository import SetorStatsRepository
+from ..utils.constants import SETORES
+from .agendador import registrar_job
+from .cobertura_service import CoberturaService, JANELAS_AUSENCIA, descartar_caches_expirando
+from .saldo_service import SaldoService
+
+HORA = 3600
+DIA = 24 * HORA
+
+# Histórico de execuções mantido no banco
+DIAS_HISTORICO_JOBS = 90
+
+INTERVALO_AQUECIMENTO = 240  # segundos (abaixo dos TTLs dos caches de cobertura)
+
+
+def acumular_aniversarios() -> Dict[str, Any]:
+    """Credita os aniversários de admissão pendentes (idempotente)"""
+    resultado = SaldoService(RenovacaoRepository()).acumular_aniversarios()
+    if not resultado["sucesso"]:
+        raise RuntimeError(resultado["erro"])
+    return resultado
+
+
+def arquivar_avisos() -> Dict[str, Any]:
+    """Arquiva avisos expirados ou excluídos"""
+    arquivados = AvisosRepository().arquivar_avisos()
+    if arquivados is False:
+        raise RuntimeError("Falha ao arquivar avisos")
+    return {"arquivados": arquivados}
+
+
+def reconciliar_setor_stats() -> Dict[str, Any]:
+    """Reconstrói o resumo por setor se ele divergir da agregação completa"""
+    repositorio = SetorStatsRepository()
+    divergencias = repositorio.verificar_setor_stats()
+    if divergencias and not repositorio.reconstruir_setor_stats():
+        raise RuntimeError("Falha ao reconstruir setor_stats")
+    return {"divergencias": len(divergencias)}
+
+
+def reparar_contadores_avisos() -> Dict[str, Any]:
+    """Repara contadores de leitura divergentes"""
+    repositorio = AvisosRepository()
+    divergencias = repositorio.verificar_contadores_avisos()
+    if divergencias and not repositorio.reparar_contadores_avisos():
+        raise RuntimeError("Falha ao reparar contadores de avisos")
+    return {"divergencias": len(divergencias)}
+
+
+def verificar_saldos() -> Dict[str, Any]:
+    """Relatório de divergências de saldo (a correção é feita pelo RH ou pelo script)"""
+    resultado = SaldoService(SaldoRepository()).reconciliar()
+    if not resultado["sucesso"]:
+        raise RuntimeError(resultado["erro"])
+    resumo = resultado["resumo"]
+    return {chave: resumo[chave] for chave in
+            ("colaboradores", "sem_extrato", "divergencias_cache", "divergencias_ferias")}
+
+
+def aquecer_caches() -> Dict[str, Any]:
+    """Recarrega o mapa de ausências do ano e as listas de quem está fora"""
+    # Só recalcula o que venceria antes da próxima execução
+    descartar_caches_expirando(INTERVALO_AQUECIMENTO)
+    service = CoberturaService(FeriasRepository())
+    hoje = date.today()
+    service.mapa_ausencias_ano(hoje.year)
+    listas = 0
+    for janela in JANELAS_AUSENCIA:
+        for setor in [None] + SETORES:
+            listas += bool(service.quem_esta_fora(janela, setor, hoje)["sucesso"])
+    return {"ano": hoje.year, "listas": listas}
+
+
+def limpar_historico_jobs() -> Dict[str, Any]:
+    """Remove execuções antigas do histórico"""
+    if not JobsRepository().limpar_execucoes(DIAS_HISTORICO_JOBS):
+        raise RuntimeError("Falha ao limpar histórico de rotinas")
+    return {"dias_mantidos": DIAS_HISTORICO_JOBS}
+
+
+def registrar_jobs_padrao():
+    """Registra as rotinas padrão (idempotente)"""
+    if SaldoService.modo_aniversario():
+        registrar_job("acumulo_aniversario", acumular_aniversarios, HORA,
+                      "Credita saldo pelo aniversário de admissão")
+    registrar_job("arquivar_avisos", arquivar_avisos, HORA,
+                  "Arquiva avisos expirados ou excluídos")
+    registrar_job("reconciliar_setor_stats", reconciliar_setor_stats, DIA,
+                  "Reconstrói o resumo por setor se divergir")
+    registrar_job("reparar_contadores_avisos", reparar_contadores_avisos, DIA,
+                  "Repara contadores de leitura dos avisos")
+    registrar_job("verificar_saldos", verificar_saldos, DIA,
+                  "Compara saldo, extrato e férias aprovadas de todos os colaboradores")
+    registrar_job("limpar_historico_jobs", limpar_historico_jobs, DIA,
+                  f"Remove execuções com mais de {DIAS_HISTORICO_JOBS} dias")
+    # Caches em memória: cada réplica aquece o seu, antes de vencer o TTL
+    registrar_job("aquecer_caches", aquecer_caches, INTERVALO_AQUECIMENTO,
+                  "Aquece mapa de ausências e listas de quem está fora", por_processo=True)
@@ -0,0 +1,92 @@
+"""
+Serviço de Saldo - Crédito e manutenção do saldo de férias
+
+Centraliza os parâmetros de crédito (dias por ano, teto do saldo e modo de
+renovação) usados pela interface, pelo script de manutenção e pelas
+rotinas agendadas.
+"""
+
+from typing import Any, Dict
+from datetime import date, datetime, time
+from ..core.regras_saldo import RegrasSaldo
+from ..utils.constants import DIAS_FERIAS_PADRAO, SALDO_MAXIMO, MODO_RENOVACAO_SALDO
+
+
+class SaldoService:
+    """
+    Serviço que credita e mantém o saldo de férias.
+
+    Responsabilidades:
+    - Acúmulo diário por aniversário de admissão
+    - Consulta do saldo em uma data (extrato de movimentos)
+    - Reconciliação do saldo de todos os colaboradores
+    - Não contém lógica de interface (sem Streamlit)
+    """
+
+    def __init__(self, users_db, dias_anuais: int = DIAS_FERIAS_PADRAO, saldo_maximo: int = SALDO_MAXIMO):
+        """
+        Inicializa o serviço.
+
+        Args:
+            users_db: Instância do UserManager
+            dias_anuais: Dias creditados por ano completo
+            saldo_maximo: Teto do saldo após o crédito
+        """
+        self.users_db = users_db
+        self.dias_anuais = dias_anuais
+        self.saldo_maximo = saldo_maximo
+
+    @staticmethod
+    def modo_aniversario() -> bool:
+        """Indica se o saldo é renovado pelo aniversário de admissão"""
+        return MODO_RENOVACAO_SALDO == "aniversario"
+
+    def acumular_aniversarios(self, ate: date = None, desde: date = None) -> Dict[str, Any]:
+        """
+        Credita os aniversários de admissão até `ate` (padrão: hoje).
+
+        Pode ser executado a qualquer momento: aniversários já creditados são
+        ignorados e dias sem execução são recuperados.
+
+        Returns:
+            Dict com sucesso, aniversarios, colaboradores e dias creditados
+        """
+        resultado = self.users_db.acumular_aniversarios(self.dias_anuais, self.saldo_maximo, ate, desde)
+        if resultado is False:
+            return {"sucesso": False, "erro": "Erro ao creditar aniversários de admissão"}
+        return {"sucesso": True, **resultado}
+
+    def saldo_em(self, usuario_id: int, dia: date) -> Dict[str, Any]:
+        """
+        Saldo do colaborador ao final de um dia, pelo extrato.
+
+        Returns:
+            Dict com sucesso e saldo (None se o extrato começa depois do dia)
+        """
+        momento = datetime.combine(dia, time.max)
+        saldo = self.users_db.get_saldo_em(usuario_id, momento)
+        return {"sucesso": True, "saldo": saldo}
+
+    def reconciliar(self, aplicar: bool = False, usuario_responsavel_id: int = None,
+                    usuario_responsavel_nome: str = None) -> Dict[str, Any]:
+        """
+        Compara saldo, extrato e férias aprovadas de todos os colaboradores.
+
+        Args:
+            aplicar: Corrige as divergências (na mesma transação do relatório)
+            usuario_responsavel_id: Responsável gravado nas correções
+            usuario_responsavel_nome: Nome do responsável
+
+        Returns:
+            Dict com sucesso, divergencias (por colaborador), resumo e
+            quantidades corrigidas
+        """
+        resultado = self.users_db.reconciliar_saldos(aplicar, usuario_responsavel_id, usuario_responsavel_nome)
+        if resultado is False:
+            return {"sucesso": False, "erro": "Erro ao reconciliar saldos"}
+        return {
+            "sucesso": True,
+            "aplicado": aplicar and bool(resultado["divergencias"]),
+            "resumo": RegrasSaldo.resumir_reconciliacao(resultado["divergencias"]),
+            **resultado
+        }
@@ -0,0 +1,69 @@
+"""
+Buffer de Leituras - Agrupa confirmações de leitura de avisos
+
+Cliques rápidos em "Marcar como Lido" são acumulados na sessão e gravados
+em uma única instrução quando o buffer enche, envelhece ou antes de
+operações que dependem do estado gravado (ocultar, marcar todos, logout).
+A interface considera os avisos pendentes como lidos (atualização otimista);
+se a gravação falha, as pendências são descartadas para não repetir a
+mesma falha a cada recarga (o aviso volta a aparecer como não lido).
+"""
+
+import time
+from typing import Callable, Iterable, List, Optional
+
+MAX_ITENS_BUFFER = 10
+MAX_IDADE_BUFFER = 5.0  # segundos
+
+
+class BufferLeituras:
+    """Confirmações de leitura pendentes de um usuário"""
+
+    def __init__(self, max_itens: int = MAX_ITENS_BUFFER, max_idade: float = MAX_IDADE_BUFFER):
+        self.max_itens = max_itens
+        self.max_idade = max_idade
+        self._pendentes: List[int] = []
+        self._desde: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._pendentes)
+
+    def __contains__(self, aviso_id: int) -> bool:
+        return aviso_id in self._pendentes
+
+    @property
+    def pendentes(self) -> List[int]:
+        return list(self._pendentes)
+
+    def adicionar(self, aviso_id: int, agora: float = None):
+        """Registra uma leitura (idempotente)"""
+        if aviso_id in self._pendentes:
+            return
+        if not self._pendentes:
+            self._desde = time.monotonic() if agora is None else agora
+        self._pendentes.append(aviso_id)
+
+    def deve_descarregar(self, agora: float = None) -> bool:
+        """Indica se o buffer atingiu o tamanho ou a idade máxima"""
+        if not self._pendentes:
+            return False
+        agora = time.monotonic() if agora is None else agora
+        return len(self._pendentes) >= self.max_itens or agora - self._desde >= self.max_idade
+
+    def descarregar(self, gravar: Callable[[Iterable[int]], object]) -> bool:
+        """
+        Grava as leituras pendentes com uma única chamada.
+
+        Args:
+            gravar: Função que recebe os IDs e retorna falso em caso de erro
+
+        Returns:
+            True se não havia pendências ou se a gravação funcionou; as
+            pendências são esvaziadas em ambos os casos
+        """
+        if not self._pendentes:
+            return True
+        pendentes = self.pendentes
+        self._pendentes = []
+        self._desde = None
+        return gravar(pendentes) is not False
@@ -1,15 +1,32 @@
 """
 Constantes centralizadas do sistema - Elimina duplicações
 """
+import os
 
 # Configurações de Saldo
 SALDO_MINIMO = 0
 SALDO_MAXIMO = 30
 DIAS_FERIAS_PADRAO = 12
 
+# Renovação do saldo: "anual" (RH aplica a todos de uma vez) ou
+# "aniversario" (crédito diário no aniversário de admissão de cada um)
+MODOS_RENOVACAO = ("anual", "aniversario")
+MODO_RENOVACAO_SALDO = os.getenv("MODO_RENOVACAO_SALDO", "anual").strip().lower()
+if MODO_RENOVACAO_SALDO not in MODOS_RENOVACAO:
+    raise ValueError(
+        f"MODO_RENOVACAO_SALDO inválido: {MODO_RENOVACAO_SALDO!r} "
+        f"(valores aceitos: {', '.join(MODOS_RENOVACAO)})"
+    )
+
 # Antecedência
 DIAS_ANTECEDENCIA_MINIMA = 7
 
+# Cobertura: máximo de colaboradores do mesmo setor ausentes no mesmo dia
+MAX_AUSENTES_PADRAO = 2
+MAX_AUSENTES_POR_SETOR = {
+    "DIRETORIA": 1,
+}
+
 # Setores
 SETORES = [
     "ADMINISTRAÇÃO",
@@ -0,0 +1,226 @@
+"""
+Detector de Queries Repetidas - N+1 e duplicatas por rerun
+
+Ativo em modo de desenvolvimento (DEBUG_MODE=True). Cada query executada
+pela camada de repositórios recebe uma impressão digital:
+
+- formato: SQL normalizado, sem literais (mesmo "shape" de query)
+- identidade: formato + parâmetros
+
+Ao final do rerun são apontadas queries idênticas repetidas e laços de
+queries de mesmo formato com ids diferentes (padrão N+1), junto com as
+pilhas de chamada responsáveis.
+"""
+
+import os
+import re
+import threading
+import traceback
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, List
+
+from .error_handler import logger
+
+MODO_DESENVOLVIMENTO = os.getenv("DEBUG_MODE", "False").lower() == "true"
+LIMITE_MESMO_FORMATO = 3
+PROFUNDIDADE_PILHA = 8
+
+_estado = threading.local()
+_observador_registrado = False
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_LISTA_IN = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+def normalizar_query(query) -> str:
+    """
+    Normaliza SQL para comparação de formato.
+
+    Remove literais, colapsa espaços e listas IN de tamanho variável.
+    """
+    if isinstance(query, bytes):
+        query = query.decode("utf-8", errors="replace")
+    sql = _RE_STRING.sub("?", str(query))
+    sql = _RE_NUMERO.sub("?", sql)
+    sql = _RE_ESPACOS.sub(" ", sql).strip()
+    sql = _RE_LISTA_IN.sub("(?)", sql)
+    return sql
+
+
+def _capturar_pilha() -> List[str]:
+    """Pilha de chamadas restrita ao código da aplicação e aos testes"""
+    quadros = []
+    for quadro in traceback.extract_stack()[:-1]:
+        caminho = quadro.filename.replace("\\", "/")
+        if caminho.rsplit("/", 1)[-1] in ("detector_queries.py", "base_connection.py"):
+            continue
+        if "/src/" in caminho:
+            relativo = caminho.split("/src/")[-1]
+        elif "/tests/" in caminho:
+            relativo = "tests/" + caminho.split("/tests/")[-1]
+        else:
+            continue
+        quadros.append(f"{relativo}:{quadro.lineno} em {quadro.name}")
+    return quadros[-PROFUNDIDADE_PILHA:]
+
+
+class DetectorQueries:
+    """Acumula as queries de um escopo (rerun ou chamada de serviço)"""
+
+    def __init__(self, capturar_pilha: bool = True):
+        self.capturar_pilha = capturar_pilha
+        self.execucoes: List[Dict[str, Any]] = []
+
+    @property
+    def total(self) -> int:
+        return len(self.execucoes)
+
+    def registrar(self, query, params, duracao: float = 0.0):
+        """Registra uma query executada"""
+        self.execucoes.append({
+            "formato": normalizar_query(query),
+            "params": repr(params),
+            "duracao": duracao,
+            "pilha": _capturar_pilha() if self.capturar_pilha else [],
+        })
+
+    def duplicadas(self) -> List[Dict[str, Any]]:
+        """Queries idênticas (mesmo SQL e mesmos parâmetros) executadas mais de uma vez"""
+        grupos: Dict[tuple, List[Dict[str, Any]]] = {}
+        for execucao in self.execucoes:
+            grupos.setdefault((execucao["formato"], execucao["params"]), []).append(execucao)
+
+        return [
+            {
+                "formato": formato,
+                "params": params,
+                "ocorrencias": len(itens),
+                "pilhas": _pilhas_distintas(itens),
+            }
+            for (formato, params), itens in grupos.items()
+            if len(itens) > 1
+        ]
+
+    def n_mais_um(self, limite: int = LIMITE_MESMO_FORMATO) -> List[Dict[str, Any]]:
+        """Mesmo formato executado com parâmetros diferentes pelo menos `limite` vezes"""
+        grupos: Dict[str, List[Dict[str, Any]]] = {}
+        for execucao in self.execucoes:
+            grupos.setdefault(execucao["formato"], []).append(execucao)
+
+        suspeitas = []
+        for formato, itens in grupos.items():
+            parametros_distintos = {item["params"] for item in itens}
+            if len(parametros_distintos) >= limite:
+                suspeitas.append({
+                    "formato": formato,
+                    "ocorrencias": len(itens),
+                    "parametros_distintos": len(parametros_distintos),
+                    "pilhas": _pilhas_distintas(itens),
+                })
+        return suspeitas
+
+    def relatorio(self) -> str:
+        """Texto com duplicatas e laços N+1 e as pilhas responsáveis"""
+        linhas = []
+        for item in self.duplicadas():
+            linhas.append(f"[DUPLICADA x{item['ocorrencias']}] {item['formato'][:160]} params={item['params'][:80]}")
+            linhas.extend(_formatar_pilhas(item["pilhas"]))
+        for item in self.n_mais_um():
+            linhas.append(
+                f"[N+1 x{item['ocorrencias']}, {item['parametros_distintos']} ids] {item['formato'][:160]}"
+            )
+            linhas.extend(_formatar_pilhas(item["pilhas"]))
+        return "\n".join(linhas)
+
+
+def _pilhas_distintas(itens: List[Dict[str, Any]]) -> List[List[str]]:
+    pilhas = []
+    for item in itens:
+        if item["pilha"] and item["pilha"] not in pilhas:
+            pilhas.append(item["pilha"])
+    return pilhas
+
+
+def _formatar_pilhas(pilhas: List[List[str]]) -> List[str]:
+    linhas = []
+    for pilha in pilhas[:3]:
+        linhas.append("    pilha:")
+        linhas.extend(f"      {quadro}" for quadro in pilha)
+    return linhas
+
+
+def _detectores_ativos() -> List[DetectorQueries]:
+    if not hasattr(_estado, "detectores"):
+        _estado.detectores = []
+    return _estado.detectores
+
+
+def _observar_query(query, params, duracao):
+    """Repassa a query aos detectores abertos na thread atual"""
+    for detector in getattr(_estado, "detectores", []):
+        detector.registrar(query, params, duracao)
+
+
+def _garantir_observador():
+    global _observador_registrado
+    if not _observador_registrado:
+        from ..database.base_connection import registrar_observador_query
+        registrar_observador_query(_observar_query)
+        _observador_registrado = True
+
+
+@contextmanager
+def contar_queries(capturar_pilha: bool = True):
+    """
+    Abre um escopo de contagem de queries.
+
+    Yields:
+        DetectorQueries com as queries executadas no escopo
+    """
+    _garantir_observador()
+    detector = DetectorQueries(capturar_pilha)
+    detectores = _detectores_ativos()
+    detectores.append(detector)
+    try:
+        yield detector
+    finally:
+        detectores.remove(detector)
+
+
+@contextmanager
+def assert_max_queries(limite: int):
+    """
+    Helper de teste: falha se o bloco executar mais que `limite` queries.
+
+    Exemplo:
+        with assert_max_queries(2):
+            service.obter_informacoes_saldo(user_id)
+    """
+    with contar_queries() as detector:
+        yield detector
+
+    if detector.total > limite:
+        raise AssertionError(
+            f"Esperado no máximo {limite} queries, executadas {detector.total}\n{detector.relatorio()}"
+        )
+
+
+def detectar_queries_rerun(func: Callable) -> Callable:
+    """Decorator para o ponto de entrada: relata repetições ao final do rerun"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not MODO_DESENVOLVIMENTO or _detectores_ativos():
+            return func(*args, **kwargs)
+
+        with contar_queries() as detector:
+            try:
+                return func(*args, **kwargs)
+            finally:
+                relatorio = detector.relatorio()
+                if relatorio:
+                    mensagem = f"Queries repetidas no rerun ({detector.total} queries):\n{relatorio}"
+                    logger.warning(mensagem)
+    return wrapper
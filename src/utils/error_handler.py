@@ -311,23 +311,28 @@ class CriticalOperationManager:
     
     @staticmethod
     def monitor_resource_usage(func: Callable) -> Callable:
-        """Decorator para monitorar uso de recursos"""
+        """Decorator para monitorar uso de recursos (e alimentar o profiler de painéis)"""
         @wraps(func)
         def wrapper(*args, **kwargs):
-            import psutil
-            import os
-            
-            process = psutil.Process(os.getpid())
-            memory_before = process.memory_info().rss
-            
+            from .profiler import perfil_painel
+
             try:
-                result = func(*args, **kwargs)
+                import psutil
+                process = psutil.Process(os.getpid())
+                memory_before = process.memory_info().rss
+            except ImportError:
+                process = None
+
+            try:
+                with perfil_painel(func.__name__):
+                    result = func(*args, **kwargs)
                 return result
             finally:
-                memory_after = process.memory_info().rss
-                memory_diff = memory_after - memory_before
-                
-                if memory_diff > 50 * 1024 * 1024:  # 50MB
-                    logger.warning(f"Alto uso de memória em {func.__name__}: {memory_diff / 1024 / 1024:.2f}MB")
+                if process is not None:
+                    memory_after = process.memory_info().rss
+                    memory_diff = memory_after - memory_before
+
+                    if memory_diff > 50 * 1024 * 1024:  # 50MB
+                        logger.warning(f"Alto uso de memória em {func.__name__}: {memory_diff / 1024 / 1024:.2f}MB")
         
         return wrapper
\ No newline at end of file
@@ -0,0 +1,251 @@
+"""
+Profiler de Renderização - Mede o custo de cada painel por rerun
+
+Modo opcional, ativado pela variável de ambiente PERFIL_RENDER=True.
+Para cada rerun registra, por painel, o tempo total, o tempo gasto no banco,
+o número de queries e as alocações Python (via tracemalloc).
+
+Os registros ficam em um buffer circular em memória e são anexados a um
+arquivo JSONL local para comparação entre execuções.
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Dict, List
+
+PERFIL_ATIVO = os.getenv("PERFIL_RENDER", "False").lower() == "true"
+ARQUIVO_PERFIL = os.getenv("PERFIL_RENDER_ARQUIVO", "logs/perfil_render.jsonl")
+TAMANHO_BUFFER = 1000
+
+_buffer = deque(maxlen=TAMANHO_BUFFER)
+_lock_arquivo = threading.Lock()
+_estado = threading.local()
+_observador_registrado = False
+
+
+def perfil_ativo() -> bool:
+    """Indica se o profiler está ligado"""
+    return PERFIL_ATIVO
+
+
+def _pilha() -> List[Dict[str, Any]]:
+    """Pilha de painéis em execução na thread atual (uma thread por sessão)"""
+    if not hasattr(_estado, "pilha"):
+        _estado.pilha = []
+        _estado.registros = []
+        _estado.rerun_id = None
+    return _estado.pilha
+
+
+def _observar_query(query, params, duracao):
+    """Atribui a query a todos os painéis abertos (métricas inclusivas)"""
+    for quadro in getattr(_estado, "pilha", []):
+        quadro["db_segundos"] += duracao
+        quadro["queries"] += 1
+
+
+def _garantir_instrumentacao():
+    """Liga tracemalloc e o observador de queries na primeira utilização"""
+    global _observador_registrado
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    if not _observador_registrado:
+        from ..database.base_connection import registrar_observador_query
+        registrar_observador_query(_observar_query)
+        _observador_registrado = True
+
+
+@contextmanager
+def perfil_rerun():
+    """
+    Delimita um rerun do Streamlit.
+
+    Ao final, os registros de todos os painéis medidos são enviados
+    ao buffer em memória e ao arquivo JSONL.
+    """
+    if not PERFIL_ATIVO or getattr(_estado, "rerun_id", None):
+        yield
+        return
+
+    _garantir_instrumentacao()
+    _pilha()
+    _estado.rerun_id = uuid.uuid4().hex[:12]
+    _estado.registros = []
+
+    try:
+        with perfil_painel("main"):
+            yield
+    finally:
+        registros = _estado.registros
+        _estado.rerun_id = None
+        _estado.registros = []
+        _publicar(registros)
+
+
+@contextmanager
+def perfil_painel(nome: str):
+    """
+    Mede um painel dentro do rerun atual.
+
+    Args:
+        nome: Nome do painel (ex.: menu_gerenciar_ferias)
+    """
+    if not PERFIL_ATIVO:
+        yield
+        return
+
+    _garantir_instrumentacao()
+    pilha = _pilha()
+
+    # Preservar pico do painel pai antes de zerar o contador de pico
+    memoria_atual, pico = tracemalloc.get_traced_memory()
+    if pilha:
+        pilha[-1]["pico_bytes"] = max(pilha[-1]["pico_bytes"], pico)
+    tracemalloc.reset_peak()
+
+    quadro = {
+        "painel": nome,
+        "inicio": time.perf_counter(),
+        "memoria_inicial": memoria_atual,
+        "pico_bytes": memoria_atual,
+        "db_segundos": 0.0,
+        "queries": 0,
+    }
+    pilha.append(quadro)
+
+    try:
+        yield
+    finally:
+        pilha.pop()
+        memoria_final, pico = tracemalloc.get_traced_memory()
+        pico_painel = max(pico, quadro["pico_bytes"])
+        if pilha:
+            pilha[-1]["pico_bytes"] = max(pilha[-1]["pico_bytes"], pico_painel)
+
+        registro = {
+            "rerun_id": getattr(_estado, "rerun_id", None),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "painel": nome,
+            "profundidade": len(pilha),
+            "tempo_ms": round((time.perf_counter() - quadro["inicio"]) * 1000, 2),
+            "db_ms": round(quadro["db_segundos"] * 1000, 2),
+            "queries": quadro["queries"],
+            "alocado_kb": round((memoria_final - quadro["memoria_inicial"]) / 1024, 1),
+            "pico_kb": round((pico_painel - quadro["memoria_inicial"]) / 1024, 1),
+        }
+
+        if registro["rerun_id"]:
+            _estado.registros.append(registro)
+        else:
+            _publicar([registro])
+
+
+def perfilar_rerun(func: Callable) -> Callable:
+    """Decorator para o ponto de entrada da aplicação (main)"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with perfil_rerun():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _publicar(registros: List[Dict[str, Any]]):
+    """Envia registros ao buffer circular e ao arquivo JSONL"""
+    if not registros:
+        return
+
+    _buffer.extend(registros)
+
+    try:
+        diretorio = os.path.dirname(ARQUIVO_PERFIL)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with _lock_arquivo:
+            with open(ARQUIVO_PERFIL, "a", encoding="utf-8") as arquivo:
+                for registro in registros:
+                    arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    except OSError:
+        # Falha de escrita não pode derrubar a renderização
+        pass
+
+
+def obter_registros(limite: int = None) -> List[Dict[str, Any]]:
+    """
+    Retorna os registros mais recentes do buffer.
+
+    Args:
+        limite: Quantidade máxima de registros (padrão: todos)
+    """
+    registros = list(_buffer)
+    return registros[-limite:] if limite else registros
+
+
+def resumo_por_painel(registros: List[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """
+    Agrega registros por painel para comparação.
+
+    Args:
+        registros: Registros a agregar (padrão: buffer em memória)
+
+    Returns:
+        Lista ordenada pelo tempo médio, do painel mais lento ao mais rápido
+    """
+    if registros is None:
+        registros = obter_registros()
+
+    por_painel: Dict[str, List[Dict[str, Any]]] = {}
+    for registro in registros:
+        por_painel.setdefault(registro["painel"], []).append(registro)
+
+    resumo = []
+    for painel, itens in por_painel.items():
+        tempos = sorted(item["tempo_ms"] for item in itens)
+        total = len(itens)
+        indice_p95 = min(total - 1, int(round(0.95 * (total - 1))))
+        resumo.append({
+            "painel": painel,
+            "execucoes": total,
+            "tempo_medio_ms": round(sum(tempos) / total, 2),
+            "tempo_p95_ms": tempos[indice_p95],
+            "tempo_max_ms": tempos[-1],
+            "db_medio_ms": round(sum(item["db_ms"] for item in itens) / total, 2),
+            "queries_media": round(sum(item["queries"] for item in itens) / total, 1),
+            "alocado_medio_kb": round(sum(item["alocado_kb"] for item in itens) / total, 1),
+            "pico_max_kb": max(item["pico_kb"] for item in itens),
+        })
+
+    return sorted(resumo, key=lambda item: item["tempo_medio_ms"], reverse=True)
+
+
+def carregar_arquivo(caminho: str = None, limite: int = 5000) -> List[Dict[str, Any]]:
+    """
+    Lê os registros persistidos no arquivo JSONL.
+
+    Args:
+        caminho: Caminho do arquivo (padrão: ARQUIVO_PERFIL)
+        limite: Quantidade máxima de linhas mais recentes
+    """
+    caminho = caminho or ARQUIVO_PERFIL
+    if not os.path.exists(caminho):
+        return []
+
+    with open(caminho, encoding="utf-8") as arquivo:
+        linhas = deque(arquivo, maxlen=limite)
+
+    registros = []
+    for linha in linhas:
+        try:
+            registros.append(json.loads(linha))
+        except json.JSONDecodeError:
+            continue
+    return registros
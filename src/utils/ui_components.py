@@ -6,7 +6,9 @@ separados da lógica de negócio.
 """
 
 import streamlit as st
+import pandas as pd
 import os
+from typing import Any, Callable, Dict, List, Sequence
 from .security import sanitize_html, safe_format_html
 
 
@@ -158,4 +160,91 @@ def create_confirmation_dialog(titulo: str, mensagem: str, key: str) -> bool:
         if st.button("Cancelar", key=f"cancel_{key}"):
             return False
     
-    return False
\ No newline at end of file
+    return False
+
+
+def create_paginated_table(
+    chave: str,
+    carregar: Callable[..., Dict[str, Any]],
+    colunas: Dict[str, Any],
+    ordenacoes: Dict[str, tuple] = None,
+    tamanhos_pagina: Sequence[int] = (25, 50, 100),
+    descricao: str = "registros",
+    filtros: Any = None,
+    formatar: Callable[[pd.DataFrame], pd.DataFrame] = None,
+    vazio: str = "Nenhum registro encontrado"
+) -> List[Dict[str, Any]]:
+    """
+    Cria tabela paginada no servidor (por chave), com ordenação e tamanho de página.
+    
+    Apenas a página atual é enviada ao navegador; a navegação guarda a pilha
+    de cursores na sessão.
+    
+    Args:
+        chave: Prefixo único das chaves de sessão e widgets
+        carregar: Função (limite, cursor, ordenar_por, decrescente) que retorna
+                  dict com 'linhas', 'total' e 'proximo' (ver _consultar_pagina)
+        colunas: {campo: rótulo ou st.column_config} na ordem de exibição
+        ordenacoes: {rótulo: (campo, decrescente)}; a primeira é o padrão
+        tamanhos_pagina: Opções de linhas por página
+        descricao: Nome dos registros na legenda ("colaboradores", ...)
+        filtros: Valores dos filtros da tela; quando mudam, volta à primeira página
+        formatar: Ajustes no DataFrame da página antes de exibir (datas, rótulos)
+        vazio: Mensagem quando não há registros
+        
+    Returns:
+        Linhas (dicts) da página exibida
+    """
+    ordenacoes = ordenacoes or {"Padrão": (None, False)}
+    
+    col_ordem, col_tamanho = st.columns([3, 1])
+    with col_ordem:
+        if len(ordenacoes) > 1:
+            rotulo_ordem = st.selectbox("Ordenar por", list(ordenacoes), key=f"{chave}_ordem")
+        else:
+            rotulo_ordem = next(iter(ordenacoes))
+    with col_tamanho:
+        tamanho = st.selectbox("Linhas por página", list(tamanhos_pagina), key=f"{chave}_tamanho")
+    ordenar_por, decrescente = ordenacoes[rotulo_ordem]
+    
+    # Pilha de cursores; reinicia quando ordenação, tamanho ou filtros mudam
+    assinatura = (rotulo_ordem, tamanho, repr(filtros))
+    estado = st.session_state.get(f"{chave}_paginacao")
+    if not estado or estado["assinatura"] != assinatura:
+        estado = {"assinatura": assinatura, "cursores": [None]}
+        st.session_state[f"{chave}_paginacao"] = estado
+    cursores = estado["cursores"]
+    
+    pagina = carregar(tamanho, cursores[-1], ordenar_por, decrescente)
+    linhas = pagina["linhas"]
+    
+    if not linhas:
+        if len(cursores) > 1:
+            st.info("Página sem registros.")
+            st.button("← Anterior", key=f"{chave}_anterior", on_click=cursores.pop)
+        else:
+            st.info(vazio)
+        return []
+    
+    df = pd.DataFrame(linhas)
+    if formatar:
+        df = formatar(df)
+    st.dataframe(
+        df[list(colunas)],
+        column_config=colunas,
+        use_container_width=True,
+        hide_index=True
+    )
+    
+    inicio = (len(cursores) - 1) * tamanho
+    st.caption(f"Exibindo {inicio + 1}–{inicio + len(linhas)} de {pagina['total']} {descricao}")
+    
+    col_anterior, col_proxima = st.columns(2)
+    with col_anterior:
+        if len(cursores) > 1:
+            st.button("← Anterior", key=f"{chave}_anterior", on_click=cursores.pop)
+    with col_proxima:
+        if pagina["proximo"] is not None:
+            st.button("Próxima →", key=f"{chave}_proxima", on_click=cursores.append, args=(pagina["proximo"],))
+    
+    return linhas
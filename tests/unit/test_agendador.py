@@ -0,0 +1,96 @@
+"""
+Testes para o agendador de rotinas (sem banco: repositório falso)
+"""
+import unittest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from src.services import agendador
+from src.services.agendador import Agendador, registrar_job, jobs_vencidos
+
+class RepositorioFalso:
+    def __init__(self, ultimas=None, lock_livre=True):
+        self.ultimas = [] if ultimas is None else ultimas
+        self.lock_livre = lock_livre
+        self.execucoes = []
+
+    @contextmanager
+    def lock_job(self, job):
+        yield self.lock_livre
+
+    def registrar_execucao(self, job, inicio, fim, duracao_ms, sucesso, resultado=None, erro=None, executor=None):
+        self.execucoes.append({"job": job, "sucesso": sucesso, "resultado": resultado, "erro": erro})
+        return True
+
+    def get_ultimas_execucoes(self, job=None):
+        if self.ultimas is None:
+            return None
+        return [linha for linha in self.ultimas if job is None or linha["job"] == job]
+
+class TestAgendador(unittest.TestCase):
+
+    def setUp(self):
+        self._jobs_originais = dict(agendador._jobs)
+        agendador._jobs.clear()
+        self.chamadas = []
+        registrar_job("global", lambda: self.chamadas.append("global") or {"ok": 1}, 3600)
+        registrar_job("local", lambda: self.chamadas.append("local"), 60, por_processo=True)
+
+    def tearDown(self):
+        agendador._jobs.clear()
+        agendador._jobs.update(self._jobs_originais)
+
+    def test_jobs_vencidos(self):
+        """Nunca executada ou intervalo já passado"""
+        agora = datetime(2026, 1, 1, 12, 0)
+        jobs = agendador.jobs_registrados()
+        ultimas = {"global": agora - timedelta(minutes=30), "local": agora - timedelta(minutes=5)}
+        self.assertEqual([j.nome for j in jobs_vencidos(jobs, ultimas, agora)], ["local"])
+        self.assertEqual(len(jobs_vencidos(jobs, {}, agora)), 2)
+
+    def test_execucao_grava_historico(self):
+        """Sucesso e falha ficam no histórico e nas métricas do processo"""
+        repositorio = RepositorioFalso()
+        registrar_job("falha", lambda: 1 / 0, 60)
+        execucao = Agendador(repositorio)
+
+        self.assertEqual(execucao.executar_job("global")["resultado"], {"ok": 1})
+        resultado = execucao.executar_job("falha")
+        self.assertFalse(resultado["sucesso"])
+        self.assertIn("ZeroDivisionError", resultado["erro"])
+        self.assertEqual([e["sucesso"] for e in repositorio.execucoes], [True, False])
+        self.assertEqual(execucao.metricas["falha"]["falhas"], 1)
+
+    def test_lock_ocupado_ignora_rotina_global(self):
+        """Rotina global já em execução em outro processo não roda de novo"""
+        execucao = Agendador(RepositorioFalso(lock_livre=False))
+        self.assertTrue(execucao.executar_job("global")["ignorado"])
+        self.assertTrue(execucao.executar_job("local")["sucesso"])
+        self.assertEqual(self.chamadas, ["local"])
+
+    def test_nao_lider_roda_apenas_locais(self):
+        """Sem liderança só as rotinas por processo rodam; vencimento local é por processo"""
+        agora = datetime.now()
+        execucao = Agendador(RepositorioFalso(ultimas=[{"job": "global", "inicio": agora - timedelta(hours=2)}]))
+        self.assertEqual(list(execucao.executar_vencidos(agora, globais=False)), ["local"])
+        self.assertEqual(list(execucao.executar_vencidos(agora + timedelta(seconds=10))), ["global"])
+        self.assertEqual(self.chamadas, ["local", "global"])
+
+    def test_vencimento_conferido_com_lock(self):
+        """Rotina executada por outro processo entre a seleção e o lock não roda de novo"""
+        agora = datetime.now()
+        repositorio = RepositorioFalso()
+        execucao = Agendador(repositorio)
+        repositorio.ultimas = [{"job": "global", "inicio": agora - timedelta(seconds=1)}]
+        self.assertTrue(execucao.executar_job("global", vencida_em=agora)["ignorado"])
+        self.assertEqual(self.chamadas, [])
+
+    def test_historico_indisponivel_adia_globais(self):
+        """Falha ao ler o histórico não faz todas as rotinas globais parecerem vencidas"""
+        repositorio = RepositorioFalso()
+        repositorio.ultimas = None
+        resultados = Agendador(repositorio).executar_vencidos()
+        self.assertEqual(list(resultados), ["local"])
+        self.assertEqual(self.chamadas, ["local"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Testes para o buffer de confirmações de leitura
+"""
+import unittest
+from src.utils.buffer_leituras import BufferLeituras
+
+class TestBufferLeituras(unittest.TestCase):
+    
+    def test_coalesce_cliques_repetidos(self):
+        """Cliques repetidos no mesmo aviso geram uma única pendência"""
+        buffer = BufferLeituras()
+        buffer.adicionar(1, agora=0)
+        buffer.adicionar(1, agora=1)
+        buffer.adicionar(2, agora=1)
+        self.assertEqual(buffer.pendentes, [1, 2])
+        self.assertIn(2, buffer)
+    
+    def test_descarrega_por_tamanho_ou_idade(self):
+        """Buffer descarrega ao encher ou ao envelhecer"""
+        buffer = BufferLeituras(max_itens=3, max_idade=5)
+        self.assertFalse(buffer.deve_descarregar(agora=100))
+        
+        buffer.adicionar(1, agora=0)
+        self.assertFalse(buffer.deve_descarregar(agora=4))
+        self.assertTrue(buffer.deve_descarregar(agora=5))
+        
+        buffer = BufferLeituras(max_itens=2, max_idade=5)
+        buffer.adicionar(1, agora=0)
+        buffer.adicionar(2, agora=0)
+        self.assertTrue(buffer.deve_descarregar(agora=0))
+    
+    def test_uma_gravacao_por_descarga(self):
+        """Todas as pendências vão em uma única chamada"""
+        chamadas = []
+        buffer = BufferLeituras()
+        for aviso_id in (3, 4, 5):
+            buffer.adicionar(aviso_id)
+        
+        self.assertTrue(buffer.descarregar(lambda ids: chamadas.append(ids)))
+        self.assertEqual(chamadas, [[3, 4, 5]])
+        self.assertEqual(len(buffer), 0)
+    
+    def test_falha_descarta_pendencias(self):
+        """Erro na gravação descarta as leituras em vez de repetir a falha a cada recarga"""
+        chamadas = []
+        buffer = BufferLeituras()
+        buffer.adicionar(7)
+        self.assertFalse(buffer.descarregar(lambda ids: chamadas.append(ids) or False))
+        self.assertEqual(buffer.pendentes, [])
+        self.assertTrue(buffer.descarregar(lambda ids: chamadas.append(ids)))
+        self.assertEqual(chamadas, [[7]])
+
+if __name__ == '__main__':
+    unittest.main()
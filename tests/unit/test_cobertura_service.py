@@ -0,0 +1,40 @@
+"""
+Testes para os mapas de ausência do CoberturaService (sem banco: repositório falso)
+"""
+import unittest
+from datetime import date
+from src.services import cobertura_service
+from src.services.cobertura_service import CoberturaService
+from src.utils.constants import SETORES
+
+class RepositorioFalso:
+    def __init__(self, ausencias):
+        self.ausencias = ausencias
+
+    def get_ausencias_periodo(self, data_inicio, data_fim, setor=None, incluir_pendentes=False, apenas_ativos=True):
+        return [a for a in self.ausencias if a['data_inicio'] <= data_fim and a['data_fim'] >= data_inicio]
+
+class TestMapasAusencia(unittest.TestCase):
+
+    def setUp(self):
+        cobertura_service._cache_mapas.clear()
+
+    def tearDown(self):
+        cobertura_service._cache_mapas.clear()
+
+    def test_ano_com_meses_calculados_em_momentos_diferentes(self):
+        """Setor fora de SETORES só em um mês: o mês em cache antes não quebra o ano"""
+        service = CoberturaService(RepositorioFalso([
+            {"setor": "LABORATÓRIO", "data_inicio": date(2026, 3, 2), "data_fim": date(2026, 3, 6)},
+        ]))
+        self.assertTrue(service.mapa_ausencias_mes(2026, 1)["sucesso"])
+
+        resultado = service.mapa_ausencias_ano(2026)
+        self.assertTrue(resultado["sucesso"], resultado.get("erro"))
+        mapa = resultado["mapa"]
+        self.assertEqual(list(mapa.index), list(SETORES) + ["LABORATÓRIO"])
+        self.assertEqual(mapa.loc["LABORATÓRIO", "Mar"], 1)
+        self.assertEqual(mapa.loc["LABORATÓRIO", "Jan"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Testes para a paginação por chave de BaseConnection (sem banco: consultas registradas)
+"""
+import unittest
+from src.database.base_connection import BaseConnection
+
+class ConexaoFalsa(BaseConnection):
+    def __init__(self, linhas, total):
+        self.linhas = linhas
+        self.total = total
+        self.consultas = []
+
+    def _execute_query(self, query, params=None, fetch=False):
+        self.consultas.append((" ".join(query.split()), params))
+        if "COUNT(*)" in query:
+            return [{"total_registros": self.total}]
+        return [dict(linha) for linha in self.linhas]
+
+class TestConsultarPagina(unittest.TestCase):
+
+    def test_total_so_na_primeira_pagina(self):
+        """Filtro e LIMIT vão na base; a contagem é feita uma vez e segue no cursor"""
+        conexao = ConexaoFalsa([{"id": 1, "nome": "Ana"}, {"id": 2, "nome": "Bia"}, {"id": 3, "nome": "Caio"}], 7)
+        pagina = conexao._consultar_pagina("SELECT id, nome FROM usuarios", [], "nome", limite=2)
+        self.assertEqual(pagina["total"], 7)
+        self.assertEqual(pagina["linhas"][0]["total_registros"], 7)
+        self.assertEqual(pagina["proximo"][:2], ("Bia", 2))
+        self.assertEqual(len(conexao.consultas), 2)
+
+        conexao.consultas.clear()
+        pagina = conexao._consultar_pagina("SELECT id, nome FROM usuarios", [], "nome",
+                                           cursor=pagina["proximo"], limite=2)
+        self.assertEqual(pagina["total"], 7)
+        self.assertEqual(len(conexao.consultas), 1)
+        sql, params = conexao.consultas[0]
+        self.assertIn("FROM (SELECT id, nome FROM usuarios) b WHERE (b.nome, b.id) > (%s, %s)", sql)
+        self.assertEqual(params, ["Bia", 2, 3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Testes para o detector de queries repetidas (N+1 e duplicatas)
+"""
+import unittest
+from unittest import mock
+from src.utils import detector_queries
+from src.utils.detector_queries import (
+    DetectorQueries, normalizar_query, contar_queries, assert_max_queries
+)
+
+
+def _executar(query, params=None):
+    """Simula a notificação feita pelo cursor monitorado"""
+    detector_queries._observar_query(query, params, 0.001)
+
+
+class TestDetectorQueries(unittest.TestCase):
+    
+    def setUp(self):
+        patch = mock.patch.object(detector_queries, "_observador_registrado", True)
+        patch.start()
+        self.addCleanup(patch.stop)
+    
+    def test_normalizar_query_remove_literais_e_espacos(self):
+        """Testa que queries de mesmo formato geram a mesma impressão"""
+        a = normalizar_query("SELECT * FROM ferias\n   WHERE usuario_id = 10")
+        b = normalizar_query("SELECT * FROM ferias WHERE usuario_id = 25")
+        self.assertEqual(a, b)
+        self.assertEqual(normalizar_query("WHERE id IN (1, 2, 3)"), normalizar_query("WHERE id IN (4)"))
+    
+    def test_detecta_duplicadas(self):
+        """Testa query idêntica repetida"""
+        detector = DetectorQueries(capturar_pilha=False)
+        detector.registrar("SELECT * FROM ferias WHERE usuario_id = %s", (1,))
+        detector.registrar("SELECT * FROM ferias WHERE usuario_id = %s", (1,))
+        detector.registrar("SELECT * FROM usuarios", None)
+        
+        duplicadas = detector.duplicadas()
+        self.assertEqual(len(duplicadas), 1)
+        self.assertEqual(duplicadas[0]["ocorrencias"], 2)
+        self.assertEqual(detector.n_mais_um(), [])
+    
+    def test_detecta_laco_n_mais_um(self):
+        """Testa mesmo formato com ids diferentes"""
+        detector = DetectorQueries(capturar_pilha=False)
+        for usuario_id in range(5):
+            detector.registrar("SELECT * FROM ferias WHERE usuario_id = %s", (usuario_id,))
+        
+        suspeitas = detector.n_mais_um(limite=3)
+        self.assertEqual(len(suspeitas), 1)
+        self.assertEqual(suspeitas[0]["parametros_distintos"], 5)
+        self.assertIn("N+1", detector.relatorio())
+    
+    def test_contar_queries_captura_pilha(self):
+        """Testa contagem no escopo e pilha com código da aplicação"""
+        with contar_queries() as detector:
+            _executar("SELECT 1")
+        
+        self.assertEqual(detector.total, 1)
+        pilha = detector.execucoes[0]["pilha"]
+        self.assertTrue(any(
+            "test_detector_queries.py" in quadro and quadro.endswith("em test_contar_queries_captura_pilha")
+            for quadro in pilha
+        ), pilha)
+        self.assertNotIn(detector, detector_queries._detectores_ativos())
+    
+    def test_assert_max_queries(self):
+        """Testa helper de limite de queries"""
+        with assert_max_queries(2):
+            _executar("SELECT 1")
+            _executar("SELECT 2")
+        
+        with self.assertRaises(AssertionError):
+            with assert_max_queries(1):
+                _executar("SELECT * FROM usuarios WHERE id = %s", (1,))
+                _executar("SELECT * FROM usuarios WHERE id = %s", (1,))
+
+
+if __name__ == '__main__':
+    unittest.main()
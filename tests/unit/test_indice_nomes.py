@@ -0,0 +1,43 @@
+"""
+Testes para o índice de nomes em memória (busca sem acento)
+"""
+import unittest
+from src.database.indice_nomes import IndiceNomes, normalizar_nome
+
+class TestIndiceNomes(unittest.TestCase):
+    
+    def setUp(self):
+        self.indice = IndiceNomes([
+            (1, "João da Silva"),
+            (2, "Maria Joana Souza"),
+            (3, "Ana Conceição"),
+            (4, "Joaquim Pereira"),
+        ])
+    
+    def test_normalizar_nome(self):
+        """Acentos, caixa e pontuação são ignorados"""
+        self.assertEqual(normalizar_nome("  João  D'Ávila "), "joao d avila")
+        self.assertEqual(normalizar_nome(None), "")
+    
+    def test_busca_ignora_acentos(self):
+        """'joao' encontra 'João' e 'conceicao' encontra 'Conceição'"""
+        self.assertEqual(self.indice.buscar("joao")[0], 1)
+        self.assertEqual(self.indice.buscar("CONCEICAO"), [3])
+    
+    def test_prefixo_antes_de_similaridade(self):
+        """Nomes com palavra iniciada pelo termo vêm primeiro"""
+        self.assertEqual(self.indice.buscar("joa")[:3], [1, 4, 2])
+    
+    def test_tolera_erro_de_digitacao_e_limite(self):
+        """Termo com erro ainda encontra o nome; limite é respeitado"""
+        self.assertIn(4, self.indice.buscar("joaqim"))
+        self.assertEqual(len(self.indice.buscar("jo", limite=1)), 1)
+        self.assertEqual(self.indice.buscar("xyz"), [])
+    
+    def test_remover(self):
+        """Nome removido deixa de ser encontrado"""
+        self.indice.remover(3)
+        self.assertEqual(self.indice.buscar("conceicao"), [])
+
+if __name__ == '__main__':
+    unittest.main()
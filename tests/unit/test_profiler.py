@@ -0,0 +1,78 @@
+"""
+Testes para o profiler de renderização
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.utils import profiler
+
+
+class TestProfiler(unittest.TestCase):
+    
+    def setUp(self):
+        self.arquivo = os.path.join(tempfile.mkdtemp(), "perfil.jsonl")
+        self.patches = [
+            mock.patch.object(profiler, "PERFIL_ATIVO", True),
+            mock.patch.object(profiler, "ARQUIVO_PERFIL", self.arquivo),
+            mock.patch.object(profiler, "_observador_registrado", True),
+        ]
+        for patch in self.patches:
+            patch.start()
+        profiler._buffer.clear()
+    
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+    
+    def test_rerun_registra_paineis_aninhados(self):
+        """Testa registro de main e painéis filhos no mesmo rerun"""
+        with profiler.perfil_rerun():
+            with profiler.perfil_painel("menu_rh"):
+                profiler._observar_query("SELECT 1", None, 0.01)
+        
+        registros = profiler.obter_registros()
+        paineis = {r["painel"]: r for r in registros}
+        self.assertEqual(set(paineis), {"main", "menu_rh"})
+        self.assertEqual(paineis["menu_rh"]["rerun_id"], paineis["main"]["rerun_id"])
+        # Métricas de banco são inclusivas
+        self.assertEqual(paineis["menu_rh"]["queries"], 1)
+        self.assertEqual(paineis["main"]["queries"], 1)
+        self.assertEqual(paineis["main"]["profundidade"], 0)
+    
+    def test_registros_persistidos_em_jsonl(self):
+        """Testa gravação append-only no arquivo"""
+        with profiler.perfil_rerun():
+            pass
+        with profiler.perfil_rerun():
+            pass
+        
+        self.assertEqual(len(profiler.carregar_arquivo(self.arquivo)), 2)
+    
+    def test_resumo_por_painel_ordena_pelo_mais_lento(self):
+        """Testa agregação para comparação de painéis"""
+        base = {"db_ms": 1.0, "queries": 2, "alocado_kb": 1.0, "pico_kb": 2.0}
+        registros = [
+            dict(base, painel="rapido", tempo_ms=10.0),
+            dict(base, painel="lento", tempo_ms=100.0),
+            dict(base, painel="lento", tempo_ms=300.0),
+        ]
+        
+        resumo = profiler.resumo_por_painel(registros)
+        self.assertEqual(resumo[0]["painel"], "lento")
+        self.assertEqual(resumo[0]["execucoes"], 2)
+        self.assertEqual(resumo[0]["tempo_medio_ms"], 200.0)
+        self.assertEqual(resumo[0]["tempo_max_ms"], 300.0)
+    
+    def test_desativado_nao_registra(self):
+        """Testa que o modo desligado não coleta nada"""
+        with mock.patch.object(profiler, "PERFIL_ATIVO", False):
+            with profiler.perfil_rerun():
+                with profiler.perfil_painel("menu_rh"):
+                    pass
+        
+        self.assertEqual(profiler.obter_registros(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
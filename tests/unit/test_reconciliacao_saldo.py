@@ -0,0 +1,30 @@
+"""
+Testes para o resumo da reconciliação de saldos
+"""
+import unittest
+from src.core.regras_saldo import RegrasSaldo
+
+class TestResumoReconciliacao(unittest.TestCase):
+
+    def test_sem_divergencias(self):
+        resumo = RegrasSaldo.resumir_reconciliacao([])
+        self.assertEqual(resumo["colaboradores"], 0)
+        self.assertEqual(resumo["por_setor"], {})
+
+    def test_totais_por_tipo_e_setor(self):
+        """Cache, férias e colaborador sem extrato são contados separadamente"""
+        resumo = RegrasSaldo.resumir_reconciliacao([
+            {"setor": "TI", "divergencia_cache": 2, "divergencia_ferias": 0},
+            {"setor": "TI", "divergencia_cache": 0, "divergencia_ferias": -10},
+            {"setor": "RH", "divergencia_cache": -1, "divergencia_ferias": 5},
+            {"setor": "RH", "divergencia_cache": None, "divergencia_ferias": None},
+        ])
+        self.assertEqual(resumo["colaboradores"], 4)
+        self.assertEqual(resumo["sem_extrato"], 1)
+        self.assertEqual((resumo["divergencias_cache"], resumo["dias_cache"]), (2, 1))
+        self.assertEqual((resumo["divergencias_ferias"], resumo["dias_ferias"]), (2, -5))
+        self.assertEqual(resumo["por_setor"]["TI"], {"colaboradores": 2, "dias_ferias": -10})
+        self.assertEqual(resumo["por_setor"]["RH"], {"colaboradores": 2, "dias_ferias": 5})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+"""
+Testes para regras de público dos avisos
+"""
+import unittest
+from datetime import datetime
+from src.core.regras_avisos import RegrasAvisos
+
+class TestRegrasAvisos(unittest.TestCase):
+    
+    def test_todos_ignora_demais_filtros(self):
+        """Aviso para todos gera uma única regra"""
+        regras = RegrasAvisos.montar_regras_publico(True, setores=['TI'], usuarios_ids=[1])
+        self.assertEqual(regras, [('todos', '')])
+    
+    def test_regras_sem_repeticao(self):
+        """Filtros repetidos não geram regras duplicadas"""
+        regras = RegrasAvisos.montar_regras_publico(setores=['TI', 'TI'], funcoes=['Analista'], usuarios_ids=[7, 7])
+        self.assertEqual(regras, [('setor', 'TI'), ('funcao', 'Analista'), ('usuario', '7')])
+    
+    def test_sem_filtros(self):
+        """Sem filtros não há público"""
+        self.assertEqual(RegrasAvisos.montar_regras_publico(), [])
+    
+    def test_validar_periodo(self):
+        """Expiração precisa ser posterior à publicação"""
+        inicio = datetime(2024, 3, 1, 8, 0)
+        self.assertTrue(RegrasAvisos.validar_periodo(inicio, None)["valido"])
+        self.assertTrue(RegrasAvisos.validar_periodo(inicio, datetime(2024, 3, 2))["valido"])
+        self.assertFalse(RegrasAvisos.validar_periodo(inicio, inicio)["valido"])
+        self.assertFalse(RegrasAvisos.validar_periodo(inicio, datetime(2024, 2, 28))["valido"])
+
+if __name__ == '__main__':
+    unittest.main()
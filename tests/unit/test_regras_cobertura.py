@@ -0,0 +1,61 @@
+"""
+Testes para a contagem de ausências simultâneas
+"""
+import unittest
+from datetime import date
+from src.core.regras_cobertura import RegrasCobertura
+
+class TestRegrasCobertura(unittest.TestCase):
+
+    def setUp(self):
+        self.periodos = [
+            (date(2025, 1, 2), date(2025, 1, 4)),
+            (date(2025, 1, 3), date(2025, 1, 6)),
+            (date(2025, 1, 4), date(2025, 1, 4)),
+        ]
+
+    def test_contagem_por_dia(self):
+        """Extremos inclusivos, um valor por dia da janela"""
+        dias, contagem = RegrasCobertura.ausencias_por_dia(self.periodos, date(2025, 1, 1), date(2025, 1, 7))
+        self.assertEqual(len(dias), 7)
+        self.assertEqual(contagem.tolist(), [0, 1, 2, 3, 1, 1, 0])
+
+    def test_periodos_cortados_pela_janela(self):
+        """Períodos parcialmente fora da janela contam só os dias dentro; os de fora são ignorados"""
+        periodos = self.periodos + [(date(2024, 12, 20), date(2024, 12, 31))]
+        _, contagem = RegrasCobertura.ausencias_por_dia(periodos, date(2025, 1, 3), date(2025, 1, 5))
+        self.assertEqual(contagem.tolist(), [2, 3, 1])
+
+    def test_sem_periodos(self):
+        """Janela sem férias tem contagem zero"""
+        _, contagem = RegrasCobertura.ausencias_por_dia([], date(2025, 1, 1), date(2025, 1, 3))
+        self.assertEqual(contagem.tolist(), [0, 0, 0])
+
+    def test_contagem_por_grupo(self):
+        """Cada grupo (setor) tem sua própria linha; grupos sem férias ficam zerados"""
+        _, matriz = RegrasCobertura.ausencias_por_dia_grupo(
+            self.periodos, [0, 2, 0], 3, date(2025, 1, 1), date(2025, 1, 7)
+        )
+        self.assertEqual(matriz.tolist(), [
+            [0, 1, 1, 2, 0, 0, 0],
+            [0, 0, 0, 0, 0, 0, 0],
+            [0, 0, 1, 1, 1, 1, 0],
+        ])
+
+    def test_violacoes_agrupam_dias_consecutivos(self):
+        """Dias acima do limite viram intervalos com o pico de cada um"""
+        resumo = RegrasCobertura.resumir(self.periodos, date(2025, 1, 1), date(2025, 1, 7), limite=1)
+        self.assertEqual(resumo["pico"], 3)
+        self.assertEqual(resumo["violacoes"], [
+            {"inicio": date(2025, 1, 3), "fim": date(2025, 1, 4), "pico": 3}
+        ])
+        self.assertEqual(resumo["dias_pico"][0], {"dia": date(2025, 1, 4), "ausentes": 3})
+
+    def test_limite_setor(self):
+        """Setores sem limite próprio usam o padrão"""
+        limites = {"TI": 1}
+        self.assertEqual(RegrasCobertura.limite_setor("TI", limites), 1)
+        self.assertEqual(RegrasCobertura.limite_setor("FINANCEIRO", {}), RegrasCobertura.limite_setor(None, {}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Testes para a escala anual de férias por setor
+"""
+import unittest
+from datetime import date
+from src.core.regras_escala import RegrasEscala
+from src.core.regras_cobertura import RegrasCobertura
+
+class TestRegrasEscala(unittest.TestCase):
+
+    def colaborador(self, id, preferencias, setor="TI", duracao=5):
+        return {"id": id, "setor": setor, "duracao": duracao, "preferencias": preferencias}
+
+    def test_respeita_limite_do_setor(self):
+        """Nunca mais ausentes simultâneos que o limite, mesmo com preferências iguais"""
+        duas_semanas = [(date(2026, 7, 6), date(2026, 7, 17))]
+        colaboradores = [self.colaborador(i, duas_semanas) for i in range(6)]
+        escala = RegrasEscala.montar_escala(2026, colaboradores, {"TI": 2})
+
+        self.assertEqual(len(escala["alocacoes"]), 6)
+        periodos = [(a["data_inicio"], a["data_fim"]) for a in escala["alocacoes"]]
+        _, contagem = RegrasCobertura.ausencias_por_dia(periodos, date(2026, 1, 1), date(2027, 3, 1))
+        self.assertLessEqual(contagem.max(), 2)
+        # Cabem quatro nas duas semanas (duas levas de dois)
+        self.assertEqual(sum(1 for a in escala["alocacoes"] if a["preferencia"] == 0), 4)
+
+    def test_periodo_bloqueado(self):
+        """Bloqueios do setor ou gerais não recebem férias"""
+        bloqueios = [(date(2026, 12, 1), date(2026, 12, 31), None), (date(2026, 7, 1), date(2026, 7, 31), "TI")]
+        colaboradores = [
+            self.colaborador(1, [(date(2026, 7, 1), date(2026, 7, 31))]),
+            self.colaborador(2, [(date(2026, 12, 1), date(2026, 12, 31))], setor="RH"),
+            self.colaborador(3, [(date(2026, 7, 1), date(2026, 7, 31))], setor="RH"),
+        ]
+        escala = RegrasEscala.montar_escala(2026, colaboradores, {"TI": 1, "RH": 1}, bloqueios=bloqueios)
+
+        por_id = {a["id"]: a for a in escala["alocacoes"]}
+        for alocacao in escala["alocacoes"]:
+            self.assertFalse(alocacao["data_inicio"].month == 12 or alocacao["data_fim"].month == 12)
+        self.assertIsNone(por_id[1]["preferencia"])
+        self.assertIsNone(por_id[2]["preferencia"])
+        self.assertEqual(por_id[3]["preferencia"], 0)
+
+    def test_ocupacao_existente_e_dias_uteis(self):
+        """Férias já cadastradas consomem a vaga; a duração é em dias úteis"""
+        marco = [(date(2026, 3, 2), date(2026, 3, 6))]
+        ocupacao = [("TI", date(2026, 3, 2), date(2026, 3, 6))]
+        escala = RegrasEscala.montar_escala(
+            2026, [self.colaborador(1, marco)], {"TI": 1}, ocupacao=ocupacao, permitir_fora_preferencia=False
+        )
+        self.assertEqual(escala["alocacoes"], [])
+        self.assertEqual(escala["nao_alocados"], [1])
+
+        escala = RegrasEscala.montar_escala(2026, [self.colaborador(1, marco)], {"TI": 1})
+        alocacao = escala["alocacoes"][0]
+        self.assertEqual((alocacao["data_inicio"], alocacao["data_fim"]), marco[0])
+        self.assertEqual(alocacao["dias_cobrados"], 5)
+        self.assertEqual(escala["satisfacao"], 1.0)
+
+        escala = RegrasEscala.montar_escala(2026, [self.colaborador(1, marco)], {"TI": 1}, inicio_minimo=date(2026, 3, 3))
+        self.assertGreaterEqual(escala["alocacoes"][0]["data_inicio"], date(2026, 3, 3))
+
+    def test_busca_local_realoca_colega(self):
+        """Quem tem uma única opção recupera a vaga de um colega com alternativa"""
+        semana_a = (date(2026, 3, 2), date(2026, 3, 6))
+        semana_b = (date(2026, 3, 9), date(2026, 3, 13))
+        colaboradores = [
+            # Mesma quantidade de opções preferidas: o id decide a ordem do guloso
+            self.colaborador("a", [semana_a, semana_b]),
+            self.colaborador("b", [semana_a, (date(2026, 3, 4), date(2026, 3, 6))]),
+        ]
+        escala = RegrasEscala.montar_escala(2026, colaboradores, {"TI": 1})
+
+        por_id = {a["id"]: a for a in escala["alocacoes"]}
+        self.assertEqual((por_id["a"]["data_inicio"], por_id["a"]["data_fim"]), semana_b)
+        self.assertEqual((por_id["b"]["data_inicio"], por_id["b"]["data_fim"]), semana_a)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+"""
+Testes para as sugestões de períodos de férias
+"""
+import unittest
+from datetime import date
+from src.core.regras_planejamento import RegrasPlanejamento
+
+class TestRegrasPlanejamento(unittest.TestCase):
+
+    def test_emenda_feriado(self):
+        """Um dia útil antes/depois de feriado rende quatro dias de descanso"""
+        sugestoes = RegrasPlanejamento.sugerir(2026, [1], quantidade=2)
+        # 01/01/2026 é quinta-feira e 21/04/2026 é terça-feira
+        self.assertEqual([s['data_inicio'] for s in sugestoes], [date(2026, 1, 2), date(2026, 4, 20)])
+        self.assertEqual(sugestoes[1]['descanso_inicio'], date(2026, 4, 18))
+        self.assertEqual(sugestoes[1]['descanso_fim'], date(2026, 4, 21))
+        self.assertEqual(sugestoes[1]['dias_descanso'], 4)
+
+    def test_duracao_em_dias_uteis(self):
+        """O fim é o dia em que se completam os dias úteis pedidos"""
+        sugestoes = RegrasPlanejamento.sugerir(2026, [10], inicio_minimo=date(2026, 8, 1), quantidade=1)
+        self.assertEqual(sugestoes[0]['data_inicio'], date(2026, 8, 24))
+        self.assertEqual(sugestoes[0]['data_fim'], date(2026, 9, 4))
+        self.assertEqual(sugestoes[0]['dias_descanso'], 17)
+
+    def test_respeita_inicio_minimo_e_bloqueios(self):
+        """Nenhuma sugestão antes do mínimo ou sobre férias já cadastradas"""
+        bloqueio = (date(2026, 9, 1), date(2026, 9, 30))
+        sugestoes = RegrasPlanejamento.sugerir(
+            2026, [3, 5], inicio_minimo=date(2026, 8, 15), periodos_bloqueados=[bloqueio], quantidade=10
+        )
+        self.assertTrue(sugestoes)
+        for sugestao in sugestoes:
+            self.assertGreaterEqual(sugestao['data_inicio'], date(2026, 8, 15))
+            self.assertTrue(sugestao['data_fim'] < bloqueio[0] or sugestao['data_inicio'] > bloqueio[1])
+
+    def test_conflito_com_equipe_penaliza(self):
+        """Dias com a equipe no limite reduzem a pontuação"""
+        equipe = [(date(2026, 1, 1), date(2026, 12, 31))]
+        sugestoes = RegrasPlanejamento.sugerir(
+            2026, [1], periodos_equipe=equipe, limite_equipe=1, quantidade=1
+        )
+        self.assertEqual(sugestoes[0]['dias_conflito'], 1)
+        self.assertEqual(sugestoes[0]['pontuacao'], 3.0)
+
+    def test_sugestoes_nao_se_sobrepoem(self):
+        """Cada sugestão é uma alternativa distinta"""
+        sugestoes = RegrasPlanejamento.sugerir(2026, [5], quantidade=5)
+        periodos = sorted((s['data_inicio'], s['data_fim']) for s in sugestoes)
+        for anterior, seguinte in zip(periodos, periodos[1:]):
+            self.assertLess(anterior[1], seguinte[0])
+
+if __name__ == '__main__':
+    unittest.main()